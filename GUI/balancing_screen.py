@@ -407,6 +407,29 @@ class BalancingLoadingScreen(QWidget):
         self.calculate_total_time()
         self.update_time_label
 
+    def show_snapshot(self, snapshot):
+        """Show the ship, buffer and truck of a snapshot and continue from the move after it."""
+        n_row, n_col = self.right_grid_dims
+        for row in range(1, n_row + 1):
+            for col in range(1, n_col + 1):
+                self.update_right_grid(row, col, "", "white")
+
+        for (m, n), container in snapshot.ship.items():
+            if container.name == "NAN":
+                self.update_right_grid(m + 1, n + 1, "", "black")
+            else:
+                self.update_right_grid(m + 1, n + 1, container.name, "white", {"Name": container.name, "Weight": container.weight})
+        for (m, n), container in snapshot.buffer.items():
+            self.update_left_grid(m + 1, n + 1, "", "white", {"Name": container.name, "Weight": container.weight})
+
+        if snapshot.truck is None:
+            self.truck_widget.clear_container()
+        else:
+            self.truck_widget.update_container(snapshot.truck.name)
+
+        self.current_move_index = snapshot.completed
+        self.update_time_label()
+
     def calculate_total_time(self):
         """Calculate the total time for all moves."""
         self.total_time = sum(move.time_to_move for move in self.moves)
@@ -437,7 +460,7 @@ class BalancingLoadingScreen(QWidget):
             move = self.moves[self.current_move_index]
             self.main_window.logger.log_move(move)
             print(f"Executing move: {move}")
-            self.main_window.save_move_progress()
+            self.main_window.save_move_progress(move)
 
             # Determine source and destination positions
             source = move.m_from
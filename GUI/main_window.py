@@ -9,6 +9,7 @@ from GUI.task_selection_screen import *
 
 import os
 from RecoveryLogger import RecoveryLogger
+from Snapshot import Snapshot
 from Logger import Logger
 import os
 
@@ -35,6 +36,7 @@ class MainWindow(QMainWindow):
         # Initialize the RecoveryLogger
         self.recovery_logger = RecoveryLogger(recovery_path="")  
         self.current_task = 0
+        self.snapshot = None # what is where after the moves made so far, saved with each of them
 
         #initialize Logger
         self.logger = Logger()
@@ -87,16 +89,16 @@ class MainWindow(QMainWindow):
                 )
             self.recover_moves()
 
-            if(self.recovery_logger.last_task == "Balancing\n"):
-                print("WE BALAnCING")
-                self.show_balancing_screen()
-                for i in range(self.current_move_index):
-                    self.balancing_screen.next_move()
-            if(self.recovery_logger.last_task == "Loading/Unloading Task\n"):
-                print("WE loadin")
-                self.show_loading_screen()
-                for i in range(self.current_move_index):
-                    self.loading_screen.next_move()
+            # show the snapshot of the last move made instead of making the moves again,
+            # so nothing is logged twice and resuming takes as long however many moves were made
+            if self.snapshot is not None:
+                self.opened = True
+                if(self.recovery_logger.last_task == "Balancing\n"):
+                    self.show_balancing_screen()
+                    self.balancing_screen.show_snapshot(self.snapshot)
+                if(self.recovery_logger.last_task == "Loading/Unloading Task\n"):
+                    self.show_loading_screen()
+                    self.loading_screen.show_snapshot(self.snapshot)
 
     def show_login_screen(self):
         self.login_screen.switch_screen = self.current_task
@@ -193,12 +195,15 @@ class MainWindow(QMainWindow):
 
         # Create a recovery file using RecoveryLogger
         if not self.recovery_logger.fexists():
+            self.snapshot = Snapshot.from_manifest(self.manifest_data)
             self.recovery_logger.last_task = task
-            self.recovery_logger.create(moves)
+            self.recovery_logger.create(moves, self.snapshot)
 
-    def save_move_progress(self):
-        """Save the current move progress to the recovery file."""
-        self.recovery_logger.save_next_move()
+    def save_move_progress(self, move):
+        """Save the current move progress and the snapshot after the move to the recovery file."""
+        if self.snapshot is not None: # None when the recovery file could not be recovered
+            self.snapshot.apply(move)
+        self.recovery_logger.save_next_move(self.snapshot)
 
     def recover_moves(self):
         """Recover moves from the recovery file."""
@@ -206,10 +211,13 @@ class MainWindow(QMainWindow):
         print("moves: ", moves)
         print("last completed:", last_completed)
         print(f'LAST TASK: {self.recovery_logger.last_task}')
-        if moves:
+        if moves is not None:
             print("runi")
             self.set_moves(moves, self.recovery_logger.last_task)
             self.current_move_index = last_completed  # Restore last completed move index
+            # a recovery file without snapshots starts from the manifest, the moves made since the last snapshot are made on it
+            self.snapshot = self.recovery_logger.snapshot or Snapshot.from_manifest(self.manifest_data)
+            self.snapshot.replay(moves, last_completed)
             # print("index:", self.current_move_index)
             # self.balancing_screen.current_move_index = last_completed  # Sync with BalancingLoadingScreen
 
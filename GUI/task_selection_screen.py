@@ -7,6 +7,7 @@ from Manifest import Manifest
 # from Manifest import Manifest
 from Load_Balance.Loader import Loader
 from Load_Balance.Balancer import Balancer
+from consts import SOLVE_TIME_LIMIT
 import os
 from GUI.load_unload_selction_screen import *
 
@@ -112,7 +113,10 @@ class TaskSelectionScreen(QWidget):
 
             def handle_selection(offload, load):
                 loader = Loader(manifest)
-                moves = loader.load_unload(load, offload)
+                moves = loader.load_unload(load, offload, SOLVE_TIME_LIMIT)
+                if loader.out_of_time:
+                    self.show_message("Error", f"No plan was found in {SOLVE_TIME_LIMIT} seconds", error=True)
+                    return
                 self.main_window.set_moves(moves, "Loading/Unloading Task\n")
                 
                 
@@ -126,7 +130,10 @@ class TaskSelectionScreen(QWidget):
             else:
                 print("UH BALANCING")
                 balancer = Balancer(manifest)
-                moves = balancer.balance()
+                moves = balancer.balance(SOLVE_TIME_LIMIT)
+                if balancer.out_of_time:
+                    self.show_message("Error", f"No plan was found in {SOLVE_TIME_LIMIT} seconds", error=True)
+                    return
                 self.main_window.set_moves(moves, "Balancing\n")
                 self.switch_to_balancing()
             
@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import time
+from Load_Balance.ClosedList import ClosedList
+from Load_Balance.Search import Search
+from Load_Balance.SMAStar import SMAStar
+from consts import ANYTIME_WEIGHTS, PROGRESS_INTERVAL
+
+INF = float('inf')
+
+## AnytimeSearch finds a first plan fast and improves it until a deadline passes
+## each pass is a weighted A* ordered by g + w*h, the weight goes down every pass (ANYTIME_WEIGHTS)
+## states with g+h no better than the best plan found so far are pruned, a pass ends when it finds a better plan
+## bound is the suboptimality of the returned plan (see Search), every pass ends with the lowest g+h of the states it had
+## left to search, the highest of those is a lower bound on the cost of the cheapest plan the search can reach
+## when h is admissible (State.admissible) the last pass (weight 1) prunes too, and the search stops as soon as
+## the lower bound reaches the cost of the best plan, that plan is optimal and the passes left cannot improve on it
+## when h can overestimate the last pass prunes nothing and is the same A* as Search, pruning on h could lose its plan
+## with enough time the plan is never worse than Search's
+## the deadline holds for the first plan too, if it passes before there is one search returns None and out_of_time is set
+##
+## max_nodes and max_bytes bound the states a pass keeps in memory, a pass that reaches them ends like one out of time
+## and the best plan so far is returned, a pass with a lower weight would need more memory still
+## if the first pass reaches them before it has a plan, the first plan is found by SMAStar within the same budget
+class AnytimeSearch(Search):
+    def __init__(self, name: str = "Search", time_limit: float = None, weights=ANYTIME_WEIGHTS, max_nodes: int = None, max_bytes: int = None, progress=None):
+        super().__init__(name, progress)
+        self.time_limit = time_limit # seconds to search for, None to run until the plan is optimal
+        self.weights = weights
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+
+    ## Search from the starting states
+    ## return the best goal state found before the deadline, None if no goal can be reached
+    def search(self, states):
+        start = time.monotonic()
+        self.deadline = INF if self.time_limit is None else start + self.time_limit
+        self.best = None
+        self.out_of_memory = False
+        self.start(states)
+        self.state_bytes = states[0].size() if states else 0
+
+        lower = 0
+        for w in self.weights:
+            lower = max(lower, self.weighted_search(states, w))
+            if self.best is not None:
+                self.log.info("weight %s plan cost: %s lower bound: %s time: %.3f", w, self.best.g, lower, time.monotonic() - start)
+            if self.timed_out() or self.out_of_memory or self.stats.aborted:
+                break
+            if self.admissible and self.best is not None and lower >= self.best.g:
+                self.log.info("plan cost %s is optimal, no pass can improve it", self.best.g)
+                break
+
+        if self.best is None and self.out_of_memory and not self.stats.aborted and not self.timed_out():
+            self.log.info("out of memory before the first plan, searching with SMAStar")
+            self.best = self.first_plan(states)
+            lower = None # SMAStar pops its plan like A*
+
+        if self.best is None and not self.stats.aborted and self.timed_out():
+            self.out_of_time = True
+            self.log.warning("no plan found in %s seconds", self.time_limit)
+
+        return self.finish(self.best, lower=lower)
+
+    # the first plan found by SMAStar within the memory budget, its stats are added to these
+    # it is stopped by the deadline as well as the progress callback, both are checked every PROGRESS_INTERVAL states
+    def first_plan(self, states):
+        stopped = [] # set if the progress callback stopped it, not the deadline
+        def progress(stats):
+            if self.progress is not None and self.progress(stats):
+                stopped.append(True)
+                return True
+            return self.timed_out()
+        search = SMAStar(self.name, self.max_nodes, self.max_bytes, progress)
+        search.profile = self.profile
+        goal = search.search(states)
+        states[0].table.stats = self.stats
+        self.stats.merge(search.stats)
+        self.stats.aborted = bool(stopped)
+        return goal
+
+    # a pass has more states in memory than the budget allows
+    def over_budget(self, closed):
+        if self.max_nodes is not None and len(closed) > self.max_nodes:
+            return True
+        return self.max_bytes is not None and len(closed)*self.state_bytes > self.max_bytes
+
+    def timed_out(self):
+        return time.monotonic() >= self.deadline
+
+    # one weighted A* pass, replaces self.best if it finds a cheaper plan
+    # returns a lower bound on the cost of the cheapest plan, the lowest g+h left when the pass stopped, 0 with no plan yet
+    def weighted_search(self, states, w):
+        tie = itertools.count()
+        stats = self.stats
+        heap = [(state.g + w*state.h, next(tie), state) for state in states if self.can_improve(state, w)]
+        heapq.heapify(heap)
+        closed = ClosedList()
+        for (_, _, state) in heap:
+            closed.add(state)
+        push = self.timed("heap_seconds", heapq.heappush)
+        pop = self.timed("heap_seconds", heapq.heappop)
+        add = self.timed("add_seconds", closed.add)
+        improves = self.timed("is_new_seconds", closed.improves)
+        is_stale = self.timed("cull_seconds", closed.is_stale)
+        can_improve = self.timed("cull_seconds", self.can_improve)
+
+        # frontier counter
+        f = 0
+
+        while heap:
+            (_, _, state) = pop(heap)
+
+            if is_stale(state):
+                continue
+            if not can_improve(state, w):
+                stats.culled += 1
+                continue
+
+            # the plan found is the best so far
+            if state.is_goal():
+                if self.best is None or state.g < self.best.g:
+                    self.best = state
+                break
+
+            # the clock is checked before every expansion, one can take long on a full ship, the progress callback every so often
+            if self.timed_out() or (f % PROGRESS_INTERVAL == 0 and self.report()):
+                heap.append((0, 0, state)) # not expanded, it still bounds the cost of a better plan
+                break
+            if f % PROGRESS_INTERVAL == 0:
+                self.log.debug("frontier %d weight: %s states: %d current best g: %s h: %s", f, w, len(heap), state.g, state.h)
+            if self.over_budget(closed):
+                self.out_of_memory = True
+                heap.append((0, 0, state))
+                break
+            f += 1
+            stats.expanding(state, len(heap))
+
+            n_states = state.expand(improves)
+            stats.generated += len(n_states)
+            for n_state in n_states:
+                if not can_improve(n_state, w):
+                    stats.culled += 1
+                elif add(n_state):
+                    push(heap, (n_state.g + w*n_state.h, next(tie), n_state))
+                else:
+                    stats.duplicates += 1
+
+        # found a plan, out of time or memory, stopped, or every state left was pruned
+        # the states pruned cannot lead to a plan cheaper than the best one
+        stats.reopened += closed.reopened
+        if self.best is None:
+            return 0
+        lower = self.best.g
+        for (_, _, state) in heap:
+            lower = min(lower, state.g + state.h)
+        return lower
+
+    # a state can lead to a cheaper plan only if g+h is below the cost of the best plan
+    # with an h that can overestimate that is not known, the last pass keeps every state
+    def can_improve(self, state, w):
+        if self.best is None or (w == 1 and not self.admissible):
+            return True
+        return state.g + state.h < self.best.g
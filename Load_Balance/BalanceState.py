@@ -1,8 +1,17 @@
-from consts import SHIP_HEIGHT, SHIP_WIDTH, SHIP_BUFF
-from Load_Balance.State import State
-from Load_Balance.Position import Position, Location
+from consts import SHIP_HEIGHT, SHIP_WIDTH, BUFF_HEIGHT, BUFF_WIDTH
+from Load_Balance.State import State, SHIP_ROWS, SHIP_CELLS
+from Load_Balance.ContainerTable import UNUSED
+from Load_Balance.Position import Position, Location, CRANE_REST, cost, EXIT_COST, TRANSFER_COST, WIDTH
+from Load_Balance.Partition import Partition, is_balanced
 from Move import Move
-import copy
+from bisect import bisect_left, insort
+
+SHIP_TOP = Position(Location.SHIP, [SHIP_HEIGHT-1, 0]) # the cell below the ship_buff rows nearest the exit of the ship
+LAST_LEG = cost(SHIP_TOP, CRANE_REST) # least cost of getting back to the crane rest from a container put down anywhere on the ship
+
+# columns a container in column n has to be carried to reach the other half of the ship
+def crossing_distance(n):
+    return SHIP_WIDTH//2 - n if n < SHIP_WIDTH//2 else n - SHIP_WIDTH//2 + 1
 
 '''
     State subclass for Balancing
@@ -12,12 +21,21 @@ import copy
             moving all containers on one half to the other half
             moving the crane back to the crane rest
             moving containers out of the buffers
-    the heuristic of a state is
-        the cost to move back to the crane rest
-        the cost to move each container out of the buffers
-        the distance to balance one half of the ship with the other
+    the heuristic of a state never overestimates the cost to the goal (see calculate_h), so the plan found is the cheapest
+    next_states can reach (see Search.bound)
+
+    left_index and right_index hold (weight, -m, -n) of every container that is weighed on each half of the ship, sorted
+    the ship_buff rows are not weighed so they are not indexed either, the index holds the weights Partition works with
+    they are kept up to date by put like the side weights
+    the heuristic takes the heaviest containers of a half off the end of its index, and finds the ones heavy enough
+    to balance the ship on their own with a bisect
+
+    partition is worked out once from the manifest and shared by every state of the search (see Partition)
+    it tells if the ship can be balanced at all, and how many containers the heuristic can count on still having to cross
 '''
 class BalanceState(State):
+    admissible = True
+
     def __init__(self, manifest):
         super().__init__(manifest)
         self.left_weight = 0
@@ -25,130 +43,275 @@ class BalanceState(State):
         self.total_weight = 0
         self.valid_range_small = 0
         self.valid_range_large = 0
+        self.left_index = []
+        self.right_index = []
+        self.partition = None
+        self.put_down_legs = (LAST_LEG, LAST_LEG, LAST_LEG) # see find_put_down_legs
         
         if manifest is not None:
             self.weigh_sides()
+            self.index_weights()
+            self.partition = Partition([w for (w, _, _) in self.left_index], [w for (w, _, _) in self.right_index])
+            self.put_down_legs = self.find_put_down_legs(sum(1 for id in self.cells if id > UNUSED))
             self.total_weight = self.left_weight + self.right_weight
             self.valid_range_small = self.total_weight * 0.48
             self.valid_range_large = self.total_weight * 0.52
 
 
+    # weigh both halves of the ship from scratch, put keeps the weights up to date after that
     def weigh_sides(self):
         self.left_weight = 0
         self.right_weight = 0
         for i in range(SHIP_HEIGHT):
             for j in range(SHIP_WIDTH):
-                if self.ship[i][j]:
+                container = self.ship_at(i, j)
+                if container:
                     if j < SHIP_WIDTH//2:
-                        self.left_weight += self.ship[i][j].weight
+                        self.left_weight += container.weight
                     else:
-                        self.right_weight += self.ship[i][j].weight
+                        self.right_weight += container.weight
+
+
+    # build the sorted weight index of both halves from scratch
+    # containers that weigh nothing are left out, moving them never helps the balance
+    def index_weights(self):
+        self.left_index = []
+        self.right_index = []
+        for i in range(SHIP_HEIGHT):
+            for j in range(SHIP_WIDTH):
+                container = self.ship_at(i, j)
+                if container and container.weight > 0:
+                    insort(self.left_index if j < SHIP_WIDTH//2 else self.right_index, (container.weight, -i, -j))
 
+    def clone(self):
+        state = super().clone()
+        state.left_index = self.left_index[:]
+        state.right_index = self.right_index[:]
+        return state
 
-    def next_states(self):
+    # is_new is called on each successor before it is copied, successors it rejects are dropped
+    def next_states(self, is_new=None):
         states = []
-        self.move_containers_other_half(states) # generate states produced by moving containers from one side to the other
-        self.clear_buffers(states)              # generate states produced by moving containers out of the buffers
-        self.return_crane_rest(states)          # generate state produced by moving the crane back to the crane rest
+        self.move_containers_other_half(states, is_new) # generate states produced by moving containers from one side to the other
+        self.clear_buffers(states, is_new)              # generate states produced by moving containers out of the buffers
+        self.return_crane_rest(states, is_new)          # generate state produced by moving the crane back to the crane rest
         return states
 
-    def calculate_h(self):
-        self.weigh_sides()
-        self.h = 0
+    # a container written to or taken from the ship changes the weight of its half
+    # the ship_buff rows are not weighed, a container there is counted when it is put back down
+    # undo goes through put too so the weights never need to be saved
+    def put(self, i, id):
+        old = self.cells[i]
+        super().put(i, id)
+        if i < SHIP_CELLS and old != id:
+            containers = self.table.containers
+            old_weight = containers[old].weight if old > UNUSED else 0
+            weight = containers[id].weight if id > UNUSED else 0
+            (m, n) = divmod(i, SHIP_WIDTH)
+            left = n < SHIP_WIDTH//2
+            if m < SHIP_HEIGHT:
+                if left:
+                    self.left_weight += weight - old_weight
+                else:
+                    self.right_weight += weight - old_weight
 
-        # best cost to move each container out of the buffers
-        for pos in self.containers_in_buffers():
-            self.h += self.search_from(pos, False, False)[1]
+                index = self.left_index if left else self.right_index
+                if old_weight > 0:
+                    del index[bisect_left(index, (old_weight, -m, -n))]
+                if weight > 0:
+                    insort(index, (weight, -m, -n))
 
-        # distance to move the crane to the crane rest
+    # a lower bound on the cost of any plan to the goal, not only the ones next_states can find
+    # the crane walks one path from where it is back to the crane rest, carrying every container that still has to move
+    # h is the largest of three lower bounds on the cost of that path
+    #     going straight from the crane to the crane rest
+    #     the carries, the empty leg before the first of them and the one after the last, they are separate parts of the path
+    #         the containers in the buffers are carried back down onto the ship (see buffer_carries)
+    #         the containers that still have to cross the centre line are carried to the other half (see crossing_carry)
+    #         the last container is put down on the ship below the ship_buff rows, the crane gets back to the crane rest from there
+    #         the crane at the crane rest has to get to the first container it picks up
+    #     going to one container that has to move, carrying it and getting back to the crane rest
+    #         every container in the buffers has to, and at least one container of the heavier half (see crossing_visit)
+    def calculate_h(self):
+        rest = 0
         if not self.crane_position.in_crane_rest():
-            self.h += self.crane_position.move_to(Position(Location.CRANE_REST), apply_move=False)[1]
+            rest = cost(self.crane_position, CRANE_REST)
+
+        carry = 0
+        visit = 0
+        for (location, m, n, c) in self.buffer_carries():
+            carry += c
+            visit = max(visit, self.reach(location, m, n) + c + self.put_down_legs[2])
+
+        (excess, index, left) = self.heavier_half()
+        carry += self.crossing_carry(excess, index, left)
+        if excess > 0:
+            visit = max(visit, self.crossing_visit(index, left))
 
-        if max(self.left_weight, self.right_weight)/max(1, min(self.left_weight, self.right_weight)) < 1.1:
+        if carry:
+            carry += self.put_down_legs[2]
+            if self.crane_position.in_crane_rest():
+                carry += self.first_pickup()
+
+        self.h = max(rest, carry, visit)
+
+    # the least cost of the crane getting from where it is to the cell m, n of a location, not moving any container
+    # the crane can go from the buffer to the ship through the crane rest, that is cheaper than going straight
+    def reach(self, location, m, n):
+        crane = self.crane_position
+        exit_cost = EXIT_COST[location][m*WIDTH[location] + n]
+        if crane.location == location:
+            return abs(crane.m - m) + abs(crane.n - n)
+        if crane.location == Location.CRANE_REST:
+            return TRANSFER_COST[Location.CRANE_REST][location] + exit_cost
+        return cost(crane, CRANE_REST) + TRANSFER_COST[Location.CRANE_REST][location] + exit_cost
+
+    # every container in the buffer or the ship_buff rows as (location, m, n, least cost of carrying it to where it can stay)
+    # those in the ship_buff rows go down at least to the top row of the ship, those in the buffer at least to SHIP_TOP
+    def buffer_carries(self):
+        if self.buffered == 0:
             return
+        for i in range(SHIP_HEIGHT*SHIP_WIDTH, SHIP_CELLS):
+            if self.cells[i] > UNUSED:
+                (m, n) = divmod(i, SHIP_WIDTH)
+                yield (Location.SHIP, m, n, m - SHIP_HEIGHT + 1)
+        # the containers of a buffer column are stacked up to its open position
+        for j in range(BUFF_WIDTH):
+            for m in range(BUFF_HEIGHT - self.buffer_height_map[j]):
+                if self.occupied(Location.BUFFER, m, j):
+                    yield (Location.BUFFER, m, j, cost(Position(Location.BUFFER, [m, j]), SHIP_TOP))
+
+    # the weight the heavier half has to lose for the ship to balance, its index and if it is the left half
+    # it is over the heaviest balanced split (Partition.hi) by that much, containers put down on it later only add to it
+    def heavier_half(self):
+        if self.partition is None or not self.partition.feasible:
+            return (0, [], True)
+        if self.left_weight >= self.right_weight:
+            return (self.left_weight - self.partition.hi, self.left_index, True)
+        return (self.right_weight - self.partition.hi, self.right_index, False)
+
+    # the least cost of carrying the containers that still have to cross the centre line
+    # each is carried at least to the nearest column of the other half (see closest_crossings), the larger of two
+    # lower bounds on how many of them there are is used
+    #     at least as many containers of the heavier half cross as its heaviest ones that weigh the excess, taken off the end of its index
+    #     Partition.moves_left of either half
+    # if one container can be enough, the ones heavy enough are found with a bisect, either one of them crosses after
+    # the containers above it are moved out of its way (at least 1 each) or at least two containers cross
+    def crossing_carry(self, excess, index, left):
+        need = 0
+        lost = 0
+        while lost < excess:
+            need += 1
+            lost += index[-need][0]
+
+        carry = self.closest_crossings(need, left, not left)
+        if need == 1:
+            alone = float('inf')
+            for (_, m, n) in index[bisect_left(index, (excess,)):]:
+                alone = min(alone, crossing_distance(-n) + self.above(-m, -n)) # m and n are negated in the index
+            carry = min(alone, self.closest_crossings(2, left, not left))
+
+        return max(carry, self.closest_crossings(self.crossings_left(), True, True))
 
-        l = self.left_weight
-        r = self.right_weight
-
-        # left side heavier
-        if l > r:
-            # move the heaviest containers to the right side of the ship until the right side is within the valid range
-            visited = set()
-            while not self.valid_range_small < r < self.valid_range_large:
-                w = 0
-                p = [-1,-1]
-                for i in range(SHIP_HEIGHT+SHIP_BUFF):
-                    for j in range(SHIP_WIDTH//2):
-                        if self.ship[i][j] and r + self.ship[i][j].weight < self.valid_range_large and self.ship[i][j].weight > w and (i,j) not in visited:
-                            w = self.ship[i][j].weight
-                            p = [i,j]
-                if p == [-1,-1]:
-                    self.h = float('inf')
-                    break
-                r += w
-                visited.add((p[0],p[1]))
-                self.h += (SHIP_WIDTH//2 - p[1])*2
-        else:
-            # move the heaviest containers to the left side of the ship until the left side is within the valid range
-            visited = set()
-            while not self.valid_range_small < l < self.valid_range_large:
-                w = 0
-                p = [-1,-1]
-                for i in range(SHIP_HEIGHT+SHIP_BUFF):
-                    for j in range(SHIP_WIDTH//2, SHIP_WIDTH):
-                        if self.ship[i][j] and l + self.ship[i][j].weight < self.valid_range_large and self.ship[i][j].weight > w and (i,j) not in visited:
-                            w = self.ship[i][j].weight
-                            p = [i,j]
-                if p == [-1,-1]:
-                    self.h = float('inf')
-                    break
-                l += w
-                visited.add((p[0],p[1]))
-                self.h += (p[1]-SHIP_WIDTH//2)*2
+    # the least cost of going to one of the containers of the heavier half, any of them can be the first to cross
+    # the crane has to carry each container above it to another column and come back (at least 2 each),
+    # carry it to the other half and get back to the crane rest after putting it down there
+    def crossing_visit(self, index, left):
+        visit = float('inf')
+        for (_, m, n) in index:
+            visit = min(visit, self.reach(Location.SHIP, -m, -n) + 2*self.above(-m, -n) + crossing_distance(-n))
+        return visit + self.put_down_legs[1 if left else 0]
+
+    # the number of containers above the cell m, n of the ship, below the ship_buff rows
+    def above(self, m, n):
+        return min(SHIP_ROWS - self.ship_height_map[n], SHIP_HEIGHT) - m - 1
+
+    # the least total number of columns k containers on the halves used have to be carried to cross the centre line
+    # the containers of the columns nearest the centre are counted first, a column holds the ones from its floor up to its open position
+    def closest_crossings(self, k, left, right):
+        carry = 0
+        for d in range(1, SHIP_WIDTH//2 + 1):
+            for (use, j) in ((left, SHIP_WIDTH//2 - d), (right, SHIP_WIDTH//2 + d - 1)):
+                if k <= 0:
+                    return carry
+                if use:
+                    n = min(k, max(0, min(SHIP_ROWS - self.ship_height_map[j], SHIP_HEIGHT) - self.ship_floor[j]))
+                    carry += n*d
+                    k -= n
+        return carry
+
+    # the least cost of getting back to the crane rest after putting a container down on the left half, the right half, or either
+    # a container in column j is at most as high as every container of the ship stacked on its floor, and below the ship_buff rows
+    # the floors never change, so this is worked out once and shared by every state of the search
+    def find_put_down_legs(self, n_containers):
+        legs = [float('inf'), float('inf')]
+        for j in range(SHIP_WIDTH):
+            if self.ship_floor[j] < SHIP_HEIGHT:
+                m = min(SHIP_HEIGHT - 1, self.ship_floor[j] + max(0, n_containers - 1))
+                half = 0 if j < SHIP_WIDTH//2 else 1
+                legs[half] = min(legs[half], cost(Position(Location.SHIP, [m, j]), CRANE_REST))
+        legs = [LAST_LEG if leg == float('inf') else leg for leg in legs]
+        return (legs[0], legs[1], min(legs))
+
+    # the cheapest container for the crane to get to from the crane rest, the top of a column of the ship or of the buffer
+    def first_pickup(self):
+        best = float('inf')
+        for j in range(SHIP_WIDTH):
+            m = SHIP_ROWS - self.ship_height_map[j] - 1
+            if m >= self.ship_floor[j]:
+                best = min(best, cost(CRANE_REST, Position(Location.SHIP, [m, j])))
+        for pos in self.containers_in_buffers():
+            if pos.in_buf():
+                best = min(best, cost(CRANE_REST, pos))
+        return best if best < float('inf') else 1
+
+    # the fewest containers that still have to cross the centre line to reach a balanced split (see Partition.moves_left)
+    def crossings_left(self):
+        if self.partition is None:
+            return 0
+        return self.partition.moves_left((w for (w, _, _) in self.left_index), len(self.left_index) + len(self.right_index))
 
     # take all containers on the left and move them to the right side of the ship
-    def move_containers_other_half(self, states):
-        for i in range(SHIP_HEIGHT+SHIP_BUFF):
+    def move_containers_other_half(self, states, is_new=None):
+        mark = self.mark()
+        for i in range(SHIP_ROWS):
             for j in range(SHIP_WIDTH):
-                if self.ship[i][j] and self.ship[i][j].name != "UNUSED":
+                if self.occupied(Location.SHIP, i, j):
                     pos = Position(Location.SHIP, [i,j])
 
-                    state = copy.deepcopy(self)
-                    container = state.ship[pos.m][pos.n]
+                    container = self.at(pos)
 
-                    containers_above = state.containers_above(pos)
+                    containers_above = self.containers_above(pos)
                     prev = self.crane_position
                     while containers_above:
                         above_pos = containers_above.pop()
                         # move to the current container to move
                         if prev != above_pos:
-                            (prev, cost) = state.crane_position.move_to(above_pos, state.ship if above_pos.in_ship() else state.buffer)
-                            state.moves.append(Move(prev, above_pos, cost))
-                            state.g += cost
+                            (prev, cost) = self.crane_position.move_to(above_pos, self)
+                            self.moves.append(Move(prev, above_pos, cost))
+                            self.g += cost
 
                         # search for a good place to move the container
-                        (move_to, cost) = state.search_from(above_pos, True, True)
-                        state.swap(above_pos, move_to)
-                        state.crane_position = copy.deepcopy(move_to)
-                        state.moves.append(Move(above_pos, move_to, cost, state.ship[move_to.m][move_to.n]))
-                        state.g += cost
+                        (move_to, cost) = self.search_from(above_pos, True, True)
+                        self.swap(above_pos, move_to)
+                        self.crane_position = move_to.copy()
+                        self.moves.append(Move(above_pos, move_to, cost, self.at(move_to)))
+                        self.g += cost
 
                     # move to the container
-                    if state.crane_position != pos:
-                        (prev, cost) = state.crane_position.move_to(pos, state.ship if pos.in_ship() else state.buffer)
-                        state.moves.append(Move(prev, pos, cost))
-                        state.g += cost
+                    if self.crane_position != pos:
+                        (prev, cost) = self.crane_position.move_to(pos, self)
+                        self.moves.append(Move(prev, pos, cost))
+                        self.g += cost
 
                     # move the container to the other side of the ship
-                    (search_to, cost) = state.search_from(pos, True, True, state.use_right if j < SHIP_WIDTH//2 else state.use_left)
-                    state.swap(pos, search_to)
-                    state.crane_position = copy.deepcopy(search_to)
-                    state.moves.append(Move(pos, search_to, cost, container))
-                    state.g += cost
-
-                    state.calculate_h()
+                    (search_to, cost) = self.search_from(pos, True, True, self.use_right if j < SHIP_WIDTH//2 else self.use_left)
+                    self.swap(pos, search_to)
+                    self.crane_position = search_to.copy()
+                    self.moves.append(Move(pos, search_to, cost, container))
+                    self.g += cost
 
-                    states.append(state)
+                    self.emit(states, mark, is_new)
 
     def use_right(self, pos):
         if pos.n < SHIP_WIDTH//2:
@@ -161,7 +324,7 @@ class BalanceState(State):
         return 0
 
     def is_goal(self):
-        return max(self.left_weight, self.right_weight)/max(1, min(self.left_weight, self.right_weight)) < 1.1 and self.crane_position.in_crane_rest() and not self.containers_in_buffers()
+        return is_balanced(self.left_weight, self.right_weight) and self.crane_position.in_crane_rest() and self.buffered == 0
     
     def __eq__(self, other):
         return super().__eq__(other)
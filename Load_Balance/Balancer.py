@@ -1,79 +1,113 @@
-import heapq
 from Load_Balance.BalanceState import BalanceState
-from consts import MAX_STATES, STATE_CULL, SHIP_HEIGHT
+from Load_Balance.Search import Search
+from Load_Balance.SMAStar import SMAStar
+from Load_Balance.AnytimeSearch import AnytimeSearch
+from Load_Balance.ParallelSearch import ParallelSearch
+from Load_Balance.LayoutPlanner import LayoutPlanner
+from Load_Balance.SearchStats import SearchStats
+from Load_Balance.SamplingProfiler import profile_search, profile_path
+from Load_Balance.Diagnostics import get_logger
+from consts import SHIP_HEIGHT, SHIP_WIDTH, MAX_SEARCH_NODES, MAX_SEARCH_BYTES, SEARCH_WORKERS, BALANCE_TWO_PHASE, PROFILE_SOLVES
 from Manifest import Manifest
 
+log = get_logger("Balancer")
+
 ## Balancer will balance the containers in the manifest
 ## Edits the manifest and saves the edited file using Manifest
 ## The edited manifest will be the result of completing all listed moves
+## max_nodes and max_bytes bound the memory used by the search, with both None it runs an unbounded A*
+## with more than one worker the search is spread over that many processes
+## with a time_limit the best plan found in that many seconds is returned instead, within the same memory budget
+## the anytime passes run in this process whatever the workers
+## if the search has no plan by then the two phase plan is returned (see LayoutPlanner), if there is none either
+## out_of_time is set and no moves are returned, the manifest is left as it is
+## bound is how far from optimal the plan can be, None if that is not known (see Search)
+## progress is called with the SearchStats of the search as it runs, if it returns True the search stops (see Search)
+## and the best plan found so far is returned, no moves if there is none
+## with profile the phases of the search are timed into stats and a sampled profile of the solve is written
+## to profile_file, a collapsed stack file next to the log (see SamplingProfiler), set ARK_PROFILE=1 to profile every solve
+## with two_phase a target layout is picked first and only the order of the moves is worked out (see LayoutPlanner)
+## that is much faster on heavy ships but the plan is not optimal, the search is only run if no plan is found that way
 class Balancer:
-    def __init__(self, manifest: Manifest):
+    def __init__(self, manifest: Manifest, max_nodes: int = MAX_SEARCH_NODES, max_bytes: int = MAX_SEARCH_BYTES, workers: int = SEARCH_WORKERS, two_phase: bool = BALANCE_TWO_PHASE, progress=None, profile: bool = PROFILE_SOLVES):
         self.manifest = manifest
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.two_phase = two_phase
+        self.bound = None
+        self.out_of_time = False # the time limit passed before any plan was found
+        self.progress = progress
+        self.profile = profile
+        self.profile_file = None # where the profile of the last solve was written
+        self.stats = SearchStats() # what the search did to find the plan
 
     ## Given a list of containers to load and a list of containers to unload
     ## return the Moves the operator needs to perform
     ## will update the manifest
-    def balance(self):
-        states = [BalanceState(self.manifest)]
-        states[0].calculate_h()
+    ## with a time_limit (seconds) a plan is returned when it runs out, the two phase plan if the search has none yet
+    def balance(self, time_limit: float = None):
+        state = BalanceState(self.manifest)
+        state.calculate_h()
+        self.out_of_time = False
         
-        if states[0].h == float('inf'):
-            print("(Balancer)This ship cannot be balanced")
+        # no split of the weights is balanced, wherever the containers go
+        if not state.partition.feasible:
+            log.info("this ship cannot be balanced")
+            self.bound = 1.0
             return []
-        
-        culled_states = []
-        visited = set()
-        visited.add(states[0])
-
-        # frontier counter
-        f = 0
 
-        print("(Balancer)frontier " + str(f) + " states: " + str(len(states)))
+        if self.two_phase:
+            goal = LayoutPlanner(state).plan()
+            if goal is not None:
+                self.bound = float('inf') # no guarantee how far from optimal the plan is
+                self.update_manifest(goal)
+                return goal.moves
+            log.info("no two phase plan found, searching instead")
 
-        # searching for the goal state by popping the best seen state off the heap and expanding it
-        while states:
-            state = heapq.heappop(states)
+        search = self.make_search(time_limit)
+        if self.profile:
+            self.profile_file = profile_path(self.manifest.manifest_name, "balance")
+            goal = profile_search(search, [state], self.profile_file)
+        else:
+            goal = search.search([state])
+        self.stats = search.stats
 
-            # if this is a goal state we found a good solution
-            if(state.is_goal()):
-                self.update_manifest(state)
-                return state.moves
-
-            if not states and culled_states:
-                print("(Balancer)re-expanding " + str(STATE_CULL) + " states")
-                for _ in range(STATE_CULL):
-                    heapq.heappush(states, heapq.heappop(culled_states))
-            
-            n_states = state.next_states()
-            if f % 100 == 0:
-                print("(Balancer)frontier " + str(f) + " states: " + str(len(states)) + " current best g: " + str(state.g) + " h: " + str(state.h))
-            f += 1
-            
-            for n_state in n_states:
-                if n_state not in visited:
-                    visited.add(n_state)
-                    heapq.heappush(states, n_state)
+        # the progress callback stopped the search before it had a plan, the manifest is left as it is
+        if goal is None and search.stats.aborted:
+            self.bound = None
+            return []
 
-            # cull states to re exapand later if needed
-            keep_states = []
-            if len(states) > MAX_STATES:
-                print("(Balancer)culling " + str(len(states)-STATE_CULL) + " states")
-                # save the STATE_CULL best states
-                for _ in range(STATE_CULL):
-                    heapq.heappush(keep_states, heapq.heappop(states))
+        # out of time before the search had a plan, the two phase plan is found much faster
+        if goal is None and search.out_of_time:
+            goal = LayoutPlanner(state).plan()
+            if goal is None:
+                log.warning("no plan found in %s seconds", time_limit)
+                self.out_of_time = True
+                self.bound = None
+                return []
+            self.bound = float('inf')
+            self.update_manifest(goal)
+            return goal.moves
 
-                for s in states:
-                    heapq.heappush(culled_states, s)
-                
-                states = keep_states
+        assert goal is not None, "No solution found, fire joey8angelo"
+        self.bound = search.bound
+        self.update_manifest(goal)
+        return goal.moves
 
-        assert False, "No solution found, fire joey8angelo"
+    def make_search(self, time_limit=None):
+        if time_limit is not None:
+            return AnytimeSearch("Balancer", time_limit, max_nodes=self.max_nodes, max_bytes=self.max_bytes, progress=self.progress)
+        if self.workers is not None and self.workers > 1:
+            return ParallelSearch("Balancer", self.workers, self.progress)
+        if self.max_nodes is None and self.max_bytes is None:
+            return Search("Balancer", self.progress)
+        return SMAStar("Balancer", self.max_nodes, self.max_bytes, self.progress)
     
     def update_manifest(self, state):
-        for i,row in enumerate(state.ship):
-            if i >= SHIP_HEIGHT:
-                break
-            for j,container in enumerate(row):
+        for i in range(SHIP_HEIGHT):
+            for j in range(SHIP_WIDTH):
+                container = state.ship_at(i, j)
                 if container:
                     self.manifest.set_at(i+1, j+1, container)
 
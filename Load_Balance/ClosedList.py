@@ -0,0 +1,38 @@
+'''
+    ClosedList remembers every state a search has opened and the lowest g it was reached with
+    a state reached again with the same or a higher g is a duplicate and is dropped
+    a state reached again with a lower g is re-opened, the copy already on the heap becomes stale
+
+    states are keyed on their identity (__hash__ and __eq__), not on the moves that reached them
+'''
+class ClosedList:
+    def __init__(self):
+        self.best_g = {}
+        self.reopened = 0 # states opened again with a lower g
+
+    # check if state is new or improves on the best g seen for it
+    # does not record anything so it can be used to filter successors before they are copied
+    def improves(self, state):
+        g = self.best_g.get(state)
+        return g is None or state.g < g
+
+    # record that state has been opened with its g
+    # returns False, recording nothing, if it does not improve on the best g seen for it
+    def add(self, state):
+        g = self.best_g.get(state)
+        if g is not None:
+            if state.g >= g:
+                return False
+            self.reopened += 1
+        self.best_g[state] = state.g
+        return True
+
+    # check if a state popped off the heap has since been opened again with a lower g
+    def is_stale(self, state):
+        return state.g > self.best_g.get(state, state.g)
+
+    def __contains__(self, state):
+        return state in self.best_g
+
+    def __len__(self):
+        return len(self.best_g)
@@ -0,0 +1,71 @@
+from consts import SHIP_ROWS, SHIP_WIDTH, SHIP_CELLS, BUFF_HEIGHT, BUFF_WIDTH, BUFF_CELLS, ZOBRIST_SEED, HEURISTIC_CACHE_SIZE
+from Load_Balance.Position import Location
+from Load_Balance.HeuristicCache import HeuristicCache
+from ContainerData import ContainerData
+import random
+
+NAN = 0     # id of a cell that can never hold a container
+UNUSED = 1  # id of an empty cell
+
+'''
+    ContainerTable interns the containers used by a search
+    States store small integer ids in a packed array instead of ContainerData objects,
+    the table maps those ids back to the ContainerData they stand for
+    one table is shared by every state of a search and is never copied
+    containers with the same name and weight are interchangeable and share an id
+
+    the table also holds the zobrist keys used to hash states
+        keys[id][i] is a random 64 bit key for container id in cell i, 0 for NAN and UNUSED cells
+        crane_keys[(location, m, n)] is a random key for each position the crane can be in
+        target_keys[i] is a random key for cell i holding a container that has to be unloaded
+    keys are drawn from a fixed seed so the same containers get the same keys in every process
+
+    h_cache is the heuristic cache of the search, keyed on those hashes (see HeuristicCache)
+    stats are the SearchStats of the search running on the states, None if there is none
+'''
+class ContainerTable:
+    def __init__(self):
+        self.containers = [None, ContainerData()]
+        self.ids = {}
+        self.random = random.Random(ZOBRIST_SEED)
+        self.keys = [[0]*(SHIP_CELLS+BUFF_CELLS), [0]*(SHIP_CELLS+BUFF_CELLS)]
+        self.crane_keys = {}
+        for m in range(SHIP_ROWS+1):
+            for n in range(SHIP_WIDTH):
+                self.crane_keys[(Location.SHIP, m, n)] = self.random.getrandbits(64)
+        for m in range(BUFF_HEIGHT+1):
+            for n in range(BUFF_WIDTH):
+                self.crane_keys[(Location.BUFFER, m, n)] = self.random.getrandbits(64)
+        self.crane_keys[(Location.TRUCK, 0, 0)] = self.random.getrandbits(64)
+        self.crane_keys[(Location.CRANE_REST, 0, 0)] = self.random.getrandbits(64)
+        self.target_keys = [self.random.getrandbits(64) for _ in range(SHIP_CELLS+BUFF_CELLS)]
+        self.h_cache = HeuristicCache(HEURISTIC_CACHE_SIZE)
+        self.stats = None
+
+    # return the id of a container, adding it to the table if it has not been seen yet
+    # a NAN cell is passed as None
+    def intern(self, container: ContainerData):
+        if container is None:
+            return NAN
+        if container.name == "UNUSED":
+            return UNUSED
+
+        key = (container.name, container.weight)
+        id = self.ids.get(key)
+        if id is None:
+            id = len(self.containers)
+            self.containers.append(container)
+            self.ids[key] = id
+            self.keys.append([self.random.getrandbits(64) for _ in range(SHIP_CELLS+BUFF_CELLS)])
+        return id
+
+    # the zobrist key for the crane being at pos
+    def crane_key(self, pos):
+        return self.crane_keys[(pos.location, pos.m, pos.n)]
+
+    # the ContainerData for an id, None for a NAN cell
+    def get(self, id):
+        return self.containers[id]
+
+    def __len__(self):
+        return len(self.containers)
@@ -0,0 +1,71 @@
+import logging
+import sys
+import time
+from consts import DIAGNOSTICS_LEVEL, DIAGNOSTICS_INTERVAL
+
+'''
+    Diagnostics is where the solver reports what it is doing, for whoever is working on it
+    it is not the audit log of what the operator did (Logger.py), nothing written here goes there
+
+    it is the standard logging module, under the "solver" logger, get_logger gives each part of the solver a child of it
+        DEBUG: search progress, every PROGRESS_INTERVAL states expanded
+        INFO: what a solve did, the plans each pass of AnytimeSearch found, fallbacks, profiles written
+        WARNING: something unexpected the solver carried on from
+    the level is DIAGNOSTICS_LEVEL (ARK_LOG_LEVEL in the environment), a message below it costs a level check,
+    its arguments are only formatted into it when it is shown, so values are passed as arguments, not added to the message
+
+    nothing is shown until configure is called, the GUI and solve.py do at startup
+    configure adds a RateLimit so a message from a busy loop is shown at most once every DIAGNOSTICS_INTERVAL seconds
+    once configured the messages are not passed on to the root logger, an application that logs too does not show them twice
+'''
+solver_log = logging.getLogger("solver")
+solver_log.setLevel(DIAGNOSTICS_LEVEL)
+solver_log.addHandler(logging.NullHandler())
+
+handler = None # the handler added by configure
+
+# the logger of a part of the solver, name is what the messages are shown as coming from
+def get_logger(name):
+    return logging.getLogger("solver." + name)
+
+## show the diagnostics of the solver on stream (stderr by default) from level up
+## calling it again replaces the handler it added before
+def configure(level=DIAGNOSTICS_LEVEL, stream=None, interval=DIAGNOSTICS_INTERVAL):
+    global handler
+    if handler is not None:
+        solver_log.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    handler.addFilter(RateLimit(interval))
+    solver_log.addHandler(handler)
+    solver_log.setLevel(level)
+    solver_log.propagate = False
+    return handler
+
+'''
+    RateLimit lets a message through at most once every interval seconds, errors are always let through
+    messages are told apart by their logger and their text before formatting, so progress messages
+    with different values count as the same message
+    the next message let through says how many like it were dropped
+'''
+class RateLimit(logging.Filter):
+    def __init__(self, interval: float = DIAGNOSTICS_INTERVAL):
+        super().__init__()
+        self.interval = interval
+        self.shown = {}   # (logger, message) -> time it was last let through
+        self.dropped = {} # (logger, message) -> number dropped since
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        shown = self.shown.get(key)
+        if shown is not None and now - shown < self.interval:
+            self.dropped[key] = self.dropped.get(key, 0) + 1
+            return False
+        self.shown[key] = now
+        dropped = self.dropped.pop(key, 0)
+        if dropped:
+            record.msg = str(record.msg) + " (" + str(dropped) + " more like this dropped)"
+        return True
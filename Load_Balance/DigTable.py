@@ -0,0 +1,52 @@
+from consts import SHIP_ROWS, SHIP_WIDTH, BUFF_HEIGHT, BUFF_WIDTH
+from Load_Balance.Position import Location, EXIT_COST, TRANSFER_COST
+
+'''
+    DigTable is a pattern database of the cost of digging a container out of its column
+    digging moves every container above it to another column, one at a time from the top, and brings the crane back each time
+    the cost depends only on the column, its height and the depth of the container, so it is worked out once per vessel
+    (the NAN cells at the bottom of each column) and looked up in O(1) during the search
+
+    each container is carried to the cheapest cell it could ever be put down on and the crane comes back down the column
+    the other columns are taken to be as low as they can be, so nothing is climbed over on the way
+    the cost never overestimates the real one, the containers can also go to the buffer
+
+    prefix[n][m] is the cost of digging out, one after the other, the containers in rows below m of column n,
+    so digging down to the container at row m of a column whose top is at row top-1 costs prefix[n][top] - prefix[n][m+1]
+'''
+class DigTable:
+    def __init__(self, ship_floor):
+        self.prefix = []
+        # cheapest round trip from the ship to the buffer and back, on top of leaving and coming back to the ship
+        buffer = 2*(TRANSFER_COST[Location.SHIP][Location.BUFFER] + min(EXIT_COST[Location.BUFFER][:BUFF_HEIGHT*BUFF_WIDTH]))
+        for n in range(SHIP_WIDTH):
+            prefix = [0]
+            for m in range(SHIP_ROWS):
+                prefix.append(prefix[-1] + (self.step(ship_floor, n, m, buffer) if m > ship_floor[n] else 0))
+            self.prefix.append(prefix)
+
+    # cost of moving the container at row m off the top of column n and getting the crane back to row m-1
+    # put down at row r of column j it costs |m-r| + |r-(m-1)| + 2|n-j|, r can be no lower than the floor of j
+    def step(self, ship_floor, n, m, buffer):
+        best = buffer + EXIT_COST[Location.SHIP][m*SHIP_WIDTH + n] + EXIT_COST[Location.SHIP][(m-1)*SHIP_WIDTH + n]
+        for j in range(SHIP_WIDTH):
+            if j != n:
+                r = max(m, ship_floor[j])
+                best = min(best, abs(m - r) + abs(r - (m-1)) + 2*abs(n - j))
+        return best
+
+    ## the cost of digging down to the container at row m of column n, the top container of the column is at row top-1
+    def cost(self, n, top, m):
+        return self.prefix[n][top] - self.prefix[n][m+1]
+
+# one table per vessel, the vessel is told apart by its floor
+tables = {}
+
+## the DigTable of the vessel with the given floor, it is built the first time it is asked for
+def dig_table(ship_floor):
+    key = tuple(ship_floor)
+    table = tables.get(key)
+    if table is None:
+        table = DigTable(ship_floor)
+        tables[key] = table
+    return table
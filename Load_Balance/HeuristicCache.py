@@ -0,0 +1,44 @@
+from collections import OrderedDict
+
+'''
+    HeuristicCache remembers the h of states that have been scored, least recently used entries are dropped first
+    states are keyed on their zobrist hash (see State.cache_key), two different states with the same key
+    would share an h but with 64 bit keys that is not expected to happen
+    one cache is shared by every state of a search through the ContainerTable
+
+    size is the most entries kept, None for no limit and 0 to cache nothing
+    the cache is not counted against the memory budget of SMAStar, size is what bounds it
+    hits and misses count the lookups that found an h and the ones that had to calculate it
+'''
+class HeuristicCache:
+    def __init__(self, size: int = None):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # the h cached for key, None if it is not cached
+    def get(self, key):
+        h = self.entries.get(key)
+        if h is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return h
+
+    def put(self, key, h):
+        if self.size == 0:
+            return
+        self.entries[key] = h
+        self.entries.move_to_end(key)
+        if self.size is not None and len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,259 @@
+import itertools
+from consts import SHIP_HEIGHT, SHIP_WIDTH, SHIP_ROWS, PLAN_COMBINATIONS, PLAN_ORDERINGS
+from Load_Balance.Position import Position, Location, cost
+from Load_Balance.Partition import is_balanced
+from Move import Move
+
+INF = float('inf')
+
+'''
+    LayoutPlanner balances a ship in two phases instead of searching every move
+        layout: pick the target arrangement
+            which containers cross the centre line, the fewest that give a balanced split (Partition.min_moves)
+            and still fit in each half, the cheapest such set is looked for first, at most PLAN_COMBINATIONS sets are tried
+            if none is found that way the heaviest container that fits is moved until the ship is balanced, like the heuristic
+            which column each crossing container goes to, a min cost assignment of the containers to the open slots
+            on the other half, priced with the move cost tables (see Position.cost)
+        sequencing: find the order to move the containers in
+            every order of the crossing containers is tried if there are at most PLAN_ORDERINGS of them, otherwise
+            the topmost go first
+            containers in the way are moved aside on their own half, never onto a container that still has to cross
+            a container with nowhere to go on its half is parked in the ship_buff rows above it
+            and put down once everything has crossed, this lets containers swap halves on a full ship
+            the cheapest order is the plan
+
+    the plan is not optimal, it only moves the containers the layout picked
+    plan returns None if no layout or order works out, Balancer searches instead then
+'''
+class LayoutPlanner:
+    def __init__(self, state):
+        self.state = state # BalanceState to balance, it is not changed
+
+    ## return a goal state with the moves of the plan, None if no plan was found
+    def plan(self):
+        state = self.state
+        if state.partition is None or not state.partition.feasible:
+            return None
+        if is_balanced(state.left_weight, state.right_weight):
+            return self.finish(state.clone())
+
+        crossing = self.choose_crossing()
+        if crossing is None:
+            return None
+        columns = self.assign_columns(crossing)
+        if columns is None:
+            return None
+
+        if len(crossing) <= PLAN_ORDERINGS:
+            orders = itertools.permutations(crossing)
+        else:
+            orders = [sorted(crossing, key=lambda p: -p[0])]
+
+        best = None
+        for order in orders:
+            goal = self.sequence(order, columns)
+            if goal is not None and (best is None or goal.g < best.g):
+                best = goal
+        return best
+
+    # containers that could cross, (estimated cost, m, n, weight, on the left) cheapest first
+    # the estimate is the distance to the centre line and the containers that have to be moved off it first
+    def candidates(self):
+        state = self.state
+        items = []
+        for m in range(SHIP_HEIGHT):
+            for n in range(SHIP_WIDTH):
+                container = state.ship_at(m, n)
+                if container and container.weight > 0:
+                    left = n < SHIP_WIDTH//2
+                    distance = SHIP_WIDTH//2 - n if left else n - SHIP_WIDTH//2 + 1
+                    above = len(state.containers_above(Position(Location.SHIP, [m, n])))
+                    items.append((2*distance + 4*above, m, n, container.weight, left))
+        items.sort()
+        return items
+
+    # number of open cells below the top of the ship on each half
+    def free_cells(self):
+        free = [0, 0]
+        for n in range(SHIP_WIDTH):
+            top = SHIP_ROWS - self.state.ship_height_map[n] # the open position of column n
+            free[n >= SHIP_WIDTH//2] += max(0, SHIP_HEIGHT - top)
+        return free
+
+    # the (m, n) of the containers to move to the other half
+    def choose_crossing(self):
+        state = self.state
+        items = self.candidates()
+        total = state.left_weight + state.right_weight
+        (free_left, free_right) = self.free_cells()
+
+        # the cheapest of the smallest sets that fit, tried in order of their estimated cost
+        tried = 0
+        for k in range(state.partition.min_moves, len(items)+1):
+            best = None
+            for combination in itertools.combinations(items, k):
+                left = state.left_weight
+                to_left = 0
+                for (_, _, _, weight, from_left) in combination:
+                    left += -weight if from_left else weight
+                    to_left += -1 if from_left else 1
+                if is_balanced(left, total - left) and to_left <= free_left and -to_left <= free_right:
+                    estimate = sum(item[0] for item in combination)
+                    if best is None or estimate < best[0]:
+                        best = (estimate, combination)
+                tried += 1
+                if tried >= PLAN_COMBINATIONS:
+                    break
+            if best is not None:
+                return [(m, n) for (_, m, n, _, _) in best[1]]
+            if tried >= PLAN_COMBINATIONS:
+                break
+
+        # move the heaviest container that fits from the heavier half until the ship is balanced
+        left = state.left_weight
+        crossing = []
+        remaining = sorted(items, key=lambda item: -item[3])
+        while not is_balanced(left, total - left):
+            heavy_left = left > total - left
+            fits = [item for item in remaining if item[4] == heavy_left and item[3] < abs(2*left - total)]
+            if not fits:
+                return None
+            item = fits[0]
+            remaining.remove(item)
+            left += -item[3] if heavy_left else item[3]
+            crossing.append((item[1], item[2]))
+        return crossing
+
+    # map each crossing container to the column it goes to
+    # the open slots of each column on the other half, stacked up to the top of the ship, are assigned to the containers
+    # by min cost, the containers going each way are assigned on their own
+    # a column has a slot more for each crossing container that leaves it
+    def assign_columns(self, crossing):
+        state = self.state
+        columns = {}
+        for to_left in (True, False):
+            movers = [(m, n) for (m, n) in crossing if (n >= SHIP_WIDTH//2) == to_left]
+            if not movers:
+                continue
+            slots = []
+            for n in (range(SHIP_WIDTH//2) if to_left else range(SHIP_WIDTH//2, SHIP_WIDTH)):
+                top = SHIP_ROWS - state.ship_height_map[n] - sum(1 for (_, cn) in crossing if cn == n)
+                for m in range(top, min(SHIP_HEIGHT, top + len(movers))):
+                    slots.append((m, n))
+            if len(slots) < len(movers):
+                return None
+            costs = [[cost(Position(Location.SHIP, [m, n]), Position(Location.SHIP, [sm, sn]), state) for (sm, sn) in slots]
+                     for (m, n) in movers]
+            for (mover, k) in zip(movers, assign(costs)):
+                columns[mover] = slots[k][1]
+        return columns
+
+    # carry out the moves in order on a copy of the state, return the goal reached or None
+    def sequence(self, order, columns):
+        state = self.state.clone()
+        pending = {pos: columns[pos] for pos in order} # containers still to cross and the column each goes to
+
+        def aside(n):
+            # a container in the way stays on its half, out of its own column and off the containers still to cross
+            left = n < SHIP_WIDTH//2
+            blocked = {pn for (_, pn) in pending}
+            return lambda p: INF if (p.n < SHIP_WIDTH//2) != left or p.n in blocked else 0
+
+        def to_column(column):
+            return lambda p: 0 if p.n == column else INF
+
+        for start in order:
+            if start not in pending:
+                continue
+            pos = Position(Location.SHIP, list(start))
+            for above in reversed(state.containers_above(pos)):
+                key = (above.m, above.n)
+                h_func = to_column(pending.pop(key)) if key in pending else aside(above.n)
+                if not self.carry(state, above, h_func):
+                    return None
+            if not self.carry(state, pos, to_column(pending.pop(start))):
+                return None
+
+        # put the parked containers down on their half, top down
+        for m in range(SHIP_ROWS-1, SHIP_HEIGHT-1, -1):
+            for n in range(SHIP_WIDTH):
+                if state.occupied(Location.SHIP, m, n):
+                    left = n < SHIP_WIDTH//2
+                    if not self.carry(state, Position(Location.SHIP, [m, n]), lambda p: INF if (p.n < SHIP_WIDTH//2) != left else 0, False):
+                        return None
+
+        return self.finish(state)
+
+    # move the container at pos to the cheapest position h_func allows, False if there is none
+    # the ship_buff rows are only used if park is set and there is no room below the top of the ship
+    def carry(self, state, pos, h_func, park=True):
+        if state.crane_position != pos:
+            (prev, c) = state.crane_position.move_to(pos, state)
+            state.moves.append(Move(prev, pos, c))
+            state.g += c
+
+        (move_to, c) = state.search_from(pos, False, False, h_func)
+        if move_to is None and park:
+            (move_to, c) = state.search_from(pos, False, True, h_func)
+        if move_to is None:
+            return False
+        container = state.at(pos)
+        state.swap(pos, move_to)
+        state.crane_position = move_to.copy()
+        state.moves.append(Move(pos, move_to, c, container))
+        state.g += c
+        return True
+
+    # return the crane to the crane rest, the plan has to end there like any other
+    def finish(self, state):
+        if not state.crane_position.in_crane_rest():
+            (prev, c) = state.crane_position.move_to(Position(Location.CRANE_REST))
+            state.moves.append(Move(prev, state.crane_position, c))
+            state.g += c
+        return state if state.is_goal() else None
+
+## min cost assignment of rows to columns (hungarian algorithm), there must be no more rows than columns
+## return the column assigned to each row
+def assign(costs):
+    rows = len(costs)
+    cols = len(costs[0])
+    u = [0]*(rows+1)
+    v = [0]*(cols+1)
+    match = [0]*(cols+1) # row matched to each column, 1 based, 0 if none
+    way = [0]*(cols+1)
+    for i in range(1, rows+1):
+        match[0] = i
+        j0 = 0
+        low = [INF]*(cols+1)
+        used = [False]*(cols+1)
+        while match[j0] != 0:
+            used[j0] = True
+            i0 = match[j0]
+            delta = INF
+            j1 = 0
+            for j in range(1, cols+1):
+                if not used[j]:
+                    c = costs[i0-1][j-1] - u[i0] - v[j]
+                    if c < low[j]:
+                        low[j] = c
+                        way[j] = j0
+                    if low[j] < delta:
+                        delta = low[j]
+                        j1 = j
+            for j in range(cols+1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    low[j] -= delta
+            j0 = j1
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    result = [0]*rows
+    for j in range(1, cols+1):
+        if match[j]:
+            result[match[j]-1] = j-1
+    return result
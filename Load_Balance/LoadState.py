@@ -1,9 +1,9 @@
-from consts import SHIP_VIRTUAL_CELL
-from Load_Balance.State import State
-from Load_Balance.Position import Position, Location
+from consts import SHIP_VIRTUAL_CELL, SHIP_ROWS
+from Load_Balance.State import State, cell_index
+from Load_Balance.Position import Position, Location, CRANE_REST, cost
+from Load_Balance.DigTable import dig_table
 from Move import Move
 from ContainerData import ContainerData
-import copy
 
 '''
     State subclass for Loading/unloading
@@ -15,25 +15,68 @@ import copy
             moving the crane back to the crane rest
             moving containers out of the buffers
     the heuristic of a state is 
-        manhattan distance of each container to unload
+        manhattan distance of each container to unload, and the cost to dig it out of its column
+        for each choice, the cheapest count of its containers by the same estimate
         distance to load any container
         distance to move each container out of the buffers
+
+    unload_choices are containers to unload when the ship has more of them with the same name than are asked for
+    each choice is (count, positions), any count of the containers at positions will do
+    which ones is decided by the search, unloading one of them is a successor like unloading a container in containers_to_unload
+    a container of a choice in the way of another is moved aside like any other and dropped from the choice, so the positions
+    of a choice stay valid, unloading it instead is its own successor, moving it can be cheaper when the others are easier to reach
 '''
 class LoadState(State):
-    def __init__(self, containers_to_load=[], containers_to_unload=[], manifest=None):
+    def __init__(self, containers_to_load=[], containers_to_unload=[], manifest=None, unload_choices=[]):
         self.containers_to_load = containers_to_load
         self.containers_to_unload = containers_to_unload
+        self.unload_choices = unload_choices
         super().__init__(manifest)
+
+        # intern the containers to load up front so the table does not change during the search
+        for container in self.containers_to_load:
+            self.table.intern(container)
+
+    def clone(self):
+        state = super().clone()
+        state.containers_to_load = self.containers_to_load[:]
+        state.containers_to_unload = self.containers_to_unload[:]
+        state.unload_choices = self.unload_choices[:]
+        return state
+
+    # two states with the same cells are only the same if they still have the same work left to do
+    # the containers left to unload are hashed by their cells, the containers to load are always loaded in order
+    def __eq__(self, other):
+        if not super().__eq__(other):
+            return False
+        return (len(self.containers_to_load) == len(other.containers_to_load) and set(self.containers_to_unload) == set(other.containers_to_unload)
+                and sorted(self.unload_choices, key=choice_key) == sorted(other.unload_choices, key=choice_key))
+
+    def __hash__(self) -> int:
+        key = super().__hash__()
+        for pos in self.containers_to_unload:
+            key ^= self.table.target_keys[cell_index(pos.location, pos.m, pos.n)]
+        for (count, positions) in self.unload_choices:
+            key ^= count
+            for pos in positions:
+                key ^= self.table.target_keys[cell_index(pos.location, pos.m, pos.n)] >> 1
+        return key
     
+    # the hash leaves out the containers to load, their number changes the heuristic
+    def cache_key(self):
+        return (hash(self), len(self.containers_to_load))
+
     # calculate the heuristic cost of this state
     def calculate_h(self):
         self.h = 0
 
-        # manhattan distance of each container to unload to ship virtual cell + 2*number of containers above it
+        # manhattan distance of each container to unload to ship virtual cell + the cost to dig it out
         for pos in self.containers_to_unload:
-            self.h += abs(pos.m - SHIP_VIRTUAL_CELL[0]) + abs(pos.n - SHIP_VIRTUAL_CELL[1])
-            for above in self.containers_above(pos):
-                self.h += self.search_from(above, True, True)[1]
+            self.h += self.unload_estimate(pos)
+
+        # the cheapest containers of each choice
+        for (count, positions) in self.unload_choices:
+            self.h += sum(sorted(self.unload_estimate(pos) for pos in positions)[:count])
 
 
         # distance to load any container to the best open position in the ship
@@ -45,119 +88,180 @@ class LoadState(State):
 
         # distance to move the crane to the crane rest
         if not self.crane_position.in_crane_rest():
-            self.h += self.crane_position.move_to(Position(Location.CRANE_REST), apply_move=False)[1]
+            self.h += cost(self.crane_position, CRANE_REST)
+
+    # manhattan distance of a container to unload to ship virtual cell + the cost to dig it out of its column (see DigTable)
+    def unload_estimate(self, pos):
+        h = abs(pos.m - SHIP_VIRTUAL_CELL[0]) + abs(pos.n - SHIP_VIRTUAL_CELL[1])
+        return h + dig_table(self.ship_floor).cost(pos.n, SHIP_ROWS - self.ship_height_map[pos.n], pos.m)
 
-    def next_states(self):
+    # is_new is called on each successor before it is copied, successors it rejects are dropped
+    def next_states(self, is_new=None):
         states = []
 
-        self.load(states)              # generate state produced by loading a container
-        self.unload(states)            # generate states produced by unloading a container
-        self.clear_buffers(states)     # generate states produced by moving containers out of the buffers
-        self.return_crane_rest(states) # generate state produced by moving the crane back to the crane rest
+        self.load(states, is_new)              # generate state produced by loading a container
+        self.unload(states, is_new)            # generate states produced by unloading a container
+        self.clear_buffers(states, is_new)     # generate states produced by moving containers out of the buffers
+        self.return_crane_rest(states, is_new) # generate state produced by moving the crane back to the crane rest
 
         return states
+
+    # the lists of containers to load and unload are restored with the rest of the state
+    def mark(self):
+        return (super().mark(), self.containers_to_load[:], self.containers_to_unload[:], self.unload_choices[:])
+
+    def undo(self, mark):
+        (state_mark, containers_to_load, containers_to_unload, unload_choices) = mark
+        super().undo(state_mark)
+        self.containers_to_load = containers_to_load[:]
+        self.containers_to_unload = containers_to_unload[:]
+        self.unload_choices = unload_choices[:]
     
     # check if the state is a goal state
     # if there are no containers to load or unload
     # if there are no containers in the buffers
     # if the crane is at rest position
     def is_goal(self):
-        return not self.containers_to_load and not self.containers_to_unload and not self.containers_in_buffers() and self.crane_position.in_crane_rest()
+        return not self.containers_to_load and not self.containers_to_unload and not self.unload_choices and not self.containers_in_buffers() and self.crane_position.in_crane_rest()
 
     # generate states by loading any container from the truck into the ship
-    def load(self, states):
+    def load(self, states, is_new=None):
         if self.containers_to_load:
-            state = copy.deepcopy(self)
-            container = state.containers_to_load.pop()
+            mark = self.mark()
+            container = self.containers_to_load.pop()
 
             # move to the truck
             if not self.crane_position.in_truck():
-                (prev, cost) = state.crane_position.move_to(Position(Location.TRUCK))
-                state.moves.append(Move(prev, copy.deepcopy(state.crane_position), cost))
-                state.g += cost
+                (prev, cost) = self.crane_position.move_to(Position(Location.TRUCK))
+                self.moves.append(Move(prev, self.crane_position.copy(), cost))
+                self.g += cost
 
             # move to virtual cell
-            (_, costV) = state.crane_position.move_to(Position(Location.SHIP, SHIP_VIRTUAL_CELL))
-            state.g += costV
+            (_, costV) = self.crane_position.move_to(Position(Location.SHIP, SHIP_VIRTUAL_CELL))
+            self.g += costV
 
             # get the best open position in the ship
-            (open, cost) = state.search_from(Position(Location.SHIP, SHIP_VIRTUAL_CELL), False, False, state.unloading_containers_below)
+            (open, cost) = self.search_from(Position(Location.SHIP, SHIP_VIRTUAL_CELL), False, False, self.unloading_containers_below)
             if open is None:
+                self.undo(mark)
                 return
 
             # move the container to the open position from truck
-            (_, cost) = state.crane_position.move_to(open, cost)
-            state.moves.append(Move(Position(Location.TRUCK), copy.deepcopy(state.crane_position), cost+costV, container))
-            state.g += cost
+            (_, cost) = self.crane_position.move_to(open, cost)
+            self.moves.append(Move(Position(Location.TRUCK), self.crane_position.copy(), cost+costV, container))
+            self.g += cost
 
             # set the container at the open position
-            state.ship[open.m][open.n] = container
-            state.ship_height_map[open.n] -= 1
-
-            state.calculate_h()
+            self.set_at(open, container)
 
-            states.append(state)
+            self.emit(states, mark, is_new)
 
 
     # generate states by unloading all containers to unload
-    def unload(self, states):
+    # and any container of each choice, the choice is made smaller by one
+    def unload(self, states, is_new=None):
+        mark = self.mark()
         for i in range(len(self.containers_to_unload)):
             pos = self.containers_to_unload[i]
+            self.containers_to_unload.pop(i)
+            self.unload_at(pos, states, mark, is_new)
 
-            state = copy.deepcopy(self)
-            state.containers_to_unload.pop(i)
-            container = state.ship[pos.m][pos.n]
-
-            containers_above = state.containers_above(pos)
-            prev = self.crane_position
-            bad = False
-            while containers_above:
-                above_pos = containers_above.pop()
-                if above_pos in state.containers_to_unload:
-                    bad = True
-                    break
-                # move to the current container to move
-                if prev != above_pos:
-                    (prev, cost) = state.crane_position.move_to(above_pos, state.ship if above_pos.in_ship() else state.buffer)
-                    state.moves.append(Move(prev, above_pos, cost))
-                    state.g += cost
-
-                # search for a good place to move the container
-                (move_to, cost) = state.search_from(above_pos, True, True, state.unloading_containers_below)
-                state.swap(above_pos, move_to)
-                state.crane_position = copy.deepcopy(move_to)
-                state.moves.append(Move(above_pos, move_to, cost, state.ship[move_to.m][move_to.n]))
-                state.g += cost
-
-            if bad:
-                continue
-
-            # move to the container
-            if state.crane_position != pos:
-                (prev, cost) = state.crane_position.move_to(pos, state.ship if pos.in_ship() else state.buffer)
-                state.moves.append(Move(prev, pos, cost))
-                state.g += cost
-
-            # move the container to the truck
-            (prev, cost) = state.crane_position.move_to(Position(Location.TRUCK))
-            state.moves.append(Move(prev, Position(Location.TRUCK), cost, container))
-            state.g += cost
-
-            # remove the container from the ship
-            state.ship[prev.m][prev.n] = ContainerData()
-            state.ship_height_map[prev.n] += 1
-
-            state.calculate_h()
-
-            states.append(state)
+        for i in range(len(self.unload_choices)):
+            (count, positions) = self.unload_choices[i]
+            for pos in positions:
+                rest = tuple(p for p in positions if p != pos)
+                if count == 1:
+                    self.unload_choices.pop(i)
+                elif count-1 == len(rest):
+                    # no choice is left, all the others have to be unloaded
+                    self.unload_choices.pop(i)
+                    self.containers_to_unload.extend(rest)
+                else:
+                    self.unload_choices[i] = (count-1, rest)
+                self.unload_at(pos, states, mark, is_new)
+
+    # unload the container at pos, moving the containers above it out of the way
+    # the container has already been taken off the lists of containers to unload
+    def unload_at(self, pos, states, mark, is_new=None):
+        container = self.at(pos)
+
+        containers_above = self.containers_above(pos)
+        prev = self.crane_position
+        bad = False
+        while containers_above:
+            above_pos = containers_above.pop()
+            if above_pos in self.containers_to_unload:
+                bad = True
+                break
+            self.drop_choice(above_pos)
+            # move to the current container to move
+            if prev != above_pos:
+                (prev, cost) = self.crane_position.move_to(above_pos, self)
+                self.moves.append(Move(prev, above_pos, cost))
+                self.g += cost
+
+            # search for a good place to move the container
+            (move_to, cost) = self.search_from(above_pos, True, True, self.unloading_containers_below)
+            self.swap(above_pos, move_to)
+            self.crane_position = move_to.copy()
+            self.moves.append(Move(above_pos, move_to, cost, self.at(move_to)))
+            self.g += cost
+
+        if bad:
+            self.undo(mark)
+            return
+
+        # move to the container
+        if self.crane_position != pos:
+            (prev, cost) = self.crane_position.move_to(pos, self)
+            self.moves.append(Move(prev, pos, cost))
+            self.g += cost
+
+        # move the container to the truck
+        (prev, cost) = self.crane_position.move_to(Position(Location.TRUCK))
+        self.moves.append(Move(prev, Position(Location.TRUCK), cost, container))
+        self.g += cost
+
+        # remove the container from the ship
+        self.set_at(prev, ContainerData())
+
+        self.emit(states, mark, is_new)
     
+    # the container at pos is no longer one a choice can unload, it is being moved
+    # if the choice has no more containers left than it needs all of them have to be unloaded
+    def drop_choice(self, pos):
+        for i in range(len(self.unload_choices)):
+            (count, positions) = self.unload_choices[i]
+            if pos in positions:
+                rest = tuple(p for p in positions if p != pos)
+                if count == len(rest):
+                    self.unload_choices.pop(i)
+                    self.containers_to_unload.extend(rest)
+                else:
+                    self.unload_choices[i] = (count, rest)
+                return
+
+    # check if the container at pos has to be unloaded, or may be as part of a choice
+    def unloading(self, pos):
+        if pos in self.containers_to_unload:
+            return True
+        for (_, positions) in self.unload_choices:
+            if pos in positions:
+                return True
+        return False
+
     # count the number of containers that need to be unloaded below the given position
     # times an estimated cost to move a container elsewhere
     def unloading_containers_below(self, pos):
         count = 0
-        curr_pos = copy.deepcopy(pos)
+        curr_pos = pos.copy()
         while curr_pos.move_down():
-            if curr_pos in self.containers_to_unload:
+            if self.unloading(curr_pos):
                 count += 4
         return count
+
+# choices are compared without regard to their order
+def choice_key(choice):
+    (count, positions) = choice
+    return (count, sorted((pos.m, pos.n) for pos in positions))
         
\ No newline at end of file
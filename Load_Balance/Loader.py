@@ -1,118 +1,119 @@
-from consts import MAX_STATES, STATE_CULL, SHIP_HEIGHT, SHIP_WIDTH
+from consts import SHIP_HEIGHT, SHIP_WIDTH, MAX_SEARCH_NODES, MAX_SEARCH_BYTES, SEARCH_WORKERS, PROFILE_SOLVES
 from Load_Balance.LoadState import LoadState
+from Load_Balance.Search import Search
+from Load_Balance.SMAStar import SMAStar
+from Load_Balance.AnytimeSearch import AnytimeSearch
+from Load_Balance.ParallelSearch import ParallelSearch
+from Load_Balance.SearchStats import SearchStats
+from Load_Balance.SamplingProfiler import profile_search, profile_path
 from Load_Balance.Position import Position, Location
 from Manifest import Manifest
 from ContainerData import ContainerData
 from typing import List
-from collections import defaultdict
-import copy
-import heapq
+from collections import defaultdict, Counter
 
 ## The Loader class is responsible for loading and unloading containers
 ## Edits the manifest and saves the edited file using Manifest
 ## The edited manifest will be the result of completing all listed moves
+## max_nodes and max_bytes bound the memory used by the search, with both None it runs an unbounded A*
+## with more than one worker the search is spread over that many processes
+## with a time_limit the best plan found in that many seconds is returned instead, within the same memory budget
+## the anytime passes run in this process whatever the workers
+## if there is no plan by then out_of_time is set and no moves are returned, the manifest is left as it is
+## bound is how far from optimal the plan can be, None if that is not known (see Search)
+## progress is called with the SearchStats of the search as it runs, if it returns True the search stops (see Search)
+## and the best plan found so far is returned, no moves if there is none
+## with profile the phases of the search are timed into stats and a sampled profile of the solve is written
+## to profile_file, a collapsed stack file next to the log (see SamplingProfiler), set ARK_PROFILE=1 to profile every solve
 class Loader:
-    def __init__(self, manifest: Manifest):
+    def __init__(self, manifest: Manifest, max_nodes: int = MAX_SEARCH_NODES, max_bytes: int = MAX_SEARCH_BYTES, workers: int = SEARCH_WORKERS, progress=None, profile: bool = PROFILE_SOLVES):
         self.manifest = manifest
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.bound = None
+        self.out_of_time = False # the time limit passed before any plan was found
+        self.progress = progress
+        self.profile = profile
+        self.profile_file = None # where the profile of the last solve was written
+        self.stats = SearchStats() # what the search did to find the plan
 
     ## Given a list of containers to load and a list of containers to unload
     ## return the Moves the operator needs to perform
     ## will update the manifest
-    def load_unload(self, containers_to_load: List[ContainerData], containers_to_unload: List[ContainerData]):
-        states = self.make_starting_states(containers_to_load, containers_to_unload) # heap of states to search
-        culled_states = []
-
-        # frontier counter
-        f = 0
-
-        print("(Loader)frontier " + str(f) + " states: " + str(len(states)))
-
-        # searching for the goal state by popping the best seen state off the heap and expanding it
-        while states:
-            state = heapq.heappop(states)
-
-            # if this is a goal state we found a good solution
-            if(state.is_goal()):
-                self.update_manifest(state)
-                return state.moves
-
-            if not states and culled_states:
-                print("(Loader)re-expanding " + str(STATE_CULL) + " states")
-                for _ in range(STATE_CULL):
-                    heapq.heappush(states, heapq.heappop(culled_states))
-            
-            n_states = state.next_states()
-            if f % 100 == 0:
-                print("(Loader)frontier " + str(f) + " states: " + str(len(states)) + " current best g: " + str(state.g) + " h: " + str(state.h))
-            f += 1
-            
-            for n_state in n_states:
-                heapq.heappush(states, n_state)
-
-            # cull states to re exapand later if needed
-            keep_states = []
-            if len(states) > MAX_STATES:
-                print("(Loader)culling " + str(len(states)-STATE_CULL) + " states")
-                # save the STATE_CULL best states
-                for _ in range(STATE_CULL):
-                    heapq.heappush(keep_states, heapq.heappop(states))
-
-                for s in states:
-                    heapq.heappush(culled_states, s)
-                
-                states = keep_states
-
-        assert False, "No solution found, fire joey8angelo"
-
-    # a map of containers names to the set of positions they are in
+    ## with a time_limit (seconds) the best plan is returned when it runs out, no moves if there is none yet
+    def load_unload(self, containers_to_load: List[ContainerData], containers_to_unload: List[ContainerData], time_limit: float = None):
+        states = self.make_starting_states(containers_to_load, containers_to_unload)
+        self.out_of_time = False
+
+        search = self.make_search(time_limit)
+        if self.profile:
+            self.profile_file = profile_path(self.manifest.manifest_name, "load")
+            goal = profile_search(search, states, self.profile_file)
+        else:
+            goal = search.search(states)
+        self.stats = search.stats
+
+        # the progress callback or the time limit stopped the search before it had a plan, the manifest is left as it is
+        if goal is None and (search.stats.aborted or search.out_of_time):
+            self.out_of_time = not search.stats.aborted
+            self.bound = None
+            return []
+
+        assert goal is not None, "No solution found, fire joey8angelo"
+        self.bound = search.bound
+        self.update_manifest(goal)
+        return goal.moves
+
+    def make_search(self, time_limit=None):
+        if time_limit is not None:
+            return AnytimeSearch("Loader", time_limit, max_nodes=self.max_nodes, max_bytes=self.max_bytes, progress=self.progress)
+        if self.workers is not None and self.workers > 1:
+            return ParallelSearch("Loader", self.workers, self.progress)
+        if self.max_nodes is None and self.max_bytes is None:
+            return Search("Loader", self.progress)
+        return SMAStar("Loader", self.max_nodes, self.max_bytes, self.progress)
+
+    # a map of containers names to the positions they are in, in row order
     def get_unload_map(self, containers, state):
-        unload_map = defaultdict(set)
+        unload_map = defaultdict(list)
         for i in range(SHIP_HEIGHT):
             for j in range(SHIP_WIDTH):
-                if state.ship[i][j] and state.ship[i][j] in containers:
-                    unload_map[state.ship[i][j].name].add(Position(Location.SHIP, [i, j]))
+                container = state.ship_at(i, j)
+                if container and container in containers:
+                    unload_map[container.name].append(Position(Location.SHIP, [i, j]))
         return unload_map
 
-    # When there are multiple instances of the same container in the ship decide which ones 
-    # to unload by permuting all possible combinations of the containers and searching from there
+    # When there are multiple instances of the same container in the ship the search decides which ones
+    # to unload (see LoadState.unload_choices), there is a single starting state
+    # a name with no more instances than are asked for has nothing to choose, all of them are unloaded
     def make_starting_states(self, containers_to_load, containers_to_unload):
         # build a state from the manifest
-        init_state = LoadState(containers_to_load, [], self.manifest)
-
-        unload_map = self.get_unload_map(containers_to_unload, init_state)
-
-        states = []
-
-        # permute each combination of containers with the same name but different positions
-        def permute(containers_to_unload, curr):
-            nonlocal states, containers_to_load, unload_map
-            # if we have used up all containers in the list we use the current combination we made
-            if not containers_to_unload:
-                state = copy.deepcopy(init_state)        # clone the initial state
-                state.containers_to_unload = curr.copy() # fill in the containers to unload
-                state.calculate_h()                      # calculate the heuristic
-                heapq.heappush(states, state)            # add the state to the heap
-                return
-            
-            container = containers_to_unload.pop()
-            for pos in unload_map[container.name]:
-                unload_map[container.name].remove(pos)
-                curr.append(pos)
-                permute(containers_to_unload, curr)
-                curr.pop()
-                unload_map[container.name].add(pos)
-
-            containers_to_unload.append(container)
-
-        permute(containers_to_unload, [])
-
-        return states
+        state = LoadState(containers_to_load, [], self.manifest)
+
+        unload_map = self.get_unload_map(containers_to_unload, state)
+        counts = Counter(container.name for container in containers_to_unload)
+
+        containers = []
+        choices = []
+        for (name, count) in counts.items():
+            positions = unload_map[name]
+            if count > len(positions):
+                return [] # there are not enough of them on the ship
+            if count == len(positions):
+                containers.extend(positions)
+            else:
+                choices.append((count, tuple(positions)))
+
+        state.containers_to_unload = containers
+        state.unload_choices = choices
+        state.calculate_h()
+        return [state]
     
     def update_manifest(self, state):
-        for i,row in enumerate(state.ship):
-            if i >= SHIP_HEIGHT:
-                break
-            for j,container in enumerate(row):
+        for i in range(SHIP_HEIGHT):
+            for j in range(SHIP_WIDTH):
+                container = state.ship_at(i, j)
                 if container:
                     self.manifest.set_at(i+1, j+1, container)
 
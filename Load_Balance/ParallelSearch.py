@@ -0,0 +1,245 @@
+import copy
+import heapq
+import multiprocessing
+import os
+import queue
+from Load_Balance.ClosedList import ClosedList
+from Load_Balance.Search import Search
+from Load_Balance.SearchStats import SearchStats
+from Load_Balance.Diagnostics import get_logger
+from consts import PARALLEL_BATCH, PROGRESS_INTERVAL
+
+INF = float('inf')
+
+## ParallelSearch is a hash distributed A* (HDA*) run by a pool of worker processes
+## every state is owned by one worker, picked by its zobrist hash, and only that worker keeps it
+## each worker has its own heap and closed list, so a duplicate is always caught by its owner
+## successors owned by another worker are sent to it in batches of PARALLEL_BATCH states
+##
+## a goal is not known to be the best plan when it is popped, other workers may still have better states
+## like A* the best goal is the one with the lowest g+h (a goal's h is not always 0), it is shared
+## and workers drop states with a higher g+h, which A* would never have popped before that goal
+## the search is over once every worker has run out of states and no batch is still on its way (see finished)
+##
+## the container table is not sent with the states, every worker has its own copy of it
+## this works because no container is interned after the search starts (LoadState interns the containers to load up front)
+##
+## each worker keeps its own stats and sends them back when it is told to stop, they are added up into stats
+## while the search runs only the states expanded and generated are shared, those are what the progress callback sees
+## the loops of the workers are not timed when profiling, only the expansions are (see SearchStats)
+class ParallelSearch(Search):
+    def __init__(self, name: str = "Search", workers: int = None, progress=None):
+        super().__init__(name, progress)
+        self.workers = workers or os.cpu_count() or 1
+
+    ## Search from the starting states
+    ## return the best goal state found, None if no goal can be reached
+    def search(self, states):
+        stats = self.start(states)
+        if not states:
+            return self.finish(None)
+        n = self.workers
+        table = states[0].table
+        inboxes = [multiprocessing.Queue() for _ in range(n)]
+        results = multiprocessing.Queue()
+        worker_stats = multiprocessing.Queue()  # the stats of each worker, sent when it stops
+        best = multiprocessing.Value('d', INF)    # g+h of the best goal found so far
+        sent = multiprocessing.Array('q', n)      # states (and goals) each worker has sent
+        received = multiprocessing.Array('q', n)  # states each worker has taken out of its inbox and handled
+        idle = multiprocessing.Array('b', n)      # set while a worker has nothing to do
+        expanded = multiprocessing.Array('q', n)  # states each worker has expanded
+        generated = multiprocessing.Array('q', n) # successors each worker has generated
+
+        # hand each starting state to its owner, counted as sent by it
+        batches = [[] for _ in range(n)]
+        for state in states:
+            batches[hash(state) % n].append(state)
+        for i in range(n):
+            sent[i] += len(batches[i])
+            inboxes[i].put(detach(batches[i]))
+
+        workers = [multiprocessing.Process(target=worker, args=(i, self.name, table, inboxes, results, worker_stats, best, sent, received, idle, expanded, generated), daemon=True)
+                   for i in range(n)]
+        for w in workers:
+            w.start()
+
+        self.log.debug("frontier 0 states: %d workers: %d", len(states), n)
+
+        goal = None
+        goals = 0 # goals taken off the results queue, each one was counted as sent by its worker
+        reported = 0 # states expanded when the progress callback was last called
+        try:
+            while True:
+                try:
+                    state = results.get(timeout=0.05)
+                    goals += 1
+                    if goal is None or (state.g + state.h, state.g) < (goal.g + goal.h, goal.g):
+                        goal = state
+                    continue
+                except queue.Empty:
+                    pass
+
+                if self.finished(sent, received, idle, goals):
+                    break
+
+                # the counts are read while the workers change them, they are only a progress report
+                if sum(expanded) >= reported + PROGRESS_INTERVAL:
+                    reported = stats.expanded = sum(expanded)
+                    stats.generated = sum(generated)
+                    if self.report():
+                        goal = None
+                        break
+        finally:
+            for inbox in inboxes:
+                inbox.put(None)
+            totals = SearchStats()
+            for _ in workers:
+                try:
+                    totals.merge(worker_stats.get(timeout=1))
+                except queue.Empty: # the worker died, its counts are lost
+                    pass
+            totals.started = stats.started
+            totals.aborted = stats.aborted
+            self.stats = totals
+            table.stats = totals
+            for w in workers:
+                w.join(1)
+                if w.is_alive():
+                    w.terminate()
+
+        if goal is not None:
+            goal.table = table
+        return self.finish(goal)
+
+    # the search is over when every worker is idle and everything sent has been handled
+    # the counters are read while the workers change them, a batch sent and handled between two reads can make
+    # the totals match while states are still being searched, so like Mattern's four counter method they are read
+    # in two waves, one after the other, and the search is only over if
+    #     every state counted as sent in the first wave was handled
+    #     every worker is idle in the second wave
+    #     the totals of the second wave are the same as the first, nothing was sent or handled in between
+    def finished(self, sent, received, idle, goals):
+        first = wave(sent, received, idle, goals)
+        if first is None or first[0] != first[1]:
+            return False
+        return wave(sent, received, idle, goals) == first
+
+# the states sent and the states handled by all the workers, goals count as handled once taken off the results
+# None if a worker is busy, idle is read before the counters so a worker seen idle has counted everything it sent
+def wave(sent, received, idle, goals):
+    if not all(idle):
+        return None
+    return (sum(sent), sum(received) + goals)
+
+# copies of states to send to another process, the table is left behind and the receiver attaches its own copy
+# the states themselves keep their table, they may still be used by the caller
+def detach(states):
+    detached = []
+    for state in states:
+        state = copy.copy(state)
+        state.table = None
+        detached.append(state)
+    return detached
+
+## the loop run by each worker process
+## the owner of a state is hash(state) % number of workers
+def worker(i, name, table, inboxes, results, worker_stats, best, sent, received, idle, expanded, generated):
+    n = len(inboxes)
+    inbox = inboxes[i]
+    heap = []
+    closed = ClosedList()
+    stats = SearchStats()
+    table.stats = stats
+    log = get_logger(name + "." + str(i))
+    outgoing = [[] for _ in range(n)]
+
+    # take states from the inbox, returns False when told to stop
+    def receive(batch):
+        if batch is None:
+            stats.reopened = closed.reopened
+            stats.open = len(heap)
+            stats.stop()
+            worker_stats.put(stats)
+            return False
+        for state in batch:
+            state.table = table
+            if closed.add(state):
+                heapq.heappush(heap, state)
+            else:
+                stats.duplicates += 1
+        received[i] += len(batch)
+        return True
+
+    def flush():
+        for j in range(n):
+            if outgoing[j]:
+                sent[i] += len(outgoing[j])
+                inboxes[j].put(detach(outgoing[j]))
+                outgoing[j] = []
+
+    # frontier counter
+    f = 0
+
+    while True:
+        # take everything waiting in the inbox without blocking
+        try:
+            while True:
+                batch = inbox.get_nowait()
+                idle[i] = 0
+                if not receive(batch):
+                    return
+        except queue.Empty:
+            pass
+
+        # drop states A* would not pop before the best goal
+        # states that tie with it are kept, A* can still pop them first
+        while heap and (closed.is_stale(heap[0]) or heap[0].g + heap[0].h > best.value):
+            if not closed.is_stale(heap[0]):
+                stats.culled += 1
+            heapq.heappop(heap)
+
+        if not heap:
+            flush()
+            idle[i] = 1
+            # wait for more states, idle is cleared before the batch is counted as received
+            try:
+                batch = inbox.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            idle[i] = 0
+            if not receive(batch):
+                return
+            continue
+
+        state = heapq.heappop(heap)
+
+        if state.is_goal():
+            with best.get_lock():
+                if state.g + state.h <= best.value:
+                    best.value = state.g + state.h
+                    sent[i] += 1
+                    results.put(detach([state])[0])
+            continue
+
+        if f % PROGRESS_INTERVAL == 0:
+            log.debug("frontier %d states: %d current best g: %s h: %s", f, len(heap), state.g, state.h)
+        f += 1
+        expanded[i] += 1
+        stats.expanding(state, len(heap))
+
+        n_states = state.expand(closed.improves)
+        generated[i] += len(n_states)
+        stats.generated += len(n_states)
+        for n_state in n_states:
+            j = hash(n_state) % n
+            if j == i:
+                if closed.add(n_state):
+                    heapq.heappush(heap, n_state)
+                else:
+                    stats.duplicates += 1
+            else:
+                outgoing[j].append(n_state)
+                if len(outgoing[j]) >= PARALLEL_BATCH:
+                    sent[i] += len(outgoing[j])
+                    inboxes[j].put(detach(outgoing[j]))
+                    outgoing[j] = []
@@ -0,0 +1,87 @@
+'''
+    Partition decides before the search if the containers of a ship can be split into two balanced halves
+    a split is balanced when the heavier half weighs less than 1.1 times the lighter one (see BalanceState.is_goal)
+
+    sets of sums are bitsets held in a python int, bit s is set if a left half weighing s can be made
+    the bitsets are dropped once the results are known, the partition is shared by every state of a search
+        feasible: some split is balanced, if not the ship cannot be balanced and there is nothing to search
+        min_moves: the fewest containers that have to cross the centre line to reach a balanced split
+        targets: the balanced left weights that can be reached with min_moves containers crossing
+        left: the weights on the left half the partition was worked out from, sorted
+    moves_left gives a lower bound on the containers that still have to cross from a later split
+
+    where the containers fit in the ship is not considered, only their weights
+'''
+class Partition:
+    # left and right are the weights of the containers on each half of the ship
+    def __init__(self, left, right):
+        self.total = sum(left) + sum(right)
+        self.left_weight = sum(left)
+        self.left = sorted(left)
+        self.n_containers = len(left) + len(right)
+
+        # the balanced left weights are the range lo..hi around half the total
+        # the heavier half is less than 1.1 times the lighter so the lighter weighs more than total/2.1
+        self.lo = max(0, int(self.total/2.1) - 2)
+        while self.lo <= self.total//2 and not is_balanced(self.lo, self.total - self.lo):
+            self.lo += 1
+        self.hi = self.total - self.lo
+        balanced = ((1 << (self.hi - self.lo + 1)) - 1) << self.lo if self.lo <= self.hi else 0
+
+        # every left weight any split of the containers can give
+        sums = 1
+        for w in left + right:
+            sums |= sums << w
+        self.feasible = sums & balanced != 0
+
+        self.min_moves = None
+        self.targets = []
+        if self.feasible:
+            self.find_min_moves(left, right, balanced)
+
+    # moving k containers reaches a left weight of the current one, minus those that leave the left, plus those that join it
+    # reach[k] is the bitset of left weights reachable by moving exactly k containers
+    # the most moves looked at is doubled until a balanced left weight is reached
+    def find_min_moves(self, left, right, balanced):
+        moves = [(w, True) for w in left] + [(w, False) for w in right]
+        k_max = 1
+        while True:
+            k_max = min(k_max, len(moves))
+            reach = [1 << self.left_weight] + [0]*k_max
+            for (w, from_left) in moves:
+                for k in range(k_max, 0, -1):
+                    reach[k] |= reach[k-1] >> w if from_left else reach[k-1] << w
+            for k in range(k_max+1):
+                hits = reach[k] & balanced
+                if hits:
+                    self.min_moves = k
+                    self.targets = [s for s in range(self.lo, self.hi+1) if hits >> s & 1]
+                    return
+            if k_max == len(moves):
+                return
+            k_max *= 2
+
+    # the fewest containers that can still have to cross the centre line from a split with the sorted left weights given
+    # left can be any iterable, it is read once, placed is the number of containers on either half,
+    # the ones taken off them could end up on either side
+    # every container that has left or joined the left half since, or is off the halves, may be one of the min_moves crossings
+    def moves_left(self, left, placed):
+        if self.min_moves is None:
+            return 0
+        # containers of each weight on the left half both then and now
+        common = 0
+        n_left = 0
+        i = 0
+        for w in left:
+            n_left += 1
+            while i < len(self.left) and self.left[i] < w:
+                i += 1
+            if i < len(self.left) and self.left[i] == w:
+                common += 1
+                i += 1
+        moved = len(self.left) + n_left - 2*common + self.n_containers - placed
+        return max(0, self.min_moves - moved)
+
+# the goal condition of a balanced ship
+def is_balanced(left, right):
+    return max(left, right)/max(1, min(left, right)) < 1.1
@@ -1,7 +1,7 @@
-from consts import SHIP_HEIGHT, SHIP_WIDTH, SHIP_BUFF, BUFF_HEIGHT, BUFF_WIDTH, SHIP_VIRTUAL_CELL, BUFF_VIRTUAL_CELL
-from ContainerData import ContainerData
-from typing import List
-import copy
+from consts import SHIP_HEIGHT, SHIP_WIDTH, SHIP_BUFF, SHIP_ROWS, BUFF_HEIGHT, BUFF_WIDTH, SHIP_VIRTUAL_CELL, BUFF_VIRTUAL_CELL
+from Load_Balance.Diagnostics import get_logger
+
+log = get_logger("Position")
 
 class Location:
     SHIP = "SHIP"
@@ -9,6 +9,82 @@ class Location:
     TRUCK = "TRUCK"
     CRANE_REST = "CRANE_REST"
 
+# manhattan distance from every cell of a location to its virtual cell, indexed by m*width+n
+# the crane can be one row above the top of each location
+def exit_costs(rows, width, virtual_cell):
+    return [abs(m-virtual_cell[0]) + abs(n-virtual_cell[1]) for m in range(rows) for n in range(width)]
+
+# width used to index a location's cells, the 1x1 locations only have cell 0
+WIDTH = {Location.SHIP: SHIP_WIDTH, Location.BUFFER: BUFF_WIDTH, Location.TRUCK: 1, Location.CRANE_REST: 1}
+
+# cost of getting from a cell to the point where the crane leaves its location
+EXIT_COST = {
+    Location.SHIP: exit_costs(SHIP_ROWS+1, SHIP_WIDTH, SHIP_VIRTUAL_CELL),
+    Location.BUFFER: exit_costs(BUFF_HEIGHT+1, BUFF_WIDTH, BUFF_VIRTUAL_CELL),
+    Location.TRUCK: [0],
+    Location.CRANE_REST: [0],
+}
+
+# cost of travelling between two locations, from the exit of one to the exit of the other
+# ship and buffer are 4 apart, the truck is 2 from both, the crane rest is 1 from everything
+TRANSFER_COST = {
+    Location.SHIP: {Location.BUFFER: 4, Location.TRUCK: 2, Location.CRANE_REST: 1},
+    Location.BUFFER: {Location.SHIP: 4, Location.TRUCK: 2, Location.CRANE_REST: 1},
+    Location.TRUCK: {Location.SHIP: 2, Location.BUFFER: 2, Location.CRANE_REST: 1},
+    Location.CRANE_REST: {Location.SHIP: 1, Location.BUFFER: 1, Location.TRUCK: 1},
+}
+
+# cost for the crane to move from a to b, nothing is changed
+# state is the State the move happens in, a move within the ship or buffer climbs over its containers
+# without a state (or to/from a virtual cell) a move within a location is the manhattan distance
+def cost(a: 'Position', b: 'Position', state = None):
+    location = a.location
+    if location != b.location:
+        return TRANSFER_COST[location][b.location] + EXIT_COST[location][a.m*WIDTH[location] + a.n] + EXIT_COST[b.location][b.m*WIDTH[b.location] + b.n]
+
+    assert location == Location.SHIP or location == Location.BUFFER, "Invalid move, " + location + " is not big enough for a move"
+    if state is None or a.in_virtual_cell() or b.in_virtual_cell():
+        return abs(a.m - b.m) + abs(a.n - b.n)
+    if a.n > b.n:
+        a, b = b, a
+    return walk_cost(state, location, a.m, a.n, b.m, b.n)
+
+# cost of the crane walking right from m1,n1 to m2,n2 within a location
+# in every column it passes it climbs over the containers in its way, it never goes down until the last column
+# the containers in a column sit on top of each other from its floor (the NAN cells at the bottom of the ship) to its top
+# so the climb comes from the height maps instead of walking the cells
+# NAN cells do not make the crane climb, only containers do
+def walk_cost(state, location, m1, n1, m2, n2):
+    if n1 == n2:
+        return abs(m1 - m2)
+    if location == Location.SHIP:
+        rows = SHIP_ROWS
+        height_map = state.ship_height_map
+        floor = state.ship_floor
+    else:
+        rows = BUFF_HEIGHT
+        height_map = state.buffer_height_map
+        floor = None
+
+    c = n2 - n1
+    m = m1
+    n = n1 + 1
+    while n < n2:
+        top = rows - height_map[n]
+        if m < top and (floor is None or m >= floor[n]):
+            c += top - m
+            m = top
+        n += 1
+
+    # the walk stops climbing once it reaches m2
+    if m2 >= m:
+        return c + m2 - m
+    top = rows - height_map[n2]
+    if m < top and (floor is None or m >= floor[n2]):
+        c += top - m
+        m = top
+    return c + m - m2
+
 '''
     Position class represents a position in different locations
     centralizes the logic for moving between locations and calculating the cost of that move
@@ -30,86 +106,17 @@ class Position:
     def __hash__(self) -> int:
         return hash((self.m, self.n, self.location))
 
+    def copy(self):
+        return Position(self.location, [self.m, self.n])
+
     # moves from the current position to the given position
+    # state is the State the move happens in, used to climb over the containers between the two positions
     # returns the previous position and the cost of this move
-    def move_to(self, pos: 'Position', loc: List[ContainerData] = None, apply_move=True):
-        old_p = copy.deepcopy(self)
-        
-        # move within the same location
-        if self.location == pos.location:
-            assert self.location == Location.SHIP or self.location == Location.BUFFER, "Invalid move, " + self.location + " is not big enough for a move"
-            in_virtual = self.in_virtual_cell() or pos.in_virtual_cell()
-            if in_virtual or loc == None:
-                if not in_virtual: # if either location is a virtual cell the manhattan distance actually is correct
-                    print("(move_to)WARNING: No location data provided for move within the same location, assuming a manhattan distance")
-                c = abs(self.m - pos.m) + abs(self.n - pos.n)
-            else:
-                n_p = copy.deepcopy(pos)
-                c_p = copy.deepcopy(self)
-
-                # if pos is to the left swap them
-                if c_p.n > n_p.n:
-                    c_p, n_p = n_p, c_p
-
-                c = 0
-
-                # move right
-                while c_p.n != n_p.n and c_p.move_right():
-                    c += 1
-
-                    if c_p.location == Location.BUFFER:
-                        t = BUFF_HEIGHT
-                    else:
-                        t = SHIP_HEIGHT+SHIP_BUFF
-
-                    while c_p.m < t and loc[c_p.m][c_p.n] and loc[c_p.m][c_p.n].name != "UNUSED":
-                        if c_p == n_p:
-                            break
-                        c += 1
-                        c_p.move_up()
-                
-                # c_p and n_p are in the same horizontal position
-                # move to n_p vertically
-                c += abs(c_p.m - n_p.m)
-
-        # move between ship and buffer is 4 plus manhattan distance to/from their virtual cells
-        elif self.in_ship() and pos.in_buf():
-            c = 4 + abs(self.m-SHIP_VIRTUAL_CELL[0]) + abs(self.n-SHIP_VIRTUAL_CELL[1]) + abs(pos.m-BUFF_VIRTUAL_CELL[0]) + abs(pos.n-BUFF_VIRTUAL_CELL[1])
-        elif self.in_buf() and pos.in_ship():
-            c = 4 + abs(self.m-BUFF_VIRTUAL_CELL[0]) + abs(self.n-BUFF_VIRTUAL_CELL[1]) + abs(pos.m-SHIP_VIRTUAL_CELL[0]) + abs(pos.n-SHIP_VIRTUAL_CELL[1])
-
-        # move between the ship and truck is 2 + manhattan distance to the virtual cell
-        elif self.in_ship() and pos.in_truck():
-            c = 2 + abs(self.m-SHIP_VIRTUAL_CELL[0]) + abs(self.n-SHIP_VIRTUAL_CELL[1])
-        elif self.in_truck() and pos.in_ship():
-            c = 2 + abs(pos.m-SHIP_VIRTUAL_CELL[0]) + abs(pos.n-SHIP_VIRTUAL_CELL[1])
-
-        # move between the buffer and truck is 2 + manhattan distance to the virtual cell
-        elif self.in_buf() and pos.in_truck():
-            c = 2 + abs(self.m-BUFF_VIRTUAL_CELL[0]) + abs(self.n-BUFF_VIRTUAL_CELL[1])
-        elif self.in_truck() and pos.in_buf():
-            c = 2 + abs(pos.m-BUFF_VIRTUAL_CELL[0]) + abs(pos.n-BUFF_VIRTUAL_CELL[1])
-
-        # move between the crane rest and ship is 1 plus manhattan distance to the virtual cell
-        elif self.in_crane_rest() and pos.in_ship():
-            c = 1 + abs(pos.m-SHIP_VIRTUAL_CELL[0]) + abs(pos.n-SHIP_VIRTUAL_CELL[1])
-        elif self.in_ship() and pos.in_crane_rest():
-            c = 1 + abs(self.m-SHIP_VIRTUAL_CELL[0]) + abs(self.n-SHIP_VIRTUAL_CELL[1])
-
-        # move between the crane rest and buffer is 1 plus manhattan distance to the virtual cell
-        elif self.in_crane_rest() and pos.in_buf():
-            c = 1 + abs(pos.m-BUFF_VIRTUAL_CELL[0]) + abs(pos.n-BUFF_VIRTUAL_CELL[1])
-        elif self.in_buf() and pos.in_crane_rest():
-            c = 1 + abs(self.m-BUFF_VIRTUAL_CELL[0]) + abs(self.n-BUFF_VIRTUAL_CELL[1])
-
-        # move between the crane rest and truck is 1
-        elif self.in_crane_rest() and pos.in_truck():
-            c = 1
-        elif self.in_truck() and pos.in_crane_rest():
-            c = 1
-        
-        else:
-            assert False, "Invalid move"
+    def move_to(self, pos: 'Position', state = None, apply_move=True):
+        old_p = self.copy()
+        if self.location == pos.location and state is None and not (self.in_virtual_cell() or pos.in_virtual_cell()):
+            log.warning("no state given for a move within the same location, assuming a manhattan distance")
+        c = cost(self, pos, state)
 
         if not apply_move:
             return (old_p, c)
@@ -200,4 +207,7 @@ class Position:
         elif self.location == Location.CRANE_REST:
             return "CRANE_REST"
         else:
-            return "INVALID"
\ No newline at end of file
+            return "INVALID"
+
+# the crane rest, for costs to it without making a new Position every time
+CRANE_REST = Position(Location.CRANE_REST)
@@ -0,0 +1,235 @@
+import heapq
+import itertools
+import sys
+from Load_Balance.Search import Search
+from consts import PROGRESS_INTERVAL
+
+INF = float('inf')
+
+## A node of the SMA* search tree
+## f is the backed up cost, the lowest f of the node's children in memory and of its forgotten children
+## forgotten maps the hash of each forgotten child to its backed up f, so it is not lost when the child is regenerated
+class SMANode:
+    __slots__ = ("state", "parent", "children", "depth", "f", "forgotten", "size", "in_open", "version")
+
+    def __init__(self, state, parent=None, f=0):
+        self.state = state
+        self.parent = parent
+        self.children = []
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.f = state.g + state.h if parent is None else max(parent.f, state.g + state.h, f) # pathmax, f never decreases along a path
+        self.forgotten = {}
+        self.size = 0        # bytes counted against the budget for this node
+        self.in_open = False
+        self.version = 0     # bumped whenever the node changes, heap entries with an old version are skipped
+
+## SMAStar is a memory bounded A* (simplified memory bounded A*)
+## at most max_nodes nodes, or max_bytes bytes of nodes, are kept in memory
+## when memory is full the worst leaf (highest f, shallowest) is forgotten and its f is backed up into its parent
+## the budget must leave room for the successors of a node on top of the current path, or the search may go over it
+## and keep forgetting and regenerating the same path without making progress
+## a parent with forgotten children goes back on the open list and regenerates them
+## if it becomes the best node again, so the search stays complete as long as the solution path fits in memory
+## until the budget is reached it behaves like Search
+class SMAStar(Search):
+    def __init__(self, name: str = "Search", max_nodes: int = None, max_bytes: int = None, progress=None):
+        super().__init__(name, progress)
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+
+    ## Search from the starting states
+    ## return the goal state found, None if no goal can be reached within the memory budget
+    def search(self, states):
+        self.memory = {}   # state -> node of every state in memory
+        self.n_nodes = 0
+        self.n_bytes = 0
+        self.open = []     # (f, -depth, tie, version, node) best node to expand first
+        self.leaves = []   # (-f, depth, tie, version, node) worst leaf to forget first
+        self.tie = itertools.count()
+        stats = self.start(states)
+
+        # a path deeper than the budget can hold can never reach the goal
+        self.max_depth = INF
+        if self.max_nodes is not None:
+            self.max_depth = self.max_nodes - 1
+        if self.max_bytes is not None and states:
+            self.max_depth = min(self.max_depth, self.max_bytes // (states[0].size() + 1) - 1)
+
+        for state in states:
+            self.add(SMANode(state))
+        pop_best = self.timed("heap_seconds", self.pop_best)
+        improves = self.timed("is_new_seconds", self.improves)
+        add = self.timed("add_seconds", self.add)
+        forget = self.timed("cull_seconds", self.forget)
+        pop_worst = self.timed("cull_seconds", self.pop_worst)
+
+        # frontier counter
+        f = 0
+
+        self.log.debug("frontier %d states: %d", f, len(self.open))
+
+        while True:
+            node = pop_best()
+            if node is None:
+                return self.finish(None)
+
+            state = node.state
+
+            # if this is a goal state we found a good solution
+            if state.is_goal():
+                return self.finish(state)
+
+            # regenerate every successor that is not already in memory
+            stats.expanding(state, len(self.open))
+            n_states = state.expand(improves)
+            stats.generated += len(n_states)
+            if f % PROGRESS_INTERVAL == 0:
+                self.log.debug("frontier %d states: %d nodes in memory: %d current best g: %s h: %s", f, len(self.open), self.n_nodes, state.g, state.h)
+                if self.report():
+                    return self.finish(None)
+            f += 1
+
+            forgotten = node.forgotten
+            node.forgotten = {}
+            for n_state in n_states:
+                if not improves(n_state):
+                    stats.duplicates += 1
+                    continue
+                # a worse copy of this state is replaced, with its subtree as the g of every state in it is too high
+                # the states in it are generated again from the better copy if they are still worth it
+                old = self.memory.get(n_state)
+                if old is not None:
+                    stats.reopened += 1
+                    self.drop(old)
+                    if old.parent is not None and old.parent is not node:
+                        self.backup(old.parent)
+                # forgotten dead ends are not regenerated
+                f_forgotten = forgotten.get(hash(n_state), 0)
+                if f_forgotten == INF:
+                    node.forgotten[hash(n_state)] = INF
+                    continue
+                child = SMANode(n_state, node, f_forgotten)
+                if child.depth >= self.max_depth and not n_state.is_goal():
+                    child.f = INF
+                node.children.append(child)
+                add(child)
+
+            self.backup(node)
+            self.push_leaf(node)
+
+            # forget the worst leaves until the search fits in memory again
+            # the successors just generated are kept so the search always makes progress, even if that goes over the budget
+            kept = []
+            while self.over_budget():
+                worst = pop_worst()
+                if worst is None:
+                    break
+                if worst.parent is node:
+                    kept.append(worst)
+                    continue
+                forget(worst)
+            for child in kept:
+                self.push_leaf(child)
+
+            self.compact()
+
+    # check if a state is new or improves on the copy in memory
+    def improves(self, state):
+        node = self.memory.get(state)
+        return node is None or state.g < node.state.g
+
+    def over_budget(self):
+        if self.max_nodes is not None and self.n_nodes > self.max_nodes:
+            return True
+        return self.max_bytes is not None and self.n_bytes > self.max_bytes
+
+    # put a new node in memory and on the open list
+    def add(self, node):
+        node.size = node.state.size() + sys.getsizeof(node)
+        self.memory[node.state] = node
+        self.n_nodes += 1
+        self.n_bytes += node.size
+        self.push_open(node)
+        self.push_leaf(node)
+
+    # take a node out of memory
+    # the state is dropped here, stale heap entries may keep the node itself alive for a while
+    def remove(self, node):
+        if self.memory.get(node.state) is node:
+            del self.memory[node.state]
+        self.n_nodes -= 1
+        self.n_bytes -= node.size
+        node.state = None
+        node.in_open = False
+        node.version += 1
+        if node.parent is not None:
+            node.parent.children.remove(node)
+            if not node.parent.children:
+                self.push_leaf(node.parent)
+
+    # take a node and all of its descendants out of memory
+    def drop(self, node):
+        for child in list(node.children):
+            self.drop(child)
+        self.remove(node)
+
+    # forget a leaf to save memory, its parent remembers its f so it can be regenerated later
+    # dead ends (f is inf) are remembered too but are not worth re-opening the parent for
+    def forget(self, node):
+        parent = node.parent
+        parent.forgotten[hash(node.state)] = node.f
+        self.remove(node)
+        self.stats.culled += 1
+        if node.f < INF:
+            self.push_open(parent)
+        self.backup(parent)
+
+    # update the f of node from its children and forgotten children, passing changes up the tree
+    def backup(self, node):
+        while node is not None:
+            f = min(node.forgotten.values(), default=INF)
+            for child in node.children:
+                f = min(f, child.f)
+            if f == node.f:
+                return
+            node.f = f
+            node.version += 1
+            if node.in_open:
+                self.push_open(node)
+            if not node.children:
+                self.push_leaf(node)
+            node = node.parent
+
+    # nodes are open while they have not been expanded or have forgotten children to regenerate
+    def push_open(self, node):
+        node.in_open = True
+        heapq.heappush(self.open, (node.f, -node.depth, next(self.tie), node.version, node))
+
+    # nodes without children in memory can be forgotten, the starting states never are
+    def push_leaf(self, node):
+        if node.parent is not None and not node.children:
+            heapq.heappush(self.leaves, (-node.f, node.depth, next(self.tie), node.version, node))
+
+    # drop stale entries once they outnumber the live ones so the heaps stay within the budget too
+    def compact(self):
+        if len(self.open) > 2*self.n_nodes + 1000:
+            self.open = [e for e in self.open if e[4].in_open and e[3] == e[4].version]
+            heapq.heapify(self.open)
+        if len(self.leaves) > 2*self.n_nodes + 1000:
+            self.leaves = [e for e in self.leaves if e[4].state is not None and e[3] == e[4].version and not e[4].children]
+            heapq.heapify(self.leaves)
+
+    def pop_best(self):
+        while self.open:
+            (_, _, _, version, node) = heapq.heappop(self.open)
+            if node.in_open and version == node.version:
+                node.in_open = False
+                return node
+        return None
+
+    def pop_worst(self):
+        while self.leaves:
+            (_, _, _, version, node) = heapq.heappop(self.leaves)
+            if version == node.version and node.state is not None and not node.children:
+                return node
+        return None
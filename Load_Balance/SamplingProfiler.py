@@ -0,0 +1,85 @@
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from consts import PROFILE_INTERVAL, PROFILE_PATH
+
+'''
+    SamplingProfiler takes a sample of the call stack of a thread every interval seconds while it runs
+    the samples are counted by stack and written in the collapsed stack format flamegraph tools read
+    (flamegraph.pl, speedscope, inferno), one line per stack, outermost call first:
+        Balancer.py:balance;Search.py:search;State.py:expand;BalanceState.py:next_states 42
+
+    the sampling is done by a background thread so the profiled code is not changed, it only sees the
+    python stack of the thread it was started from, the worker processes of ParallelSearch are not sampled
+    a sample is only taken when the sampler gets the GIL, so the interval is a lower bound
+'''
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter() # stack -> number of samples
+        self.thread_id = None
+        self.sampler = None
+        self.running = threading.Event()
+
+    # start sampling the calling thread
+    def start(self):
+        self.thread_id = threading.get_ident()
+        self.running.set()
+        self.sampler = threading.Thread(target=self.run, name="SamplingProfiler", daemon=True)
+        self.sampler.start()
+
+    def stop(self):
+        self.running.clear()
+        if self.sampler is not None:
+            self.sampler.join()
+            self.sampler = None
+
+    def run(self):
+        while self.running.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[collapse(frame)] += 1
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # write the samples to path in the collapsed stack format, most sampled stack first
+    def write(self, path):
+        with open(path, 'w') as f:
+            for (stack, count) in self.samples.most_common():
+                f.write(stack + " " + str(count) + "\n")
+
+# the stack of frame as file:function names, outermost first, separated by ;
+def collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(code.co_filename.replace("\\", "/").rsplit("/", 1)[-1] + ":" + code.co_name)
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names).replace(" ", "_") # the count is split off at the last space
+
+## run search from states profiled, the phases of the search are timed into its stats and its call stack is sampled
+## the samples are written to path even if the search fails, return the goal found
+def profile_search(search, states, path):
+    search.profile = True
+    profiler = SamplingProfiler()
+    try:
+        with profiler:
+            goal = search.search(states)
+    finally:
+        profiler.write(path)
+    phases = search.stats.phases()
+    search.log.info("profile written to %s phases: %s", path, ", ".join(phase + " " + str(round(seconds, 3)) + "s" for (phase, seconds) in phases.items()))
+    return goal
+
+# where the profile of a solve of a manifest is written, task is what the solve did
+def profile_path(manifest_name, task):
+    return PROFILE_PATH + manifest_name + "-" + task + "-" + datetime.now().strftime("%Y%m%d-%H%M%S") + ".folded"
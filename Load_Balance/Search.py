@@ -0,0 +1,125 @@
+import heapq
+import time
+from Load_Balance.ClosedList import ClosedList
+from Load_Balance.SearchStats import SearchStats
+from Load_Balance.Diagnostics import get_logger
+from consts import PROGRESS_INTERVAL
+
+## Search finds a goal State with A*, it is shared by the Balancer and the Loader
+## the best state seen is popped off a heap ordered by g+h and expanded,
+## successors that are new or reached with a lower g are pushed back on the heap
+## nothing is ever dropped so memory grows with the number of states generated, see SMAStar for a bounded search
+##
+## stats counts what the last search did (see SearchStats)
+## progress is called with the stats every PROGRESS_INTERVAL states expanded, if it returns True the search stops
+## early, returns None (or the best plan found so far for AnytimeSearch) and stats.aborted is set
+## out_of_time is set if a deadline passed before any plan was found, only AnytimeSearch has one
+## with profile set the heap, closed list and pruning calls of the search loop are timed into the stats too
+##
+## bound is how far from optimal the plan found can be, its cost is at most bound times the cost of the cheapest plan
+## made of the moves next_states makes, it is worked out from the lowest g+h of the states left to search when the plan
+## was found so it only holds if h never overestimates the cost to the goal (State.admissible), it is None otherwise
+## A* pops the plan with the lowest g+h so its bound is 1.0
+## a plan with moves next_states never makes can be cheaper still (LayoutPlanner can find one on test_manifest),
+## no search here compares against those, a bound against every plan only gets as tight as h of the start
+class Search:
+    def __init__(self, name: str = "Search", progress=None):
+        self.name = name # name the diagnostics of the search are shown under
+        self.log = get_logger(name)
+        self.progress = progress
+        self.profile = False
+        self.bound = None # the cost of the plan found is at most bound times the cheapest the search can reach, None if unknown
+        self.out_of_time = False
+        self.stats = SearchStats()
+
+    ## Search from the starting states
+    ## return the goal state found, None if no goal can be reached
+    def search(self, states):
+        states = list(states) # heap of states to search
+        stats = self.start(states)
+        heapq.heapify(states)
+        closed = ClosedList()
+        for state in states:
+            closed.add(state)
+        push = self.timed("heap_seconds", heapq.heappush)
+        pop = self.timed("heap_seconds", heapq.heappop)
+        add = self.timed("add_seconds", closed.add)
+        improves = self.timed("is_new_seconds", closed.improves)
+        is_stale = self.timed("cull_seconds", closed.is_stale)
+
+        # frontier counter
+        f = 0
+
+        self.log.debug("frontier %d states: %d", f, len(states))
+
+        # searching for the goal state by popping the best seen state off the heap and expanding it
+        while states:
+            state = pop(states)
+
+            # skip states that were re-opened with a lower g after this one was pushed
+            if is_stale(state):
+                continue
+
+            # if this is a goal state we found a good solution
+            if(state.is_goal()):
+                return self.finish(state, closed)
+
+            stats.expanding(state, len(states))
+            n_states = state.expand(improves)
+            stats.generated += len(n_states)
+            if f % PROGRESS_INTERVAL == 0:
+                self.log.debug("frontier %d states: %d current best g: %s h: %s", f, len(states), state.g, state.h)
+                if self.report():
+                    return self.finish(None, closed)
+            f += 1
+
+            for n_state in n_states:
+                if add(n_state):
+                    push(states, n_state)
+                else:
+                    stats.duplicates += 1
+
+        return self.finish(None, closed)
+
+    # new stats for a search from states, the states find them through their table
+    # the bound is only known if h never overestimates
+    def start(self, states):
+        self.stats = SearchStats()
+        self.bound = None
+        self.out_of_time = False
+        self.admissible = bool(states) and states[0].admissible
+        if states:
+            states[0].table.stats = self.stats
+        return self.stats
+
+    # stop the clock on the stats, work out the bound of the goal and return it
+    # lower is the lowest g+h of the states left to search, A* popped the goal before any of them so it is goal.g by default
+    def finish(self, goal, closed=None, lower=None):
+        if closed is not None:
+            self.stats.reopened += closed.reopened
+        self.stats.stop()
+        self.bound = None
+        if goal is not None and self.admissible:
+            lower = goal.g if lower is None else min(lower, goal.g)
+            self.bound = goal.g / lower if lower > 0 else 1.0
+        return goal
+
+    # func timed into the stats attribute named seconds when profiling, func itself otherwise
+    def timed(self, seconds, func):
+        if not self.profile:
+            return func
+        stats = self.stats
+        def run(*args):
+            start = time.perf_counter()
+            result = func(*args)
+            setattr(stats, seconds, getattr(stats, seconds) + time.perf_counter() - start)
+            return result
+        return run
+
+    # pass the stats to the progress callback, return True if it asks for the search to stop
+    def report(self):
+        if self.progress is not None and self.progress(self.stats):
+            self.stats.aborted = True
+            self.log.info("stopped by the progress callback")
+            return True
+        return False
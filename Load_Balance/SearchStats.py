@@ -0,0 +1,117 @@
+import time
+
+'''
+    SearchStats counts what a search did, one is made for every search and is kept on it (Search.stats)
+        expanded: states taken off the open list and expanded
+        generated: successors kept by an expansion, copied and scored
+        duplicates: successors dropped because their state had already been reached with the same or a lower g
+        reopened: states reached again with a lower g and put back on the open list, so expanded again
+        culled: states dropped without being expanded, pruned by the cost of a plan already found or forgotten by SMAStar
+        open: number of states on the open list, max_open the most there ever were
+        best_f: g+h of the last state expanded, the lowest g+h on the open list when it was popped
+    and where the time of the expansions went
+        expand_seconds: all of it, generating, scoring and copying the successors
+        h_seconds: calculating h (calculate_h) for the successors not found in the heuristic cache
+        clone_seconds: copying the successors that were kept
+        next_states_seconds: the rest, applying and undoing the moves in next_states
+    and when the search is profiled (Search.profile) the time of the rest of the search loop
+        is_new_seconds: checking if the successors are new, inside the expansions
+        add_seconds: adding the successors to the closed list
+        heap_seconds: pushing states on and popping them off the open list
+        cull_seconds: checking for stale and pruned states, and forgetting states in SMAStar
+    phases() groups them into the phases of a search
+
+    the states of a search find the stats through their ContainerTable, table.stats is None outside a search
+    and nothing is timed then
+'''
+class SearchStats:
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.reopened = 0
+        self.culled = 0
+        self.open = 0
+        self.max_open = 0
+        self.best_f = None
+        self.expand_seconds = 0.0
+        self.h_seconds = 0.0
+        self.clone_seconds = 0.0
+        self.is_new_seconds = 0.0
+        self.add_seconds = 0.0
+        self.heap_seconds = 0.0
+        self.cull_seconds = 0.0
+        self.started = time.perf_counter()
+        self.stopped = None
+        self.aborted = False # set when the progress callback stopped the search
+
+    # a state is about to be expanded with n_open states left on the open list
+    def expanding(self, state, n_open):
+        self.expanded += 1
+        self.best_f = state.g + state.h
+        self.open = n_open
+        if n_open > self.max_open:
+            self.max_open = n_open
+
+    def stop(self):
+        self.stopped = time.perf_counter()
+
+    # seconds the search has run for
+    @property
+    def seconds(self):
+        return (self.stopped or time.perf_counter()) - self.started
+
+    @property
+    def nodes_per_second(self):
+        seconds = self.seconds
+        return self.expanded / seconds if seconds > 0 else 0.0
+
+    @property
+    def next_states_seconds(self):
+        return max(0.0, self.expand_seconds - self.h_seconds - self.clone_seconds - self.is_new_seconds)
+
+    # seconds spent in each phase of the search, the phases do not overlap
+    def phases(self):
+        return {
+            "expand": self.next_states_seconds,
+            "heuristic": self.h_seconds,
+            "copy": self.clone_seconds,
+            "dedupe": self.is_new_seconds + self.add_seconds,
+            "push/pop": self.heap_seconds,
+            "cull": self.cull_seconds,
+        }
+
+    # add the counts of another search to these, used to sum up the workers of ParallelSearch
+    # times are added up too, so they are cpu seconds across the workers
+    def merge(self, other):
+        for key in ("expanded", "generated", "duplicates", "reopened", "culled", "open", "expand_seconds", "h_seconds", "clone_seconds",
+                    "is_new_seconds", "add_seconds", "heap_seconds", "cull_seconds"):
+            setattr(self, key, getattr(self, key) + getattr(other, key))
+        self.max_open += other.max_open
+        if other.best_f is not None and (self.best_f is None or other.best_f < self.best_f):
+            self.best_f = other.best_f
+
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "duplicates": self.duplicates,
+            "reopened": self.reopened,
+            "culled": self.culled,
+            "open": self.open,
+            "max_open": self.max_open,
+            "best_f": self.best_f,
+            "seconds": self.seconds,
+            "nodes_per_second": self.nodes_per_second,
+            "expand_seconds": self.expand_seconds,
+            "next_states_seconds": self.next_states_seconds,
+            "h_seconds": self.h_seconds,
+            "clone_seconds": self.clone_seconds,
+            "phases": self.phases(),
+            "aborted": self.aborted,
+        }
+
+    def __str__(self):
+        return ("expanded: " + str(self.expanded) + " generated: " + str(self.generated) + " duplicates: " + str(self.duplicates)
+                + " reopened: " + str(self.reopened) + " culled: " + str(self.culled) + " open: " + str(self.open)
+                + " best f: " + str(self.best_f) + " nodes/s: " + str(round(self.nodes_per_second)))
@@ -1,38 +1,68 @@
-from consts import SHIP_HEIGHT, SHIP_WIDTH, SHIP_BUFF, BUFF_HEIGHT, BUFF_WIDTH
-from Load_Balance.Position import Position, Location
+from consts import SHIP_HEIGHT, SHIP_WIDTH, BUFF_HEIGHT, BUFF_WIDTH, SHIP_ROWS, SHIP_CELLS, BUFF_CELLS
+from Load_Balance.Position import Position, Location, walk_cost, EXIT_COST, TRANSFER_COST, WIDTH
+from Load_Balance.ContainerTable import ContainerTable, NAN, UNUSED
 from ContainerData import ContainerData
 from Manifest import Manifest
 from Move import Move
-from typing import List
-import copy
+from Load_Balance.Diagnostics import get_logger
+from array import array
 import math
+import sys
+import time
+
+log = get_logger("State")
+
+# index of the cell at m,n of a location in the packed cells array
+# the ship cells come first (row major), followed by the buffer cells
+def cell_index(location, m, n):
+    if location == Location.SHIP:
+        return m*SHIP_WIDTH + n
+    return SHIP_CELLS + m*BUFF_WIDTH + n
 
 '''
     A unique State is:
         containers_to_load: list of ContainerData of the containers to load
         containers_to_unload: list of Positions of the containers to unload
-        ship: 2D list of ContainerData representing the ship
-        buffer: 2D list of ContainerData representing the buffer
+        cells: packed array of container ids for every ship and buffer cell
         crane_position: Position of the crane
+        ship_floor: number of NAN cells at the bottom of each ship column, shared by all states of a search
+        buffered: number of containers in the buffer or the ship_buff rows, they all have to be moved out before the goal
         g: cost to reach this state
         h: heuristic cost to reach the goal
 
+    the ids in cells are looked up in table, a ContainerTable shared by all states of a search
+    so a successor only copies the cells array instead of every ContainerData
+
+    key is the zobrist hash of cells, the xor of table.keys[id][i] for every cell i
+    it is updated on every write so hashing a state and rejecting unequal states is O(1)
+
+    successors are generated by applying a move to the state in place, then undoing it
+    every write to cells goes on the trail, mark() remembers the state and undo() rolls it back
+    a successor object is only made (with clone) for moves that are kept
+
     State subclasses must implement:
         calculate_h: calculate the heuristic cost of this state
         is_goal: check if the state is a goal state
         next_states: generate states that can be reached from the current state
+    and set admissible if calculate_h never overestimates the cost to the goal, only then is the
+    plan a search finds known to be optimal (Search.bound)
 
 '''
 class State:
+    admissible = False
     def __init__(self, manifest: Manifest = None):
         self.crane_position = Position(Location.CRANE_REST)
         self.moves = []
         self.g = 0
         self.h = 0
-        self.ship = []
+        self.table = ContainerTable()
+        self.cells = array('H', [UNUSED]) * (SHIP_CELLS+BUFF_CELLS)
         self.ship_height_map = []
-        self.buffer = []
+        self.ship_floor = [0]*SHIP_WIDTH
         self.buffer_height_map = []
+        self.trail = []
+        self.key = 0
+        self.buffered = 0
 
         if manifest is not None:
             self.build(manifest)
@@ -42,214 +72,374 @@ class State:
     def build(self, manifest: Manifest):
         # ship is 10x12 grid, the bottom left of the ship is at (0,0)
         # the top 2 rows are the ship_buff
-        self.ship = [[ContainerData() for _ in range(SHIP_WIDTH)] for _ in range(SHIP_HEIGHT+SHIP_BUFF)]
         for i in range(SHIP_HEIGHT):
             for j in range(SHIP_WIDTH):
                 if not manifest.is_NAN(i+1, j+1): # if this position is not NAN
-                    self.ship[i][j] = manifest.data_at(i+1, j+1)  
+                    self.cells[cell_index(Location.SHIP, i, j)] = self.table.intern(manifest.data_at(i+1, j+1))
                 else:
-                    self.ship[i][j] = None
+                    self.cells[cell_index(Location.SHIP, i, j)] = NAN
     
         # if a column has NANs reaching the top of the ship
         # then the buffer cannot be used for that column
         for i in range(SHIP_WIDTH):
             if manifest.is_NAN(SHIP_HEIGHT, i+1):
-                self.ship[8][i] = None
-                self.ship[9][i] = None
+                self.cells[cell_index(Location.SHIP, 8, i)] = NAN
+                self.cells[cell_index(Location.SHIP, 9, i)] = NAN
 
         # distance from the top to the highest container in each column
         self.ship_height_map = [0 for _ in range(SHIP_WIDTH)]
         for j in range(SHIP_WIDTH):
-            for i in range(SHIP_HEIGHT+SHIP_BUFF-1, -1, -1):
-                if self.ship[i][j] == None or self.ship[i][j].name != "UNUSED":
-                    self.ship_height_map[j] = SHIP_HEIGHT+SHIP_BUFF-i-1
+            for i in range(SHIP_ROWS-1, -1, -1):
+                if self.cells[cell_index(Location.SHIP, i, j)] != UNUSED:
+                    self.ship_height_map[j] = SHIP_ROWS-i-1
                     break
                 if i==0:
-                    self.ship_height_map[j] = SHIP_HEIGHT+SHIP_BUFF
+                    self.ship_height_map[j] = SHIP_ROWS
+
+        # number of NAN cells at the bottom of each column, containers are stacked on top of them
+        # NANs never move so this is shared by every state of a search
+        self.ship_floor = [0 for _ in range(SHIP_WIDTH)]
+        for j in range(SHIP_WIDTH):
+            while self.ship_floor[j] < SHIP_ROWS and self.cells[cell_index(Location.SHIP, self.ship_floor[j], j)] == NAN:
+                self.ship_floor[j] += 1
 
-        # build buffer
-        self.buffer = [[ContainerData() for _ in range(BUFF_WIDTH)] for _ in range(BUFF_HEIGHT)]
+        # the buffer starts empty
         self.buffer_height_map = [BUFF_HEIGHT for _ in range(BUFF_WIDTH)]
+
+        self.key = 0
+        self.buffered = 0
+        for i, id in enumerate(self.cells):
+            self.key ^= self.table.keys[id][i]
+            if i >= SHIP_HEIGHT*SHIP_WIDTH and id > UNUSED:
+                self.buffered += 1
+
+    # copy this state to make a successor
+    # the container table is shared, only the packed cells and the small per state lists are copied
+    def clone(self):
+        state = self.__class__.__new__(self.__class__)
+        state.__dict__.update(self.__dict__)
+        state.cells = self.cells[:]
+        state.ship_height_map = self.ship_height_map[:]
+        state.buffer_height_map = self.buffer_height_map[:]
+        state.moves = self.moves[:]
+        state.trail = []
+        state.crane_position = Position(self.crane_position.location, [self.crane_position.m, self.crane_position.n])
+        return state
+
+    # estimated number of bytes this state keeps alive, used to hold a search to a memory budget
+    # the containers are shared through the table, the moves are shared with the parent except the last couple
+    def size(self):
+        size = sys.getsizeof(self) + sys.getsizeof(self.__dict__) + sys.getsizeof(self.cells) + sys.getsizeof(self.moves)
+        size += sys.getsizeof(self.ship_height_map) + sys.getsizeof(self.buffer_height_map) + 2*sys.getsizeof(self.crane_position)
+        for move in self.moves[-2:]:
+            size += sys.getsizeof(move) + sys.getsizeof(move.__dict__)
+        return size
+
+    # the container at pos, None if pos is a NAN cell
+    def at(self, pos: Position):
+        return self.table.containers[self.cells[cell_index(pos.location, pos.m, pos.n)]]
+
+    def ship_at(self, m, n):
+        return self.table.containers[self.cells[m*SHIP_WIDTH + n]]
+
+    def buffer_at(self, m, n):
+        return self.table.containers[self.cells[SHIP_CELLS + m*BUFF_WIDTH + n]]
+
+    # check if there is a container in the cell at m,n of a location, NAN cells are never occupied
+    def occupied(self, location, m, n):
+        return self.cells[cell_index(location, m, n)] > UNUSED
+
+    # put a container (or an empty ContainerData) in the cell at pos
+    def set_at(self, pos: Position, container: ContainerData):
+        self.write(cell_index(pos.location, pos.m, pos.n), self.table.intern(container))
+
+    # write a container id to cell i, the old id is kept on the trail so the write can be undone
+    def write(self, i, id):
+        self.trail.append((i, self.cells[i]))
+        self.put(i, id)
+
+    # write a container id to cell i, keeping the height maps, key and buffered count up to date
+    # every change to cells goes through here, undo included, subclasses can override it to track more
+    def put(self, i, id):
+        old = self.cells[i]
+        self.cells[i] = id
+        keys = self.table.keys
+        self.key ^= keys[old][i] ^ keys[id][i]
+        if (old == UNUSED) != (id == UNUSED):
+            if i < SHIP_CELLS:
+                self.ship_height_map[i % SHIP_WIDTH] += 1 if id == UNUSED else -1
+            else:
+                self.buffer_height_map[(i-SHIP_CELLS) % BUFF_WIDTH] += 1 if id == UNUSED else -1
+        # the ship_buff rows come right before the buffer cells
+        if i >= SHIP_HEIGHT*SHIP_WIDTH:
+            self.buffered += (id > UNUSED) - (old > UNUSED)
+
+    # remember this state so the moves applied to it next can be undone
+    def mark(self):
+        return (len(self.trail), len(self.moves), self.g, self.h, self.crane_position.location, self.crane_position.m, self.crane_position.n)
+
+    # undo every move applied since mark was taken
+    # the crane gets a new Position, the old one may be referenced by a Move of a successor
+    def undo(self, mark):
+        (n_trail, n_moves, self.g, self.h, location, m, n) = mark
+        while len(self.trail) > n_trail:
+            (i, id) = self.trail.pop()
+            self.put(i, id)
+        del self.moves[n_moves:]
+        self.crane_position = Position(location, [m, n])
+
+    # generate the successors of this state
+    # the moves are applied to a scratch copy, this state may be a key in a closed list and must not change
+    # with table.stats set the time it takes is added to the stats of the search
+    def expand(self, is_new=None):
+        stats = self.table.stats
+        if stats is None:
+            return self.clone().next_states(is_new)
+        start = time.perf_counter()
+        states = self.clone().next_states(is_new)
+        stats.expand_seconds += time.perf_counter() - start
+        return states
+
+    # a move has been applied to this state in place
+    # keep a copy of it as a successor if is_new accepts it, then undo the move
+    # is_new only looks at the identity and g of the state so a duplicate is dropped before it is scored
+    def emit(self, states, mark, is_new=None):
+        stats = self.table.stats
+        if is_new is None or is_new(self):
+            self.score()
+            if stats is None:
+                states.append(self.clone())
+            else:
+                start = time.perf_counter()
+                states.append(self.clone())
+                stats.clone_seconds += time.perf_counter() - start
+        elif stats is not None:
+            stats.duplicates += 1
+        self.undo(mark)
+
+    # calculate_h through the heuristic cache of the search
+    def score(self):
+        cache = self.table.h_cache
+        key = self.cache_key()
+        h = cache.get(key)
+        if h is None:
+            stats = self.table.stats
+            if stats is None:
+                self.calculate_h()
+            else:
+                start = time.perf_counter()
+                self.calculate_h()
+                stats.h_seconds += time.perf_counter() - start
+            cache.put(key, self.h)
+        else:
+            self.h = h
+
+    # the key of this state in the heuristic cache, every state the heuristic tells apart needs its own key
+    def cache_key(self):
+        return hash(self)
     
     # given a position return a list of containers above it
     # the containers are ordered bottom to top
     def containers_above(self, pos: Position):
         containers = []
-        for i in range(pos.m+1, SHIP_HEIGHT+SHIP_BUFF):
-            if self.ship[i][pos.n].name != "UNUSED":
+        for i in range(pos.m+1, SHIP_ROWS):
+            if self.occupied(Location.SHIP, i, pos.n):
                 containers.append(Position(Location.SHIP, [i, pos.n]))
         return containers
     
     # generate all possible next states by moving all reachable containers to all open positions
     # unused because this is slow
-    def all_next_states(self):
+    def all_next_states(self, is_new=None):
         states = []
         reachable_containers = self.get_reachable_containers()
         open_positions = self.get_open_positions()
         for pos in reachable_containers:
-            self.move_to_all_open_positions(pos, states, open_positions)
+            self.move_to_all_open_positions(pos, states, open_positions, is_new)
 
         return states
     
     # generate states by moving containers out of the buffers
-    def clear_buffers(self, states):
+    def clear_buffers(self, states, is_new=None):
+        mark = self.mark()
         positions = self.containers_in_buffers()
         for pos in positions:
-            state = copy.deepcopy(self)
-
-            if pos.in_ship():
-                container = state.ship[pos.m][pos.n]
-            else:
-                container = state.buffer[pos.m][pos.n]
+            container = self.at(pos)
 
             if self.crane_position != pos:
                 # move to the container
-                (prev, cost) = state.crane_position.move_to(pos, self.ship if pos.in_ship() else self.buffer)
-                state.moves.append(Move(prev, state.crane_position, cost))
-                state.g += cost
+                (prev, cost) = self.crane_position.move_to(pos, self)
+                self.moves.append(Move(prev, self.crane_position, cost))
+                self.g += cost
 
             # move the container from the buffer to the ship
-            (move_to, cost) = state.search_from(pos, False, False, self.unloading_containers_below)
+            (move_to, cost) = self.search_from(pos, False, False, self.unloading_containers_below)
             if move_to == None:
+                self.undo(mark)
                 continue
-            state.swap(pos, move_to)
-            state.crane_position = copy.deepcopy(move_to)
-            state.moves.append(Move(prev, move_to, cost, container))
-            state.g += cost
-
-            state.calculate_h()
+            self.swap(pos, move_to)
+            self.crane_position = move_to.copy()
+            self.moves.append(Move(pos, move_to, cost, container))
+            self.g += cost
 
-            states.append(state)
+            self.emit(states, mark, is_new)
 
     # generate a state by moving the crane back to the crane rest
-    def return_crane_rest(self, states):
-        state = copy.deepcopy(self)
+    def return_crane_rest(self, states, is_new=None):
         if not self.crane_position.in_crane_rest():
-            (prev, cost) = state.crane_position.move_to(Position(Location.CRANE_REST))
-            state.moves.append(Move(prev, state.crane_position, cost))
-            state.g += cost
+            mark = self.mark()
+            (prev, cost) = self.crane_position.move_to(Position(Location.CRANE_REST))
+            self.moves.append(Move(prev, self.crane_position, cost))
+            self.g += cost
 
-            state.calculate_h()
+            self.emit(states, mark, is_new)
 
-            states.append(state)
+    # estimated cost of the containers that still have to be unloaded below pos
+    # nothing is unloaded outside of loading/unloading
+    def unloading_containers_below(self, pos):
+        return 0
     
     # swap containers at pos1 and pos2
     def swap(self, pos1, pos2):
         assert (pos1.in_ship() or pos1.in_buf()) and (pos2.in_ship() or pos2.in_buf()), "Positions must be in ship or buffer, pos1: " + str(pos1) + " pos2: " + str(pos2)
-        # swap containers at pos and open_pos
-        if pos1.in_ship() and pos2.in_ship():
-            self.ship[pos1.m][pos1.n], self.ship[pos2.m][pos2.n] = self.ship[pos2.m][pos2.n], self.ship[pos1.m][pos1.n]
-            if (self.ship[pos1.m][pos1.n].name == "UNUSED") ^ (self.ship[pos2.m][pos2.n].name == "UNUSED"):
-                if self.ship[pos1.m][pos1.n].name == "UNUSED":
-                    self.ship_height_map[pos1.n] += 1
-                    self.ship_height_map[pos2.n] -= 1
-                else:
-                    self.ship_height_map[pos1.n] -= 1
-                    self.ship_height_map[pos2.n] += 1
-
-        elif pos1.in_ship() and pos2.in_buf():
-            self.ship[pos1.m][pos1.n], self.buffer[pos2.m][pos2.n] = self.buffer[pos2.m][pos2.n], self.ship[pos1.m][pos1.n]
-            if (self.ship[pos1.m][pos1.n].name == "UNUSED") ^ (self.buffer[pos2.m][pos2.n].name == "UNUSED"):
-                if self.ship[pos1.m][pos1.n].name == "UNUSED":
-                    self.ship_height_map[pos1.n] += 1
-                    self.buffer_height_map[pos2.n] -= 1
-                else:
-                    self.ship_height_map[pos1.n] -= 1
-                    self.buffer_height_map[pos2.n] += 1
-
-        elif pos1.in_buf() and pos2.in_ship():
-            self.buffer[pos1.m][pos1.n], self.ship[pos2.m][pos2.n] = self.ship[pos2.m][pos2.n], self.buffer[pos1.m][pos1.n]
-            if (self.buffer[pos1.m][pos1.n].name == "UNUSED") ^ (self.ship[pos2.m][pos2.n].name == "UNUSED"):
-                if self.buffer[pos1.m][pos1.n].name == "UNUSED":
-                    self.buffer_height_map[pos1.n] += 1
-                    self.ship_height_map[pos2.n] -= 1
-                else:
-                    self.buffer_height_map[pos1.n] -= 1
-                    self.ship_height_map[pos2.n] += 1
+        i = cell_index(pos1.location, pos1.m, pos1.n)
+        j = cell_index(pos2.location, pos2.m, pos2.n)
 
-        else:
-            self.buffer[pos1.m][pos1.n], self.buffer[pos2.m][pos2.n] = self.buffer[pos2.m][pos2.n], self.buffer[pos1.m][pos1.n]
-            if (self.buffer[pos1.m][pos1.n].name == "UNUSED") ^ (self.buffer[pos2.m][pos2.n].name == "UNUSED"):
-                if self.buffer[pos1.m][pos1.n].name == "UNUSED":
-                    self.buffer_height_map[pos1.n] += 1
-                    self.buffer_height_map[pos2.n] -= 1
-                else:
-                    self.buffer_height_map[pos1.n] -= 1
-                    self.buffer_height_map[pos2.n] += 1
+        # swap containers at pos and open_pos
+        id1 = self.cells[i]
+        self.write(i, self.cells[j])
+        self.write(j, id1)
     
-    def move_to_all_open_positions(self, start_pos, states, open_positions=None):
+    def move_to_all_open_positions(self, start_pos, states, open_positions=None, is_new=None):
         if open_positions is None:
             open_positions = self.get_open_positions()
 
+        mark = self.mark()
         for open_pos in open_positions:
             if start_pos.location == open_pos.location and start_pos.m == open_pos.m-1 and start_pos.n == open_pos.n:
                 continue
-            state = copy.deepcopy(self)
-
-            if start_pos.in_ship():
-                container = state.ship[start_pos.m][start_pos.n]
-            else:
-                container = state.buffer[start_pos.m][start_pos.n]
+            container = self.at(start_pos)
 
             # move to start pos
-            if state.crane_position != start_pos:
-                (prev, cost) = state.crane_position.move_to(start_pos, state.ship if start_pos.in_ship() else state.buffer)
-                state.moves.append(Move(prev, start_pos, cost))
-                state.g += cost
+            if self.crane_position != start_pos:
+                (prev, cost) = self.crane_position.move_to(start_pos, self)
+                self.moves.append(Move(prev, start_pos, cost))
+                self.g += cost
             
             # move the container from start_pos to open_pos
-            state.swap(start_pos, open_pos)
-            (prev, cost) = state.crane_position.move_to(open_pos, state.ship if open_pos.in_ship() else state.buffer)
-            state.moves.append(Move(prev, open_pos, cost, container))
-            state.g += cost
-            
-            state.calculate_h()
+            self.swap(start_pos, open_pos)
+            (prev, cost) = self.crane_position.move_to(open_pos, self)
+            self.moves.append(Move(prev, open_pos, cost, container))
+            self.g += cost
             
-            states.append(state)
+            self.emit(states, mark, is_new)
 
-    def search_from(self, pos, use_buff, use_ship_buff, h_func = lambda x: 0):
-        curr = copy.deepcopy(pos)
-        positions = self.get_open_positions()
+    # find the open position the container at pos is cheapest to move to
+    # every open position of a location is scored in one pass over the height maps, see open_costs
+    # h_func adds an extra cost to a position, it must never be negative so it is only called for
+    # positions that are cheap enough to win, a Position is only made for those
+    def search_from(self, pos, use_buff, use_ship_buff, h_func = None):
         best_cost = float('inf')
         best_h = float('inf')
         best_pos = None
-        for p in positions:
-            bad_pos = (p.m-1 == curr.m or p.m == curr.m) and p.n == curr.n and p.location == curr.location
-            skip_buff = not (use_buff or p.in_ship())
-            skip_ship_buff = not (use_ship_buff or (p.in_ship() and p.m < SHIP_HEIGHT))
-            if bad_pos or skip_buff or skip_ship_buff:
-                continue
-            (curr, cost) = curr.move_to(p, self.ship if p.in_ship() else self.buffer)
-            h = h_func(p)
-            if cost+h < best_cost+best_h:
-                best_cost = cost
-                best_h = h
-                best_pos = copy.deepcopy(p)
+        # the buffer is only used when the ship buffer is too, positions are tried buffer first
+        locations = [Location.BUFFER, Location.SHIP] if use_buff and use_ship_buff else [Location.SHIP]
+        for location in locations:
+            height_map = self.ship_height_map if location == Location.SHIP else self.buffer_height_map
+            rows = SHIP_ROWS if location == Location.SHIP else BUFF_HEIGHT
+            costs = self.open_costs(pos, location)
+            for j in range(len(height_map)):
+                m = rows - height_map[j] # the open position of column j
+                if height_map[j] == 0 or (location == Location.SHIP and not use_ship_buff and m >= SHIP_HEIGHT):
+                    continue
+                if location == pos.location and j == pos.n and (m-1 == pos.m or m == pos.m):
+                    continue
+                c = costs[j]
+                if c >= best_cost+best_h:
+                    continue
+                p = Position(location, [m, j])
+                h = 0 if h_func is None else h_func(p)
+                if c+h < best_cost+best_h:
+                    best_cost = c
+                    best_h = h
+                    best_pos = p
 
         if math.isnan(best_cost):
-            print("hello")
+            log.warning("NaN cost moving the container at %s", pos)
 
         return (best_pos, best_cost)
 
+    # cost to move the crane from pos to the open position of every column of location
+    # a column with no open position costs inf
+    # for a walk within the location the climbs over the columns right of pos are shared by every
+    # position to the right, so they are added up in one sweep instead of one walk per position
+    def open_costs(self, pos, location):
+        if location == Location.SHIP:
+            rows = SHIP_ROWS
+            height_map = self.ship_height_map
+            floor = self.ship_floor
+        else:
+            rows = BUFF_HEIGHT
+            height_map = self.buffer_height_map
+            floor = None
+        width = len(height_map)
+        costs = [float('inf')]*width
+
+        if pos.location != location:
+            base = TRANSFER_COST[pos.location][location] + EXIT_COST[pos.location][pos.m*WIDTH[pos.location] + pos.n]
+            exit_cost = EXIT_COST[location]
+            for j in range(width):
+                if height_map[j] > 0:
+                    costs[j] = base + exit_cost[(rows - height_map[j])*width + j]
+            return costs
+
+        # from a virtual cell every move is the manhattan distance
+        # (an open position is never a virtual cell, those are above the top of their location)
+        if pos.in_virtual_cell():
+            for j in range(width):
+                if height_map[j] > 0:
+                    costs[j] = abs(pos.m - (rows - height_map[j])) + abs(pos.n - j)
+            return costs
+
+        # columns to the left walk right to pos, each from its own height
+        for j in range(pos.n):
+            if height_map[j] > 0:
+                costs[j] = walk_cost(self, location, rows - height_map[j], j, pos.m, pos.n)
+        if height_map[pos.n] > 0:
+            costs[pos.n] = abs(rows - height_map[pos.n] - pos.m)
+
+        # columns to the right, m is the height of the walk after climbing every column before j
+        m = pos.m
+        climb = 0
+        for j in range(pos.n+1, width):
+            top = rows - height_map[j]
+            if height_map[j] > 0:
+                costs[j] = j - pos.n + climb + abs(top - m)
+            if m < top and (floor is None or m >= floor[j]):
+                climb += top - m
+                m = top
+        return costs
+
     def get_reachable_containers(self):
         reachable_containers = []
         for i in range(BUFF_WIDTH):
-            if self.buffer_height_map[i] < BUFF_HEIGHT and self.buffer[BUFF_HEIGHT-self.buffer_height_map[i]-1][i] and self.buffer[BUFF_HEIGHT-self.buffer_height_map[i]-1][i].name != "UNUSED":
+            if self.buffer_height_map[i] < BUFF_HEIGHT and self.occupied(Location.BUFFER, BUFF_HEIGHT-self.buffer_height_map[i]-1, i):
                 reachable_containers.append(Position(Location.BUFFER, [BUFF_HEIGHT-self.buffer_height_map[i]-1, i]))
 
         for i in range(SHIP_WIDTH):
-            if self.ship_height_map[i] < SHIP_HEIGHT+SHIP_BUFF and self.ship[SHIP_HEIGHT+SHIP_BUFF-self.ship_height_map[i]-1][i] and self.ship[SHIP_HEIGHT+SHIP_BUFF-self.ship_height_map[i]-1][i].name != "UNUSED":
-                reachable_containers.append(Position(Location.SHIP, [SHIP_HEIGHT+SHIP_BUFF-self.ship_height_map[i]-1, i]))
+            if self.ship_height_map[i] < SHIP_ROWS and self.occupied(Location.SHIP, SHIP_ROWS-self.ship_height_map[i]-1, i):
+                reachable_containers.append(Position(Location.SHIP, [SHIP_ROWS-self.ship_height_map[i]-1, i]))
 
         return reachable_containers
     
     def containers_in_buffers(self):
+        if self.buffered == 0:
+            return []
         reachable = self.get_reachable_containers()
         positions = []
         for pos in reachable:
             if pos.in_buf():
                 positions.append(pos)
-            if pos.in_ship_buf() and self.ship[pos.m][pos.n]:
+            if pos.in_ship_buf():
                 positions.append(pos)
 
         return positions
@@ -262,7 +452,7 @@ class State:
         
         for i in range(SHIP_WIDTH):
             if self.ship_height_map[i] > 0:
-                open_positions.append(Position(Location.SHIP, [SHIP_HEIGHT+SHIP_BUFF-self.ship_height_map[i], i]))
+                open_positions.append(Position(Location.SHIP, [SHIP_ROWS-self.ship_height_map[i], i]))
         
         return open_positions
 
@@ -271,22 +461,13 @@ class State:
     def __lt__(self, other):
         return self.g + self.h < other.g + other.h
     
+    # states with different keys are never equal, the cells are only compared when the keys match
     def __eq__(self, other):
         if not isinstance(other, State):
             return False
-        for i in range(SHIP_HEIGHT+SHIP_BUFF):
-            for j in range(SHIP_WIDTH):
-                if self.ship[i][j] != other.ship[i][j]:
-                    return False
-                
-        for i in range(BUFF_HEIGHT):
-            for j in range(BUFF_WIDTH):
-                if self.buffer[i][j] != other.buffer[i][j]:
-                    return False
-                
-        self.crane_position == other.crane_position
-                
-        return True
+        if self.key != other.key or self.crane_position != other.crane_position:
+            return False
+        return self.cells == other.cells
     
     def __hash__(self) -> int:
-        return hash(tuple([tuple(row) for row in self.ship]) + tuple([tuple(row) for row in self.buffer]) + (self.crane_position.m, self.crane_position.n))
\ No newline at end of file
+        return self.key ^ self.table.crane_key(self.crane_position)
@@ -1,47 +1,226 @@
 ## Logger is the interface to write out to the standard log file
+## the lines are handed to a LogWriter that writes them from a background thread, so logging never waits on the disk
+## every Logger writing to the same file shares its writer, and it is safe to log from any thread or process
 from datetime import datetime, timezone, timedelta
+import atexit
+import multiprocessing.util
 import os
+import queue
+import threading
+import time
+from consts import LOG_FLUSH_INTERVAL, LOG_DURABILITY, LOG_UNWRITTEN
+from Load_Balance.Diagnostics import get_logger
+
+log = get_logger("Logger")
+
+PST = timezone(timedelta(hours=-8))
 
 def get_time():
-    pst = timezone(timedelta(hours=-8))
-    now = datetime.now(pst)
+    now = datetime.now(PST)
     return now.strftime("%Y-%m-%d %H:%M") + " "
 
+## LogWriter appends the lines queued to it to one log file from a background thread
+## the file is kept open, and reopened if it is moved or deleted
+## how soon a line reaches the disk is the durability:
+##     "interval": lines are flushed every LOG_FLUSH_INTERVAL seconds, a crash can lose that many seconds of lines
+##     "line": lines are flushed as soon as they are written, a crash of the program does not lose them
+##     "fsync": lines are flushed and synced to the disk as soon as they are written, a crash of the machine does not either
+## close writes every line queued before it returns, it is called for every writer when the program exits
+## lines that cannot be written are kept and tried again, in order, with the lines queued after them, or after interval seconds
+## a line is never dropped, if the file still cannot be written when the writer is closed the lines left are saved
+## next to it in path + LOG_UNWRITTEN and an error is reported, a line can be written twice if a write fails halfway
+## the file is utf-8, characters that cannot be encoded are written as escapes
+class LogWriter:
+    def __init__(self, path, durability=LOG_DURABILITY, interval=LOG_FLUSH_INTERVAL):
+        assert durability in ("interval", "line", "fsync"), "unknown log durability " + str(durability)
+        self.path = path
+        self.durability = durability
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.file = None
+        self.flushed = time.monotonic()
+        self.closed = False
+        self.pending = [] # lines taken off the queue that are not written yet
+        self.buffered = [] # lines written to the file but not flushed, written again if the flush fails
+        self.failures = 0 # tries in a row that failed to write pending
+        self.thread = threading.Thread(target=self.run, name="LogWriter", daemon=True)
+        self.thread.start()
+
+    def write(self, text):
+        self.queue.put(text)
+
+    ## wait until every line queued so far has been written and flushed, or given up on
+    ## returns straight away if the writer is closed
+    def flush(self):
+        done = threading.Event()
+        self.queue.put(done)
+        while not done.wait(self.interval):
+            if not self.thread.is_alive():
+                return
+
+    ## write every line queued and close the file, lines queued after this are dropped
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    def run(self):
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.interval)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self.pending.extend(item for item in batch if isinstance(item, str))
+            waiting = [item for item in batch if not isinstance(item, str)]
+            closing = None in waiting
+            self.write_pending(closing or waiting or self.durability != "interval" or time.monotonic() - self.flushed >= self.interval, closing)
+            for item in waiting:
+                if item is not None:
+                    item.set()
+            if closing:
+                self.close_file()
+                return
+
+    # write the lines pending to the file and sync it if asked to
+    # if that fails they are kept for the next try, the last try saves them in the unwritten file
+    def write_pending(self, sync, last=False):
+        try:
+            if self.pending:
+                self.open().write("".join(self.pending))
+                self.buffered.extend(self.pending)
+                self.pending = []
+            if sync:
+                self.sync()
+                self.buffered = []
+            if self.failures:
+                log.warning("wrote the lines of %s held back by %d failed tries", self.path, self.failures)
+            self.failures = 0
+        except Exception as e:
+            # keep going so the lines after these can still be written, the file is opened again for them
+            self.pending = self.buffered + self.pending
+            self.buffered = []
+            self.failures += 1
+            self.close_file()
+            if last:
+                self.save_unwritten(e)
+            elif self.failures == 1:
+                log.error("could not write %d lines of %s, they are kept and tried again: %s", len(self.pending), self.path, e)
+
+    # save the lines that could never be written to a file next to the log and report where they are
+    # if even that fails the lines are put in the error itself
+    def save_unwritten(self, error):
+        path = self.path + LOG_UNWRITTEN
+        try:
+            with open(path, 'a', encoding="utf-8", errors="backslashreplace") as f:
+                f.write("".join(self.pending))
+            log.error("could not write %d lines of %s, they were saved to %s: %s", len(self.pending), self.path, path, error)
+        except Exception as e:
+            log.error("could not write %d lines of %s or save them to %s: %s\n%s", len(self.pending), self.path, path, e, "".join(self.pending))
+        self.pending = []
+
+    def close_file(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+            except Exception:
+                pass
+            self.file = None
+
+    # the open log file, opened again if the one open is no longer at path
+    def open(self):
+        if self.file is not None:
+            try:
+                moved = os.stat(self.path).st_ino != os.fstat(self.file.fileno()).st_ino
+            except OSError:
+                moved = True
+            if moved:
+                self.file.close()
+                self.file = None
+        if self.file is None:
+            self.file = open(self.path, 'a+', encoding="utf-8", errors="backslashreplace")
+        return self.file
+
+    def sync(self):
+        self.flushed = time.monotonic()
+        if self.file is None:
+            return
+        self.file.flush()
+        if self.durability == "fsync":
+            os.fsync(self.file.fileno())
+
+writers = {} # path -> the LogWriter of that file in this process
+writers_lock = threading.Lock()
+writers_pid = None # process the writers were made in, a forked child makes its own
+
+# the writer of the log file at path
+def get_writer(path):
+    global writers_pid
+    with writers_lock:
+        if writers_pid != os.getpid():
+            # the writer threads of the parent were not copied into this process
+            writers.clear()
+            writers_pid = os.getpid()
+            atexit.register(close_writers)
+            multiprocessing.util.Finalize(None, close_writers, exitpriority=0) # worker processes exit without atexit
+        writer = writers.get(path)
+        if writer is None or writer.closed:
+            writer = writers[path] = LogWriter(path)
+        return writer
+
+## write out every line logged and close the log files
+def close_writers():
+    with writers_lock:
+        closing = list(writers.values())
+    for writer in closing:
+        writer.close()
+
 class Logger:
     def __init__(self):
-        pst = timezone(timedelta(hours=-8))
-        now = datetime.now(pst)
+        now = datetime.now(PST)
         self.logname = "KeoghsPort" + str(now.strftime("%Y")) +  ".txt"
         self.logpath = os.path.dirname(os.path.abspath(__file__)) + "/Logs/"
         self.currentoperator = ""
 
+    # queue text to be appended to the log file
+    def write(self, text):
+        get_writer(self.logpath + self.logname).write(text)
+
+    ## wait until everything logged so far is in the log file
+    def flush(self):
+        get_writer(self.logpath + self.logname).flush()
+
     ## Log a move that was made by the operator
     #move = 1 or 2
     #1 = onload
     #2 = unload
     #3 = moved within ship
     def log_move(self, move):
-        with open(self.logpath + self.logname, 'a+') as f:
-            f.write(get_time() + self.currentoperator + ' ' + str(move) + "\n")
+        self.write(get_time() + self.currentoperator + ' ' + str(move) + "\n")
 
     def log_open_manifest(self, manifest):
-        with open(self.logpath + self.logname, 'a+') as f:
-            f.write(get_time() + "Manifest "+ manifest.manifest_name + ".txt is opened, there are "+ str(manifest.container_amount()) + " containers on the ship\n")
+        self.write(get_time() + "Manifest "+ manifest.manifest_name + ".txt is opened, there are "+ str(manifest.container_amount()) + " containers on the ship\n")
 
     def log_close_manifest(self, manifest):
-        with open(self.logpath + self.logname, 'a+') as f:
-            f.write(get_time() + "Finishes a cycle. Manifest " + manifest.manifest_name + "OUTBOUND.txt was written to desktop, and a reminder pop-up to operator to send file was displayed\n")
+        self.write(get_time() + "Finishes a cycle. Manifest " + manifest.manifest_name + "OUTBOUND.txt was written to desktop, and a reminder pop-up to operator to send file was displayed\n")
 
     ## Log a comment that the operator wants to make
     def log_comment(self, comment):
-        with open(self.logpath + self.logname, 'a+') as f:
-            f.write(get_time() + self.currentoperator + ' ' + comment + "\n")
+        self.write(get_time() + self.currentoperator + ' ' + comment + "\n")
 
     ## Log a sign in by the operator
     ## Updates the current operator
     def log_sign_in(self, operator):
-        with open(self.logpath + self.logname, 'a+') as f:
-            if(self.currentoperator != ""):
-                f.write(get_time() + self.currentoperator + " signs out\n")
-            f.write(get_time() + operator + " signs in\n")
-            self.currentoperator = operator
+        text = ""
+        if(self.currentoperator != ""):
+            text += get_time() + self.currentoperator + " signs out\n"
+        text += get_time() + operator + " signs in\n"
+        self.write(text)
+        self.currentoperator = operator
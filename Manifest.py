@@ -2,12 +2,14 @@ from ContainerData import ContainerData
 from Logger import Logger
 ## Manifest is the interface for interacting with the manifest file
 ## The manifest file is a grid of ContainerData objects
+## opening and saving a manifest is written to the operator's log, unless audit is False
+## headless tools that plan manifests nobody opened (batch.py, bench.py) turn it off
 class Manifest:
-    def __init__(self, manifest_path, txtfile):
+    def __init__(self, manifest_path, txtfile, audit=True):
         self.manifest_path = manifest_path
         self.manifest_name = txtfile
         self.ContainerMatrix = []
-        self.log = Logger()
+        self.log = Logger() if audit else None
 
     ## read the manifest file at manifest_path
     ## and store the data in manifest for future use
@@ -37,7 +39,8 @@ class Manifest:
             ContainerMatrix.append(ContainerRow)
         
         self.ContainerMatrix = ContainerMatrix
-        self.log.log_open_manifest(self)
+        if self.log is not None:
+            self.log.log_open_manifest(self)
 
     ## Determine if a position is NAN
     def is_NAN(self, x, y):
@@ -102,7 +105,8 @@ class Manifest:
         with open(self.manifest_path + self.manifest_name + 'OUTBOUND.txt', 'w') as f:
             for i in OutboundList:
                 f.write(i)
-        self.log.log_close_manifest(self)
+        if self.log is not None:
+            self.log.log_close_manifest(self)
 
     def get_containers(self):
         """Return a list of ContainerData objects for containers in the manifest."""
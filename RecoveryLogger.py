@@ -1,58 +1,88 @@
 from Move import Move
 from Load_Balance.Position import Position
 from ContainerData import ContainerData
+from Snapshot import Snapshot
+from consts import RECOVERY_FSYNC
 import os
+import re
+import zlib
+
+MAGIC = "ARK-RECOVERY 1\n"
+RECORD = re.compile(r"([PS]) (\d{8}) ([0-9a-f]{8})(?: (.*))?\n")
 
 ## A RecoveryLogger is made when the operator starts making moves
 ## It will log last completed move and the list of all moves calculated
 ## When the operator completes all moves the RecoveryLogger will be deleted
-## format of the file is:
-## number of Moves, N
-## last completed Move
-## Move 1..N
+## the recovery file is an append only journal:
+## the plan is written once, to a temporary file that is renamed into place so it is either all there or not at all
+##     ARK-RECOVERY 1
+##     number of Moves, N
+##     task
+##     Move 1..N
+##     PLAN crc32 of the lines above
+## followed by a progress record for every move completed, appended so the cost per move does not grow with the plan
+##     P number of moves completed, 8 digits, crc32 of "P 00000012"
+## or, when the GUI saves one, a snapshot record with what is where after those moves, so it can resume by showing it
+##     S number of moves completed, 8 digits, crc32 of "S 00000012 snapshot", the Snapshot as one line
+## a snapshot of the ship before any move is written after the plan when create is given one
+## recover reads up to the last record with a good checksum, a record cut short by a crash is cut off the file
+## how often the file is synced to the disk is RECOVERY_FSYNC:
+##     "always": the plan and every record, a crash of the machine loses nothing
+##     "plan": only the plan, a crash of the machine can lose the last records
+##     "never": left to the operating system
 class RecoveryLogger:
     ## Initialize the RecoveryLogger
-    def __init__(self, recovery_path):
+    def __init__(self, recovery_path, fsync=RECOVERY_FSYNC):
+        assert fsync in ("always", "plan", "never"), "unknown recovery fsync policy " + str(fsync)
         self.recovery_file = "recover.txt"
         self.recovery_path = recovery_path
-        self.lines = None
+        self.fsync = fsync
+        self.lines = None # the lines of the plan, set by create() or recover()
         self.last_task = ""
+        self.completed = 0
+        self.snapshot = None # the Snapshot of the last snapshot record, it can be behind completed
 
     def fexists(self):
-        exists = False
-        try:
-            with open(self.recovery_path + self.recovery_file, "r") as _:
-                exists = True
-        except FileNotFoundError:
-            pass
-
-        return exists
+        return os.path.isfile(self.recovery_path + self.recovery_file)
 
-    ## Write a new recovery file using a list of Moves
-    def create(self, moves):
+    ## Write a new recovery file using a list of Moves, and the Snapshot before the first of them if there is one
+    def create(self, moves, snapshot=None):
         exists = self.fexists()
 
-    
         assert not exists, "create() should not be called if a recovery file already exists"
         assert self.lines == None, "create() and recover() should not be called in the same instance of RecoveryLogger"
 
-        with open(self.recovery_path + self.recovery_file, "w") as f:
-            f.write(str(len(moves)) + "\n")
-            self.lines = [str(len(moves)) + "\n"]
-            f.write(str(0) + "\n")
-            self.lines.append(str(0) + "\n")
-            f.write(self.last_task)
-            self.lines.append(self.last_task + '\n')
-            for i in range(len(moves)):
-                f.write(self.stringify_move(moves[i]) + "\n")
-                self.lines.append(self.stringify_move(moves[i]) + "\n")
+        self.lines = [str(len(moves)) + "\n", self.last_task.rstrip("\n") + "\n"]
+        for move in moves:
+            self.lines.append(self.stringify_move(move) + "\n")
+        self.completed = 0
+        self.snapshot = snapshot
+        self.write_plan()
+
+    # write the plan in lines to a new recovery file, followed by a record of the moves completed and the snapshot if there are any
+    def write_plan(self):
+        plan = MAGIC + "".join(self.lines)
+        plan += "PLAN " + checksum(plan) + "\n"
+        if self.snapshot is not None:
+            plan += record(self.snapshot.completed, self.snapshot)
+        if self.completed and (self.snapshot is None or self.snapshot.completed != self.completed):
+            plan += record(self.completed)
+
+        path = self.recovery_path + self.recovery_file
+        with open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+            f.write(plan)
+            f.flush()
+            if self.fsync != "never":
+                os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
 
     ## Convert a Move to a string
     def stringify_move(self, move):
         return move.m_from.location + " " + str(move.m_from.m) + " " + str(move.m_from.n) + " " + move.m_to.location + " " + str(move.m_to.m) + " " + str(move.m_to.n) + " " + str(move.time_to_move) + " " + str(move.container.weight) + " " + move.container.name
 
     ## Recover the list of Moves and the current Move from the recovery file
-    ## If no recovery file exists there is nothing to recover
+    ## the last snapshot saved is left in self.snapshot, None if there is none, Snapshot.replay brings it up to the current Move
+    ## If no recovery file exists, or its plan is damaged, there is nothing to recover
     def recover(self):
         exists = self.fexists()
 
@@ -61,18 +91,65 @@ class RecoveryLogger:
         if not exists:
             return None, None
 
-        with open(self.recovery_path + self.recovery_file, "r") as f:
-            self.lines = f.readlines()
-        
+        path = self.recovery_path + self.recovery_file
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+        if not text.startswith(MAGIC):
+            return self.recover_rewritten(text)
+
+        # the plan ends at the line with its checksum
+        end = text.find("\nPLAN ", len(MAGIC) - 1)
+        if end < 0:
+            return None, None
+        plan_end = text.find("\n", end + 1)
+        if plan_end < 0 or text[end+6:plan_end] != checksum(text[:end+1]):
+            return None, None
+        self.lines = text[len(MAGIC):end+1].splitlines(keepends=True)
+
+        # the last good progress record says how many moves were completed
+        # only the last snapshot is parsed, the ones before it are checked but not used
+        self.completed = 0
+        self.snapshot = None
+        last_snapshot = None # (text, completed) of the last good snapshot record
+        good = plan_end + 1
+        for match in RECORD.finditer(text, good):
+            (kind, count, crc, snapshot) = match.groups()
+            if match.start() != good or (kind == "S") != (snapshot is not None):
+                break
+            if crc != checksum(kind + " " + count + ("" if snapshot is None else " " + snapshot)):
+                break
+            self.completed = int(count)
+            if snapshot is not None:
+                last_snapshot = (snapshot, self.completed)
+            good = match.end()
+        if last_snapshot is not None:
+            self.snapshot = Snapshot.parse(*last_snapshot)
+        if good < len(text):
+            with open(path, "r+", encoding="utf-8") as f: # cut off what a crash left half written, so new records follow a good one
+                f.truncate(len(text[:good].encode("utf-8")))
+
+        return self.parse_plan()
+
+    # the plan of a recovery file written before it was a journal, the move count was on the second line
+    # the file is written again as a journal so the next moves can be appended to it
+    def recover_rewritten(self, text):
+        lines = text.splitlines(keepends=True)
+        if len(lines) < 2:
+            return None, None
+        self.completed = int(lines[1])
+        self.lines = [lines[0]] + lines[2:]
+        recovered = self.parse_plan()
+        self.write_plan()
+        return recovered
+
+    # the moves of the plan in lines, and the number of them completed
+    def parse_plan(self):
         n_steps = int(self.lines[0])
-        last_completed = int(self.lines[1])
-        self.last_task = self.lines[2]
+        self.last_task = self.lines[1]
         moves = []
         for i in range(n_steps):
-            moves.append(self.parse_move(self.lines[i+3]))
-
-        return moves, last_completed
-    
+            moves.append(self.parse_move(self.lines[i+2]))
+        return moves, self.completed
 
     ## Moves formmated as:
     ## from_location from_row from_column to_location to_row to_column time_to_move container_weight container_name
@@ -83,25 +160,23 @@ class RecoveryLogger:
       m_to = Position(parts[3], [int(parts[4]), int(parts[5])])
       ttm = int(parts[6])
       weight = int(parts[7])
-      name = parts[8]
-      for i in range(9, len(parts)-1):
-          name += " " + parts[i]
+      name = " ".join(parts[8:])
       container = ContainerData(name, weight)
       return Move(m_from, m_to, ttm, container)
 
-    ## Write the last completed move to the recovery file
-    def save_next_move(self):
+    ## Append that one more move was completed to the recovery file, with the Snapshot after it if there is one
+    def save_next_move(self, snapshot=None):
         exists = self.fexists()
         if not exists:
             return
-        with open(self.recovery_path  + self.recovery_file, "w") as f:
-            f.write(self.lines[0])
-            print(self.lines[1])
-            self.lines[1] = str(int(self.lines[1])+1)
-            f.write(self.lines[1] + "\n")
-            f.write(self.last_task)
-            for i in range(len(self.lines)-3):
-                f.write(self.lines[i+3])
+        self.completed += 1
+        if snapshot is not None:
+            self.snapshot = snapshot
+        with open(self.recovery_path + self.recovery_file, "a", encoding="utf-8", newline="") as f:
+            f.write(record(self.completed, snapshot))
+            f.flush()
+            if self.fsync == "always":
+                os.fsync(f.fileno())
 
     ## Delete the recovery file
     def delete(self):
@@ -109,4 +184,19 @@ class RecoveryLogger:
         if not exists:
             return
         os.remove(self.recovery_path + self.recovery_file)
-        self.lines = None
\ No newline at end of file
+        self.lines = None
+        self.completed = 0
+        self.snapshot = None
+
+# the progress record of completed moves, a snapshot record if there is a snapshot
+def record(completed, snapshot=None):
+    if snapshot is None:
+        count = "P " + str(completed).zfill(8)
+        return count + " " + checksum(count) + "\n"
+    count = "S " + str(completed).zfill(8)
+    text = snapshot.stringify()
+    return count + " " + checksum(count + " " + text) + " " + text + "\n"
+
+# crc32 of text as 8 hex digits
+def checksum(text):
+    return format(zlib.crc32(text.encode()), "08x")
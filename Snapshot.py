@@ -0,0 +1,85 @@
+from ContainerData import ContainerData
+from Load_Balance.Position import Location
+import json
+
+## A Snapshot is what is where after some of the moves of a plan were made
+## it is saved in the recovery file with every move completed, so a session can be resumed by showing it
+## instead of making all the moves again
+## cells are 0 indexed (m, n) like a Position, only cells that are not UNUSED are kept, NAN cells are kept as containers named NAN
+class Snapshot:
+    def __init__(self, ship=None, buffer=None, truck=None, completed=0):
+        self.ship = ship or {}     # (m, n) -> ContainerData
+        self.buffer = buffer or {} # (m, n) -> ContainerData
+        self.truck = truck         # ContainerData on the truck, or None
+        self.completed = completed # number of moves of the plan made
+
+    ## Snapshot of the ship before any move, from the lines of a manifest file
+    ## lines formatted as: [row,column], {weight}, name with rows and columns 1 indexed
+    @staticmethod
+    def from_manifest(lines):
+        ship = {}
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            name = line[18:]
+            if name != "UNUSED":
+                ship[(int(line[1:3]) - 1, int(line[4:6]) - 1)] = ContainerData(name, int(line[10:15]))
+        return Snapshot(ship)
+
+    ## Make a move, moves of the crane alone change nothing
+    def apply(self, move):
+        if move.container.name != "UNUSED":
+            self.take(move.m_from)
+            self.put(move.m_to, move.container)
+        self.completed += 1
+
+    ## Make the moves of the plan from the ones already made up to completed
+    def replay(self, moves, completed):
+        for move in moves[self.completed:completed]:
+            self.apply(move)
+
+    def take(self, position):
+        if position.location == Location.SHIP:
+            self.ship.pop((position.m, position.n), None)
+        elif position.location == Location.BUFFER:
+            self.buffer.pop((position.m, position.n), None)
+        elif position.location == Location.TRUCK:
+            self.truck = None
+
+    def put(self, position, container):
+        if position.location == Location.SHIP:
+            self.ship[(position.m, position.n)] = container
+        elif position.location == Location.BUFFER:
+            self.buffer[(position.m, position.n)] = container
+        elif position.location == Location.TRUCK:
+            self.truck = container
+
+    ## Convert the Snapshot to one line of text, the number of moves completed is not part of it
+    def stringify(self):
+        return json.dumps({
+            "ship": cells(self.ship),
+            "buffer": cells(self.buffer),
+            "truck": None if self.truck is None else [self.truck.weight, self.truck.name],
+        }, separators=(",", ":"))
+
+    ## Snapshot from the text of stringify, after completed moves
+    @staticmethod
+    def parse(text, completed):
+        data = json.loads(text)
+        truck = data["truck"]
+        return Snapshot(
+            {(m, n): ContainerData(name, weight) for (m, n, weight, name) in data["ship"]},
+            {(m, n): ContainerData(name, weight) for (m, n, weight, name) in data["buffer"]},
+            None if truck is None else ContainerData(truck[1], truck[0]),
+            completed,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Snapshot):
+            return False
+        return self.stringify() == other.stringify() and self.completed == other.completed
+
+# the cells of a location as [m, n, weight, name] lists, in order so the same cells always give the same text
+def cells(location):
+    return [[m, n, container.weight, container.name] for ((m, n), container) in sorted(location.items())]
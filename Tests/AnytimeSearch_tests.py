@@ -0,0 +1,85 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.AnytimeSearch import AnytimeSearch
+from Load_Balance.BalanceState import BalanceState
+from Load_Balance.Balancer import Balancer
+from Load_Balance.Loader import Loader
+from Manifest import Manifest
+from ContainerData import ContainerData
+
+class TestAnytimeSearch(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+
+    def manifest(self, name):
+        manifest = Manifest(self.path, name)
+        manifest.read_manifest()
+        return manifest
+
+    def test_deadline(self):
+        # the deadline holds before the first plan too, the search has none and the Balancer takes the two phase plan
+        state = BalanceState(self.manifest("ShipCase4"))
+        state.calculate_h()
+        search = AnytimeSearch("Balancer", time_limit=0)
+        self.assertIsNone(search.search([state]))
+        self.assertTrue(search.out_of_time)
+        self.assertFalse(search.stats.aborted)
+
+        balancer = Balancer(self.manifest("ShipCase4"))
+        moves = balancer.balance(time_limit=0)
+        self.assertFalse(balancer.out_of_time)
+        self.assertGreaterEqual(sum(move.time_to_move for move in moves), 60)
+        self.assertEqual(balancer.bound, float('inf'))
+
+        # the Loader has nothing to fall back on
+        loader = Loader(self.manifest("ShipCase3"))
+        self.assertEqual(loader.load_unload([ContainerData("Bat", 532)], [ContainerData("Cow")], time_limit=0), [])
+        self.assertTrue(loader.out_of_time)
+
+    def test_optimal_stop(self):
+        # with an admissible h the search stops once the plan is known to be optimal, a second A* pass expands nothing
+        expanded = []
+        for weights in [(1,), (1, 1)]:
+            state = BalanceState(self.manifest("ShipCase4"))
+            state.calculate_h()
+            search = AnytimeSearch("Balancer", weights=weights)
+            self.assertEqual(search.search([state]).g, 60)
+            self.assertEqual(search.bound, 1.0)
+            expanded.append(search.stats.expanded)
+        self.assertEqual(expanded[0], expanded[1])
+
+    def test_no_deadline(self):
+        # given time every pass runs and the plan is the same cost as the one A* finds
+        state = BalanceState(self.manifest("ShipCase4"))
+        state.calculate_h()
+        search = AnytimeSearch("Balancer")
+        goal = search.search([state])
+        self.assertEqual(goal.g, 60)
+        self.assertEqual(search.bound, 1.0) # the last pass is A*, nothing the search can reach is cheaper
+
+    def test_memory_budget(self):
+        # a pass that runs out of memory ends like one out of time, with no plan yet SMAStar finds the first one
+        for max_nodes in (5, 50):
+            state = BalanceState(self.manifest("ShipCase4"))
+            state.calculate_h()
+            search = AnytimeSearch("Balancer", max_nodes=max_nodes)
+            goal = search.search([state])
+            self.assertTrue(search.out_of_memory)
+            self.assertEqual(goal.g, 60)
+
+        balancer = Balancer(self.manifest("ShipCase4"), max_nodes=50, max_bytes=None)
+        self.assertEqual(balancer.make_search(time_limit=30).max_nodes, 50)
+
+    def test_load_deadline(self):
+        loader = Loader(self.manifest("test_manifest"))
+        moves = loader.load_unload([ContainerData("Fish", 4323), ContainerData("Cat", 4324), ContainerData("Dog", 4325)],
+                                   [ContainerData("Red"), ContainerData("Purple"), ContainerData("Green")], time_limit=60)
+        self.assertEqual(sum(move.time_to_move for move in moves), 88)
+        self.assertIsNone(loader.bound) # the load heuristic can overestimate
+
+if __name__ == "__main__":
+    print("Running AnytimeSearch tests")
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.BalanceState import BalanceState
+from Load_Balance.Position import Position, Location
+from Load_Balance.LayoutPlanner import LayoutPlanner
+from Load_Balance.Search import Search
+from Manifest import Manifest
+from ContainerData import ContainerData
+
+class TestBalanceState(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+        manifest = Manifest(self.path, "ShipCase1")
+        manifest.read_manifest()
+        self.state = BalanceState(manifest)
+
+    # the incremental weights match weighing the ship from scratch
+    def assertWeighed(self, state):
+        (l, r) = (state.left_weight, state.right_weight)
+        state.weigh_sides()
+        self.assertEqual((l, r), (state.left_weight, state.right_weight))
+
+    def test_weights(self):
+        self.assertEqual((self.state.left_weight, self.state.right_weight), (199, 0))
+        mark = self.state.mark()
+
+        # Cat crosses the centre line
+        self.state.swap(Position(Location.SHIP, [0, 1]), Position(Location.SHIP, [0, 7]))
+        self.assertEqual((self.state.left_weight, self.state.right_weight), (100, 99))
+        self.assertWeighed(self.state)
+
+        # Dog goes to the buffer, then the ship_buff rows, neither are weighed
+        self.state.swap(Position(Location.SHIP, [0, 2]), Position(Location.BUFFER, [0, 0]))
+        self.assertEqual((self.state.left_weight, self.state.right_weight), (0, 99))
+        self.assertEqual(self.state.buffered, 1)
+        self.state.swap(Position(Location.BUFFER, [0, 0]), Position(Location.SHIP, [8, 3]))
+        self.assertEqual(self.state.buffered, 1)
+        self.assertWeighed(self.state)
+
+        self.state.undo(mark)
+        self.assertEqual((self.state.left_weight, self.state.right_weight), (199, 0))
+        self.assertEqual(self.state.buffered, 0)
+
+    def test_weight_index(self):
+        self.assertEqual(self.state.left_index, [(99, 0, -1), (100, 0, -2)])
+        self.assertEqual(self.state.right_index, [])
+
+        # either container balances the ship alone, the crane gets to Cat or Dog and carries it across the centre (17 either way)
+        # and gets back to the crane rest from the right half, where the two containers stack at most 2 high (16)
+        self.state.calculate_h()
+        self.assertEqual(self.state.h, 33)
+
+        mark = self.state.mark()
+        self.state.swap(Position(Location.SHIP, [0, 2]), Position(Location.SHIP, [0, 9]))
+        clone = self.state.clone()
+        self.assertEqual(clone.right_index, [(100, 0, -9)])
+        clone.index_weights()
+        self.assertEqual((clone.left_index, clone.right_index), (self.state.left_index, self.state.right_index))
+
+        self.state.undo(mark)
+        self.assertEqual(self.state.left_index, [(99, 0, -1), (100, 0, -2)])
+        self.assertEqual(self.state.right_index, [])
+
+        # the ship_buff rows are not weighed, so not indexed either
+        self.state.swap(Position(Location.SHIP, [0, 2]), Position(Location.SHIP, [8, 3]))
+        self.assertEqual(self.state.left_index, [(99, 0, -1)])
+        self.state.undo(mark)
+        self.assertEqual(self.state.left_index, [(99, 0, -1), (100, 0, -2)])
+
+    def test_lower_bound(self):
+        # h never overestimates, not even the cost of a plan the search cannot find
+        manifest = Manifest(self.path, "test_manifest")
+        manifest.read_manifest()
+        state = BalanceState(manifest)
+        state.calculate_h()
+        goal = LayoutPlanner(state).plan()
+        self.assertEqual(goal.g, 44)
+        self.assertLessEqual(state.h, goal.g)
+
+    def test_admissible_on_plan(self):
+        # h is never more than what is left of the cost of a plan, at every state on the way
+        for name in ["ShipCase1", "ShipCase2", "ShipCase3", "ShipCase4", "SilverQueen"]:
+            manifest = Manifest(self.path, name)
+            manifest.read_manifest()
+            state = BalanceState(manifest)
+            state.calculate_h()
+            goal = Search().search([state])
+            remaining = goal.g
+            for move in goal.moves:
+                state.calculate_h()
+                self.assertLessEqual(state.h, remaining, name + ": " + str(move))
+                if move.container.name != "UNUSED":
+                    state.swap(move.m_from, move.m_to)
+                state.crane_position = move.m_to.copy()
+                remaining -= move.time_to_move
+            state.calculate_h()
+            self.assertEqual(state.h, 0)
+
+    def test_goal(self):
+        self.state.swap(Position(Location.SHIP, [0, 1]), Position(Location.SHIP, [0, 7]))
+        self.assertTrue(self.state.is_goal())
+
+        # not a goal while a container is left in the buffer
+        self.state.set_at(Position(Location.BUFFER, [0, 0]), ContainerData("Fox", 42))
+        self.assertFalse(self.state.is_goal())
+        self.state.set_at(Position(Location.BUFFER, [0, 0]), ContainerData())
+        self.assertTrue(self.state.is_goal())
+
+if __name__ == "__main__":
+    print("Running BalanceState tests")
+    unittest.main()
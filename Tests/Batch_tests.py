@@ -0,0 +1,71 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import json
+import shutil
+import signal
+import tempfile
+import batch
+from Logger import Logger
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+        self.folder = tempfile.mkdtemp()
+        self.out = tempfile.mkdtemp()
+        for name in ["ShipCase1", "ShipCase3", "ShipCase4"]:
+            shutil.copy(self.path + name + ".txt", self.folder)
+        with open(os.path.join(self.folder, "ShipCase3.task.json"), "w") as f:
+            json.dump({"load": ["Bat:532", "Rat:6317"], "unload": ["Cow"]}, f)
+        with open(os.path.join(self.folder, "ShipCase4.task.json"), "w") as f:
+            json.dump({"load": ["Nat"]}, f) # no weight
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+        shutil.rmtree(self.out)
+
+    def test_find_jobs(self):
+        shutil.copy(self.path + "ShipCase1.txt", os.path.join(self.folder, "ShipCase1OUTBOUND.txt"))
+        jobs = batch.find_jobs(self.folder)
+        self.assertEqual([name for (name, _) in jobs], ["ShipCase1", "ShipCase3", "ShipCase4"])
+        self.assertEqual(jobs[0][1], {"balance": True})
+
+    def test_run_batch(self):
+        results = {result["name"]: result for result in batch.run_batch(self.folder, self.out, workers=2, time_limit=None)}
+        self.assertEqual(results["ShipCase1"]["total_minutes"], 34)
+        self.assertEqual(results["ShipCase3"]["total_minutes"], 46)
+        self.assertGreater(results["ShipCase3"]["expanded"], 0)
+        self.assertFalse(results["ShipCase4"]["ok"])
+        self.assertIn("NAME:WEIGHT", results["ShipCase4"]["error"])
+
+        for name in ["ShipCase1", "ShipCase3"]:
+            self.assertTrue(os.path.isfile(os.path.join(self.out, name + "OUTBOUND.txt")))
+            with open(os.path.join(self.out, name + ".plan.json")) as f:
+                self.assertEqual(json.load(f)["total_minutes"], results[name]["total_minutes"])
+        self.assertFalse(os.path.isfile(os.path.join(self.out, "ShipCase4.plan.json")))
+
+    def test_no_audit(self):
+        # planning a manifest nobody opened is not an operator's cycle, nothing goes in their log
+        log = Logger()
+        path = log.logpath + log.logname
+        log.flush()
+        size = os.path.getsize(path) if os.path.isfile(path) else 0
+        result = batch.run_job(self.folder, "ShipCase1", {"balance": True}, self.out, None, False)
+        self.assertTrue(result["ok"])
+        log.flush()
+        self.assertEqual(os.path.getsize(path) if os.path.isfile(path) else 0, size)
+
+    @unittest.skipUnless(hasattr(signal, "SIGALRM"), "the timeout needs SIGALRM")
+    def test_timeout(self):
+        # the full search does not find a plan for the full ship in any reasonable time
+        shutil.copy(self.path + "full_manifest.txt", self.folder)
+        result = batch.run_job(self.folder, "full_manifest", {"balance": True}, self.out + "/", None, False, 1)
+        self.assertFalse(result["ok"])
+        self.assertIn("timed out", result["error"])
+        self.assertLess(result["seconds"], 5)
+
+if __name__ == "__main__":
+    print("Running Batch tests")
+    unittest.main()
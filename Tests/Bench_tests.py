@@ -0,0 +1,53 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import copy
+import bench
+from Logger import Logger
+
+class TestBench(unittest.TestCase):
+    def test_scenarios(self):
+        names = [name for (name, _) in bench.scenarios()]
+        self.assertIn("balance ShipCase1", names)
+        self.assertIn("load ShipCase3 +Bat,Rat -Cow", names)
+        self.assertFalse(any("OUTBOUND" in name for name in names))
+
+    def test_run_suite(self):
+        results = bench.run_suite(timeout=30, only="ShipCase3")
+        self.assertEqual(set(results["scenarios"]), {"balance ShipCase3", "load ShipCase3 +Bat,Rat -Cow"})
+        balance = results["scenarios"]["balance ShipCase3"]
+        self.assertEqual(balance["status"], "ok")
+        self.assertEqual(balance["cost"], 44)
+        self.assertGreater(balance["generated"], 0)
+        self.assertEqual(results["scenarios"]["load ShipCase3 +Bat,Rat -Cow"]["cost"], 46)
+
+    def test_no_audit(self):
+        # a benchmark run is not an operator's cycle, nothing goes in their log
+        log = Logger()
+        path = log.logpath + log.logname
+        log.flush()
+        size = os.path.getsize(path) if os.path.isfile(path) else 0
+        self.assertEqual(bench.run_scenario({"manifest": "ShipCase1", "balance": True}, None)["status"], "ok")
+        log.flush()
+        self.assertEqual(os.path.getsize(path) if os.path.isfile(path) else 0, size)
+
+    def test_compare(self):
+        result = {"status": "ok", "seconds": 1.0, "expanded": 100, "generated": 300, "peak_memory_mb": 20.0, "cost": 40, "error": None}
+        baseline = {"scenarios": {"a": dict(result), "b": dict(result), "c": dict(result)}}
+        results = copy.deepcopy(baseline)
+        self.assertEqual(bench.compare(baseline, results), [])
+
+        results["scenarios"]["a"].update(cost=42, seconds=1.1) # within the time tolerance
+        results["scenarios"]["b"].update(expanded=200)
+        results["scenarios"]["c"].update(status="timeout")
+        regressions = bench.compare(baseline, results)
+        self.assertEqual(len(regressions), 3)
+        self.assertIn("plan cost 40 -> 42", regressions[0])
+        self.assertIn("expanded", regressions[1])
+        self.assertIn("timeout", regressions[2])
+
+if __name__ == "__main__":
+    print("Running Bench tests")
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.ClosedList import ClosedList
+from Load_Balance.State import State
+from Load_Balance.Position import Position, Location
+from Manifest import Manifest
+
+class TestClosedList(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+        manifest = Manifest(self.path, "ShipCase1")
+        manifest.read_manifest()
+        self.state = State(manifest)
+        self.state.g = 10
+
+    def test_duplicates(self):
+        closed = ClosedList()
+        self.assertTrue(closed.add(self.state))
+        self.assertIn(self.state, closed)
+
+        # the same state reached with the same or a higher g is dropped
+        dup = self.state.clone()
+        self.assertFalse(closed.improves(dup))
+        self.assertFalse(closed.add(dup))
+        dup.g = 12
+        self.assertFalse(closed.add(dup))
+        self.assertEqual(len(closed), 1)
+
+    def test_reopen(self):
+        closed = ClosedList()
+        closed.add(self.state)
+
+        # the same state reached with a lower g is re-opened and the old copy is stale
+        better = self.state.clone()
+        better.g = 5
+        self.assertTrue(closed.improves(better))
+        self.assertTrue(closed.add(better))
+        self.assertTrue(closed.is_stale(self.state))
+        self.assertFalse(closed.is_stale(better))
+        self.assertEqual(closed.reopened, 1)
+
+    def test_different_states(self):
+        closed = ClosedList()
+        closed.add(self.state)
+        other = self.state.clone()
+        other.swap(Position(Location.SHIP, [0, 1]), Position(Location.BUFFER, [0, 0]))
+        self.assertTrue(closed.add(other))
+        self.assertEqual(len(closed), 2)
+
+if __name__ == "__main__":
+    print("Running ClosedList tests")
+    unittest.main()
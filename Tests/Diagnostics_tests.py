@@ -0,0 +1,110 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import io
+import subprocess
+import logging
+from Load_Balance import Diagnostics
+from Load_Balance.Diagnostics import get_logger, configure, RateLimit, solver_log
+from Load_Balance.Search import Search
+from Load_Balance.BalanceState import BalanceState
+from Manifest import Manifest
+
+# counts how many times it is formatted into a message
+class Formatted:
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "formatted"
+
+class TestDiagnostics(unittest.TestCase):
+    def setUp(self):
+        self.level = solver_log.level
+
+    def tearDown(self):
+        if Diagnostics.handler is not None:
+            solver_log.removeHandler(Diagnostics.handler)
+            Diagnostics.handler = None
+        solver_log.setLevel(self.level)
+        solver_log.propagate = True
+
+    def test_levels(self):
+        out = io.StringIO()
+        configure("INFO", out)
+        log = get_logger("Test")
+        value = Formatted()
+        log.debug("not shown %s", value)
+        log.info("shown %s", value)
+        self.assertEqual(value.count, 1) # the debug message was never formatted
+        self.assertIn("INFO solver.Test: shown formatted", out.getvalue())
+        self.assertNotIn("not shown", out.getvalue())
+
+    def test_no_propagate(self):
+        # a root handler set up by the application does not show the solver messages a second time
+        shown = io.StringIO()
+        root = logging.StreamHandler(shown)
+        logging.getLogger().addHandler(root)
+        try:
+            out = io.StringIO()
+            configure("INFO", out)
+            get_logger("Test").warning("once")
+        finally:
+            logging.getLogger().removeHandler(root)
+        self.assertIn("once", out.getvalue())
+        self.assertEqual(shown.getvalue(), "")
+
+    def test_rate_limit(self):
+        out = io.StringIO()
+        configure("DEBUG", out, interval=60)
+        log = get_logger("Test")
+        for i in range(5):
+            log.debug("frontier %d", i)
+        log.debug("other")
+        log.error("error %d", 1)
+        log.error("error %d", 2)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn("frontier 0", lines[0])
+
+        # the next one let through says how many were dropped
+        limit = RateLimit(0)
+        record = logging.LogRecord("solver.Test", logging.DEBUG, "", 0, "frontier %d", (1,), None)
+        self.assertTrue(limit.filter(record))
+        limit.dropped[("solver.Test", "frontier %d")] = 3
+        self.assertTrue(limit.filter(record))
+        self.assertIn("3 more like this dropped", record.getMessage())
+
+    def test_search_quiet(self):
+        out = io.StringIO()
+        configure("WARNING", out)
+        Search("Test").search([self.fresh_state()])
+        self.assertEqual(out.getvalue(), "")
+
+        out = io.StringIO()
+        configure("DEBUG", out)
+        Search("Test").search([self.fresh_state()])
+        self.assertIn("DEBUG solver.Test: frontier 0", out.getvalue())
+
+    def test_bad_level(self):
+        # an unknown ARK_LOG_LEVEL falls back to WARNING instead of stopping the solver from importing
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        for (value, level) in (("verbose", "WARNING"), ("debug", "DEBUG")):
+            env = dict(os.environ, ARK_LOG_LEVEL=value)
+            out = subprocess.run([sys.executable, "-c", "import Load_Balance.Diagnostics, consts; print(consts.DIAGNOSTICS_LEVEL)"],
+                                 cwd=root, env=env, stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+            self.assertEqual(out.strip(), level)
+
+    def fresh_state(self):
+        manifest = Manifest(os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/", "ShipCase4")
+        manifest.read_manifest()
+        state = BalanceState(manifest)
+        state.calculate_h()
+        return state
+
+if __name__ == "__main__":
+    print("Running Diagnostics tests")
+    unittest.main()
@@ -0,0 +1,32 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.DigTable import DigTable, dig_table
+from consts import SHIP_WIDTH
+
+class TestDigTable(unittest.TestCase):
+    def test_flat(self):
+        table = DigTable([0]*SHIP_WIDTH)
+        # nothing above the container
+        self.assertEqual(table.cost(3, 4, 3), 0)
+        # each container above is put down next door at its own row and the crane comes back down, 1 + 2
+        self.assertEqual(table.cost(3, 4, 0), 9)
+        self.assertEqual(table.cost(0, 2, 0), 3)
+
+    def test_floor(self):
+        # the columns next to column 1 are raised, the containers have to go up onto them or further away
+        floor = [4, 0, 4] + [0]*(SHIP_WIDTH-3)
+        table = DigTable(floor)
+        self.assertEqual(table.cost(1, 2, 0), 5) # two columns over to column 3
+        self.assertEqual(table.cost(1, 5, 3), 3) # row 4 is level with the floor next to it
+
+    def test_per_vessel(self):
+        floor = [1]*SHIP_WIDTH
+        self.assertIs(dig_table(floor), dig_table(list(floor)))
+        self.assertIsNot(dig_table(floor), dig_table([0]*SHIP_WIDTH))
+
+if __name__ == "__main__":
+    print("Running DigTable tests")
+    unittest.main()
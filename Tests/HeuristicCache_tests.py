@@ -0,0 +1,55 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.HeuristicCache import HeuristicCache
+from Load_Balance.BalanceState import BalanceState
+from Load_Balance.ClosedList import ClosedList
+from Manifest import Manifest
+
+class TestHeuristicCache(unittest.TestCase):
+    def test_lru(self):
+        cache = HeuristicCache(2)
+        cache.put(1, 10)
+        cache.put(2, 20)
+        self.assertEqual(cache.get(1), 10) # 2 is now the least recently used
+        cache.put(3, 30)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual((cache.get(1), cache.get(3)), (10, 30))
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (3, 1, 2))
+
+    def test_off(self):
+        cache = HeuristicCache(0)
+        cache.put(1, 10)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 0)
+
+    def test_score(self):
+        manifest = Manifest(os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/", "ShipCase1")
+        manifest.read_manifest()
+        state = BalanceState(manifest)
+        cache = state.table.h_cache
+
+        children = state.expand()
+        self.assertEqual(cache.misses, len(children))
+        for child in children:
+            h = child.h
+            child.calculate_h()
+            self.assertEqual(h, child.h)
+
+        # regenerated children are looked up instead of scored
+        state.expand()
+        self.assertEqual(cache.hits, len(children))
+
+        # duplicates are dropped before they are scored
+        closed = ClosedList()
+        for child in children:
+            closed.add(child)
+        cache.clear()
+        self.assertEqual(state.expand(closed.improves), [])
+        self.assertEqual(cache.hits + cache.misses, 0)
+
+if __name__ == "__main__":
+    print("Running HeuristicCache tests")
+    unittest.main()
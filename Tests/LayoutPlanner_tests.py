@@ -0,0 +1,59 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.LayoutPlanner import LayoutPlanner, assign
+from Load_Balance.BalanceState import BalanceState
+from Load_Balance.Balancer import Balancer
+from Manifest import Manifest
+
+class TestLayoutPlanner(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+
+    def state(self, name):
+        manifest = Manifest(self.path, name)
+        manifest.read_manifest()
+        return BalanceState(manifest)
+
+    def test_assign(self):
+        self.assertEqual(assign([[4, 1, 3], [2, 0, 5], [3, 2, 2]]), [1, 0, 2])
+        self.assertEqual(assign([[7, 1, 9, 2]]), [1])
+        self.assertEqual(assign([[1, 2], [1, 9]]), [1, 0])
+
+    def test_plan(self):
+        state = self.state("ShipCase1")
+        planner = LayoutPlanner(state)
+        self.assertEqual(len(planner.choose_crossing()), 1)
+
+        goal = planner.plan()
+        self.assertTrue(goal.is_goal())
+        self.assertEqual(goal.g, 34)
+        self.assertEqual(goal.g, sum(move.time_to_move for move in goal.moves))
+        # the starting state is left as it was
+        self.assertEqual((state.left_weight, state.right_weight), (199, 0))
+        self.assertEqual(state.moves, [])
+
+    # no half has room below the top of the ship, containers swap halves through the ship_buff rows
+    def test_full_ship(self):
+        state = self.state("full_manifest")
+        self.assertEqual(LayoutPlanner(state).free_cells(), [0, 0])
+        goal = LayoutPlanner(state).plan()
+        self.assertTrue(goal.is_goal())
+        self.assertEqual(goal.buffered, 0)
+
+    def test_no_plan(self):
+        self.assertIsNone(LayoutPlanner(self.state("ShipCase5")).plan())
+
+    def test_balancer(self):
+        manifest = Manifest(self.path, "ShipCase3")
+        manifest.read_manifest()
+        manifest.save = lambda: None
+        balancer = Balancer(manifest, two_phase=True)
+        moves = balancer.balance()
+        self.assertEqual(sum(move.time_to_move for move in moves), 44)
+
+if __name__ == "__main__":
+    print("Running LayoutPlanner tests")
+    unittest.main()
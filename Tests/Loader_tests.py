@@ -6,6 +6,7 @@ sys.path.insert(0, '/Users/youngsterethan/Desktop/CS179M_Project/CS179M_Project-
 
 import unittest
 from Load_Balance.Loader import Loader
+from Load_Balance.Position import Position, Location
 from Manifest import Manifest
 from ContainerData import ContainerData
 
@@ -98,6 +99,41 @@ class TestLoader(unittest.TestCase):
             ContainerData("Pig"),
             ])
 
+    # which of the containers with the same name to unload is left to the search
+    def test_unload_choice(self):
+        manifest = Manifest(self.path, "test_manifest")
+        manifest.read_manifest()
+        loader = Loader(manifest)
+
+        states = loader.make_starting_states([], [ContainerData("Black"), ContainerData("Red"), ContainerData("Red")])
+        self.assertEqual(len(states), 1)
+        self.assertEqual(len(states[0].containers_to_unload), 2)
+        self.assertEqual([(count, len(positions)) for (count, positions) in states[0].unload_choices], [(1, 3)])
+
+        # more than there are on the ship
+        self.assertEqual(loader.make_starting_states([], [ContainerData("Green")]*3), [])
+
+        moves = loader.load_unload([], [ContainerData("Black")])
+        self.assertEqual([move.container.name for move in moves if move.m_to.in_truck()], ["Black"])
+
+    # a container of a choice in the way is moved aside like any other, it can no longer be the one unloaded
+    def test_choice_in_the_way(self):
+        manifest = Manifest(self.path, "test_manifest")
+        manifest.read_manifest()
+        loader = Loader(manifest)
+
+        # a Black is on the Green at [3,7]
+        (state,) = loader.make_starting_states([], [ContainerData("Green"), ContainerData("Green"), ContainerData("Black")])
+        green = Position(Location.SHIP, [2, 6])
+        black = Position(Location.SHIP, [3, 6])
+        states = [n_state for n_state in state.next_states() if green not in n_state.containers_to_unload and n_state.unload_choices]
+        self.assertEqual(len(states), 1)
+        self.assertEqual(states[0].at(black).name, "UNUSED")
+        self.assertEqual([(count, black in positions, len(positions)) for (count, positions) in states[0].unload_choices], [(1, False, 2)])
+
+        moves = loader.load_unload([], [ContainerData("Green"), ContainerData("Green"), ContainerData("Black")])
+        self.assertEqual(sorted(move.container.name for move in moves if move.m_to.in_truck()), ["Black", "Green", "Green"])
+
     # hard tests commented out to reduce runtime on github actions
     
     # def test_load_unload_hard(self):
@@ -3,7 +3,12 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import unittest
-from Logger import Logger
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from Logger import Logger, LogWriter
+from consts import LOG_UNWRITTEN
 from Manifest import Manifest
 from ContainerData import ContainerData
 
@@ -48,6 +53,135 @@ class TestLogger(unittest.TestCase):
 
         self.log.log_close_manifest(p)
 
+# log a comment from a worker process
+def log_in_process(logpath, comment):
+    log = Logger()
+    log.logpath = logpath
+    log.logname = "worker.txt"
+    log.log_comment(comment)
+
+class TestLogWriter(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.log = Logger()
+        self.log.logpath = self.folder + "/"
+        self.log.logname = "audit.txt"
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def read(self, name="audit.txt"):
+        with open(os.path.join(self.folder, name)) as f:
+            return f.read().splitlines()
+
+    def test_order(self):
+        self.log.log_sign_in("John Smith")
+        self.log.log_comment("first")
+        self.log.log_sign_in("Anil Patel")
+        self.log.flush()
+        lines = self.read()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].endswith("John Smith signs in"))
+        self.assertTrue(lines[1].endswith("John Smith first"))
+        self.assertTrue(lines[2].endswith("John Smith signs out"))
+
+    def test_threads(self):
+        def work(i):
+            for j in range(50):
+                self.log.log_comment(str(i) + "-" + str(j))
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.log.flush()
+        self.assertEqual(len(self.read()), 8*50)
+
+    def test_reopen(self):
+        self.log.log_comment("before")
+        self.log.flush()
+        os.remove(os.path.join(self.folder, "audit.txt"))
+        self.log.log_comment("after")
+        self.log.flush()
+        self.assertEqual(len(self.read()), 1)
+
+    def test_close(self):
+        for durability in ["interval", "line", "fsync"]:
+            path = os.path.join(self.folder, durability + ".txt")
+            writer = LogWriter(path, durability, interval=60)
+            for i in range(100):
+                writer.write(str(i) + "\n")
+            writer.close() # nothing queued is lost
+            self.assertEqual(len(self.read(durability + ".txt")), 100)
+
+    def test_write_error(self):
+        path = os.path.join(self.folder, "error.txt")
+        writer = LogWriter(path, "line", interval=0.01)
+        open_file = writer.open
+        fails = [ValueError("bad file")] # any error, not only an OSError
+        def failing_open():
+            if fails:
+                raise fails.pop()
+            return open_file()
+        writer.open = failing_open
+        writer.write("kept\n")
+        writer.flush()
+        writer.write("after\n")
+        writer.flush()
+        self.assertTrue(writer.thread.is_alive())
+        writer.close()
+        self.assertEqual(self.read("error.txt"), ["kept", "after"])
+
+    def test_write_errors(self):
+        # the lines are kept however many tries fail, and written in order once the file can be written again
+        path = os.path.join(self.folder, "errors.txt")
+        writer = LogWriter(path, "line", interval=0.01)
+        open_file = writer.open
+        fails = [OSError("disk full")]*4 # every flush is one more try that fails
+        def failing_open():
+            if fails:
+                raise fails.pop()
+            return open_file()
+        writer.open = failing_open
+        writer.write("first\n")
+        for i in range(4):
+            writer.flush()
+        writer.write("second\n")
+        writer.close()
+        self.assertEqual(fails, [])
+        self.assertEqual(self.read("errors.txt"), ["first", "second"])
+
+    def test_unwritten(self):
+        # the lines that cannot be written by the time the writer is closed are saved next to the log
+        path = os.path.join(self.folder, "unwritten.txt")
+        writer = LogWriter(path, "line", interval=0.01)
+        def failing_open():
+            raise OSError("read only")
+        writer.open = failing_open
+        writer.write("first\n")
+        writer.flush()
+        writer.write("second\n")
+        writer.close()
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.read("unwritten.txt" + LOG_UNWRITTEN), ["first", "second"])
+
+    def test_flush_after_close(self):
+        writer = LogWriter(os.path.join(self.folder, "closed.txt"), "line", interval=0.01)
+        writer.close()
+        writer.flush() # returns instead of waiting for a thread that is gone
+
+    def test_utf8(self):
+        writer = LogWriter(os.path.join(self.folder, "utf8.txt"), "line")
+        writer.write("Caf\u00e9 \u00c5sa\n")
+        writer.close()
+        with open(os.path.join(self.folder, "utf8.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "Caf\u00e9 \u00c5sa\n")
+
+    def test_process(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            list(executor.map(log_in_process, [self.folder + "/"]*4, ["a", "b", "c", "d"]))
+        self.assertEqual(sorted(line[-1] for line in self.read("worker.txt")), ["a", "b", "c", "d"])
+
 if __name__ == "__main__":
     print("Running Logger tests")
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.Balancer import Balancer
+from Load_Balance.Loader import Loader
+from Load_Balance.ParallelSearch import ParallelSearch
+from Load_Balance.Search import Search
+from Load_Balance.BalanceState import BalanceState
+from Manifest import Manifest
+from ContainerData import ContainerData
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+
+    def manifest(self, name):
+        manifest = Manifest(self.path, name)
+        manifest.read_manifest()
+        return manifest
+
+    def test_balance(self):
+        # the plan found by the workers costs the same as the one found by a single process
+        balancer = Balancer(self.manifest("ShipCase3"), workers=2)
+        self.assertIsInstance(balancer.make_search(), ParallelSearch)
+        moves = balancer.balance()
+        self.assertEqual(sum(move.time_to_move for move in moves), 44)
+
+    def test_load(self):
+        # the goal popped by A* is not the cheapest one it generates, the workers have to pick the same one
+        loader = Loader(self.manifest("ShipCase3"), workers=2)
+        moves = loader.load_unload([ContainerData("Bat", 532), ContainerData("Rat", 6317)], [ContainerData("Cow")])
+        self.assertEqual(sum(move.time_to_move for move in moves), 46)
+
+        loader = Loader(self.manifest("test_manifest"), workers=2)
+        moves = loader.load_unload([ContainerData("Fish", 4323), ContainerData("Cat", 4324), ContainerData("Dog", 4325)],
+                                   [ContainerData("Red"), ContainerData("Purple"), ContainerData("Green")])
+        self.assertEqual(sum(move.time_to_move for move in moves), 88)
+
+    def test_already_balanced(self):
+        # the starting state is already a goal, the workers hand it back with no moves
+        state = BalanceState(self.manifest("ShipCase2"))
+        state.calculate_h()
+        start = Search("Balancer").search([state])
+        start.moves = []
+        start.g = 0
+        table = start.table
+        goal = ParallelSearch("Balancer", 2).search([start])
+        self.assertTrue(goal.is_goal())
+        self.assertEqual(goal.moves, [])
+        self.assertEqual(goal, start)
+        self.assertIs(start.table, table) # the state handed to the workers is left as it was
+
+    def test_finished(self):
+        search = ParallelSearch("Balancer", 2)
+        self.assertTrue(search.finished([3, 2], [4, 0], [1, 1], 1))
+        self.assertFalse(search.finished([3, 2], [4, 0], [1, 0], 1)) # a worker is still searching
+        self.assertFalse(search.finished([3, 2], [3, 0], [1, 1], 1)) # a batch is on its way
+
+        # worker 0 sends a state to worker 1, which handles it and goes idle again while the counters are read
+        # each read on its own adds up, only comparing the two waves shows the search went on in between
+        sent = Reads([1, 0], [2, 0])
+        received = Reads([0, 1], [0, 2])
+        self.assertFalse(search.finished(sent, received, [1, 1], 0))
+
+## counters that have changed every time they are read again
+class Reads:
+    def __init__(self, *reads):
+        self.reads = iter(reads)
+
+    def __iter__(self):
+        return iter(next(self.reads))
+
+if __name__ == "__main__":
+    print("Running ParallelSearch tests")
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import itertools
+from Load_Balance.Partition import Partition, is_balanced
+from Load_Balance.BalanceState import BalanceState
+from Manifest import Manifest
+
+class TestPartition(unittest.TestCase):
+    def test_feasible(self):
+        self.assertTrue(Partition([99, 100], []).feasible)
+        self.assertTrue(Partition([], []).feasible)
+        self.assertFalse(Partition([10], []).feasible)
+        self.assertFalse(Partition([10, 1, 1], [2]).feasible)
+
+    def test_min_moves(self):
+        partition = Partition([99, 100], [])
+        self.assertEqual(partition.min_moves, 1)
+        self.assertEqual(partition.targets, [99, 100])
+
+        # already balanced
+        partition = Partition([50, 5], [52])
+        self.assertEqual(partition.min_moves, 0)
+        self.assertEqual(partition.targets, [55])
+
+        # the big container crosses instead of both small ones
+        partition = Partition([50, 30, 20], [])
+        self.assertEqual(partition.min_moves, 1)
+        self.assertEqual(partition.targets, [50])
+
+    def test_moves_left(self):
+        partition = Partition([50, 30, 20], [])
+        self.assertEqual(partition.moves_left([20, 30, 50], 3), 1) # nothing has moved yet
+        self.assertEqual(partition.moves_left([20, 30], 3), 0)     # 50 crossed
+        self.assertEqual(partition.moves_left([20, 50], 2), 0)     # 30 was taken off the halves
+        self.assertEqual(Partition([10], []).moves_left([10], 1), 0) # never balanced, nothing to count on
+        self.assertEqual(partition.moves_left(iter([20, 30, 50]), 3), 1) # read once from an iterator
+
+    # compare against trying every way of moving the containers
+    def test_brute_force(self):
+        cases = [([3, 8, 1], [9]), ([7, 7, 2, 5], [1]), ([1, 2, 4], [8, 16]), ([12, 3], [5, 6, 1])]
+        for (left, right) in cases:
+            weights = [(w, True) for w in left] + [(w, False) for w in right]
+            best = None
+            for mask in itertools.product([False, True], repeat=len(weights)):
+                l = sum(w for ((w, from_left), moved) in zip(weights, mask) if from_left != moved)
+                if is_balanced(l, sum(left) + sum(right) - l):
+                    if best is None or sum(mask) < best:
+                        best = sum(mask)
+            partition = Partition(left, right)
+            self.assertEqual(partition.feasible, best is not None)
+            self.assertEqual(partition.min_moves, best)
+
+    def test_balance_state(self):
+        path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+        manifest = Manifest(path, "ShipCase1")
+        manifest.read_manifest()
+        state = BalanceState(manifest)
+        self.assertTrue(state.partition.feasible)
+        self.assertEqual(state.partition.min_moves, 1)
+        self.assertIs(state.clone().partition, state.partition)
+
+        manifest = Manifest(path, "ShipCase5")
+        manifest.read_manifest()
+        self.assertFalse(BalanceState(manifest).partition.feasible)
+
+if __name__ == "__main__":
+    print("Running Partition tests")
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.State import State
+from Load_Balance.Position import Position, Location, cost
+from Manifest import Manifest
+from ContainerData import ContainerData
+
+class TestPosition(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+        manifest = Manifest(self.path, "ShipCase1")
+        manifest.read_manifest()
+        self.state = State(manifest)
+
+    def test_cross_location(self):
+        ship = Position(Location.SHIP, [0, 0])
+        buffer = Position(Location.BUFFER, [0, 0])
+        truck = Position(Location.TRUCK)
+        rest = Position(Location.CRANE_REST)
+        self.assertEqual(cost(ship, truck), 12)        # 2 + 10 up
+        self.assertEqual(cost(truck, ship), 12)
+        self.assertEqual(cost(buffer, ship), 41)       # 4 + 4 up 23 across + 10 up
+        self.assertEqual(cost(buffer, truck), 29)
+        self.assertEqual(cost(rest, ship), 11)
+        self.assertEqual(cost(rest, truck), 1)
+
+    def test_walk(self):
+        a = Position(Location.SHIP, [1, 0])
+        b = Position(Location.SHIP, [0, 3])
+        self.assertEqual(cost(a, b, self.state), 4)
+
+        # stack two containers on Cat, the crane has to climb over them
+        self.state.set_at(Position(Location.SHIP, [1, 1]), ContainerData("Fox", 42))
+        self.state.set_at(Position(Location.SHIP, [2, 1]), ContainerData("Owl", 7))
+        self.assertEqual(cost(a, b, self.state), 8)
+        self.assertEqual(cost(b, a, self.state), 8)
+
+        # without a state the containers are not known
+        self.assertEqual(cost(a, b), 4)
+
+    def test_move_to(self):
+        a = Position(Location.SHIP, [1, 0])
+        b = Position(Location.BUFFER, [3, 4])
+        c = cost(a, b, self.state)
+        self.assertEqual((a.location, a.m, a.n), (Location.SHIP, 1, 0)) # cost does not move anything
+
+        (prev, move_cost) = a.move_to(b, self.state)
+        self.assertEqual(move_cost, c)
+        self.assertEqual(prev, Position(Location.SHIP, [1, 0]))
+        self.assertEqual(a, b)
+
+if __name__ == "__main__":
+    print("Running Position tests")
+    unittest.main()
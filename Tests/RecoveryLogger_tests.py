@@ -3,28 +3,34 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import unittest
+import shutil
+import tempfile
 from RecoveryLogger import RecoveryLogger
 from Move import Move
 from Load_Balance.Position import Position, Location
 from ContainerData import ContainerData
+from Snapshot import Snapshot
 
 
 class TestRecoveryLogger(unittest.TestCase):
     def setUp(self):
-        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../"
+        self.path = tempfile.mkdtemp() + "/"
+        self.m1 = Move(Position(Location.CRANE_REST), Position(Location.SHIP, [0, 1]), 5)
+        self.m2 = Move(Position(Location.SHIP, [0, 1]), Position(Location.SHIP, [0, 2]), 5, ContainerData("John's shrimp and stuff", 100))
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
 
     def test_create(self):
         rl = RecoveryLogger(self.path)
         rl.delete()
 
         rl.create([])
-        
-        with open(self.path + rl.recovery_file, "r") as f:
-            lines = f.readlines()
+        self.assertTrue(rl.fexists())
 
-        self.assertEqual(len(lines), 2)
-        self.assertEqual(int(lines[0]), 0)
-        self.assertEqual(int(lines[1]), 0)
+        moves, last_completed = RecoveryLogger(self.path).recover()
+        self.assertEqual(moves, [])
+        self.assertEqual(last_completed, 0)
 
     def test_recover(self):
         rl = RecoveryLogger(self.path)
@@ -48,28 +54,160 @@ class TestRecoveryLogger(unittest.TestCase):
         rl = RecoveryLogger(self.path)
         rl.delete()
 
-        m1 = Move(Position(Location.CRANE_REST), Position(Location.SHIP, [0, 1]), 5)
-        m2 = Move(Position(Location.SHIP, [0, 1]), Position(Location.SHIP, [0, 2]), 5, ContainerData("test", 100))
-
-        rl.create([m1, m2])
+        rl.last_task = "Balancing\n"
+        rl.create([self.m1, self.m2])
         
         rl.save_next_move()
 
-        with open(self.path + rl.recovery_file, "r") as f:
-            lines = f.readlines()
-
-        self.assertEqual(int(lines[0]), 2)
-        self.assertEqual(int(lines[1]), 1)
-
         # generally it makes no sense to call recover after create, 
         # but for testing purposes we can do it
         rl2  = RecoveryLogger(self.path)
         moves, last_completed = rl2.recover()
         self.assertEqual(len(moves), 2)
         self.assertEqual(last_completed, 1)
-        self.assertEqual(m1, moves[0])
-        self.assertEqual(m2, moves[1])
+        self.assertEqual(self.m1, moves[0])
+        self.assertEqual(self.m2, moves[1])
+        self.assertEqual(rl2.last_task, "Balancing\n")
+
+        # the recovered logger carries on from where it was
+        rl2.save_next_move()
+        self.assertEqual(RecoveryLogger(self.path).recover()[1], 2)
+
+    def test_append_only(self):
+        rl = RecoveryLogger(self.path, fsync="never")
+        rl.create([self.m1, self.m2]*50)
+        file = self.path + rl.recovery_file
+        with open(file, "rb") as f:
+            plan = f.read()
+        sizes = []
+        for _ in range(3):
+            rl.save_next_move()
+            sizes.append(os.path.getsize(file))
+        with open(file, "rb") as f:
+            self.assertTrue(f.read().startswith(plan)) # the plan is never written again
+        self.assertEqual(sizes[1] - sizes[0], sizes[2] - sizes[1]) # every record is the same size
+
+    def test_torn_record(self):
+        rl = RecoveryLogger(self.path)
+        rl.create([self.m1, self.m2])
+        rl.save_next_move()
+        rl.save_next_move()
+        file = self.path + rl.recovery_file
+
+        # a crash while writing the second record leaves half of it
+        size = os.path.getsize(file)
+        with open(file, "r+") as f:
+            f.truncate(size - 5)
+        rl2 = RecoveryLogger(self.path)
+        self.assertEqual(rl2.recover()[1], 1)
+        rl2.save_next_move()
+        self.assertEqual(RecoveryLogger(self.path).recover()[1], 2)
+
+        # a record with a bad checksum ends the journal
+        with open(file, "a") as f:
+            f.write("P 00000009 00000000\n")
+        self.assertEqual(RecoveryLogger(self.path).recover()[1], 2)
+
+    def test_utf8(self):
+        # names that are not ascii are read back whatever the locale, and a torn record after them is cut off at the right byte
+        m = Move(Position(Location.SHIP, [0, 1]), Position(Location.TRUCK), 5, ContainerData("Caf\u00e9 \u00c5sa", 100))
+        rl = RecoveryLogger(self.path)
+        rl.create([self.m1, m])
+        rl.save_next_move()
+        file = self.path + rl.recovery_file
+        with open(file, "ab") as f:
+            f.write(b"P 000")
+        rl2 = RecoveryLogger(self.path)
+        self.assertEqual(rl2.recover(), ([self.m1, m], 1))
+        rl2.save_next_move()
+        self.assertEqual(RecoveryLogger(self.path).recover(), ([self.m1, m], 2))
+
+    def test_damaged_plan(self):
+        rl = RecoveryLogger(self.path)
+        rl.create([self.m1, self.m2])
+        file = self.path + rl.recovery_file
+        with open(file) as f:
+            text = f.read()
+        with open(file, "w") as f:
+            f.write(text.replace("SHIP 0 2", "SHIP 0 3"))
+        self.assertEqual(RecoveryLogger(self.path).recover(), (None, None))
+
+    def test_rewritten_format(self):
+        # recovery files written before the journal are still read
+        rl = RecoveryLogger(self.path)
+        with open(self.path + rl.recovery_file, "w") as f:
+            f.write("2\n1\nBalancing\n" + rl.stringify_move(self.m1) + "\n" + rl.stringify_move(self.m2) + "\n")
+        moves, last_completed = rl.recover()
+        self.assertEqual(moves, [self.m1, self.m2])
+        self.assertEqual(last_completed, 1)
+        self.assertEqual(rl.last_task, "Balancing\n")
+
+        # it is a journal from then on
+        rl.save_next_move()
+        self.assertEqual(RecoveryLogger(self.path).recover(), ([self.m1, self.m2], 2))
+
+    def test_snapshot(self):
+        snapshot = Snapshot({(0, 1): ContainerData("John's shrimp and stuff", 100), (0, 0): ContainerData("NAN", 0)})
+        rl = RecoveryLogger(self.path)
+        rl.create([self.m1, self.m2], snapshot)
+        rec = RecoveryLogger(self.path)
+        self.assertEqual(rec.recover()[1], 0)
+        self.assertEqual(rec.snapshot, snapshot)
+
+        # the snapshot saved with a move is the one recovered
+        snapshot.apply(self.m1)
+        rl.save_next_move(snapshot)
+        snapshot.apply(self.m2)
+        rl.save_next_move(snapshot)
+        rec = RecoveryLogger(self.path)
+        self.assertEqual(rec.recover()[1], 2)
+        self.assertEqual(rec.snapshot, snapshot)
+        self.assertEqual(rec.snapshot.ship[(0, 2)].name, "John's shrimp and stuff")
+
+        # a snapshot record cut short falls back to the one before it
+        file = self.path + rl.recovery_file
+        with open(file, "r+") as f:
+            f.truncate(os.path.getsize(file) - 5)
+        rec = RecoveryLogger(self.path)
+        self.assertEqual(rec.recover()[1], 1)
+        self.assertEqual(rec.snapshot.completed, 1)
+        self.assertIn((0, 1), rec.snapshot.ship)
+
+    def test_snapshot_parsed_once(self):
+        snapshot = Snapshot({(0, 1): ContainerData("John's shrimp and stuff", 100)})
+        rl = RecoveryLogger(self.path, fsync="never")
+        rl.create([self.m1, self.m2]*50, snapshot)
+        for move in [self.m1, self.m2]*50:
+            snapshot.apply(move)
+            rl.save_next_move(snapshot)
+        parsed = []
+        parse = Snapshot.parse
+        def counting_parse(text, completed):
+            parsed.append(completed)
+            return parse(text, completed)
+        Snapshot.parse = staticmethod(counting_parse)
+        try:
+            rec = RecoveryLogger(self.path)
+            self.assertEqual(rec.recover()[1], 100)
+        finally:
+            Snapshot.parse = staticmethod(parse)
+        self.assertEqual(parsed, [100]) # only the last of the 101 snapshots
+        self.assertEqual(rec.snapshot, snapshot)
+
+    def test_snapshot_behind(self):
+        # moves saved without a snapshot are made on the last one saved
+        snapshot = Snapshot({(0, 1): ContainerData("John's shrimp and stuff", 100)})
+        rl = RecoveryLogger(self.path)
+        rl.create([self.m1, self.m2], snapshot)
+        rl.save_next_move()
+        rl.save_next_move()
+        rec = RecoveryLogger(self.path)
+        moves, last_completed = rec.recover()
+        self.assertEqual(rec.snapshot.completed, 0)
+        rec.snapshot.replay(moves, last_completed)
+        self.assertEqual(rec.snapshot.completed, 2)
+        self.assertEqual(list(rec.snapshot.ship), [(0, 2)])
 
 if __name__ == "__main__":
     print("Running RevoveryLogger tests")
-    unittest.main()
\ No newline at end of file
+    unittest.main()
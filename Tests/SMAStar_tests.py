@@ -0,0 +1,56 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.Balancer import Balancer
+from Load_Balance.Loader import Loader
+from Load_Balance.SMAStar import SMAStar
+from Manifest import Manifest
+from ContainerData import ContainerData
+
+class TestSMAStar(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+
+    def balance(self, name, max_nodes):
+        manifest = Manifest(self.path, name)
+        manifest.read_manifest()
+        balancer = Balancer(manifest, max_nodes=max_nodes, max_bytes=None)
+        self.assertIsInstance(balancer.make_search(), SMAStar)
+        return sum(move.time_to_move for move in balancer.balance())
+
+    def test_small_budget_balance(self):
+        # forgetting states must not change the cost of the plan found
+        self.assertEqual(self.balance("ShipCase2", 50), 40)
+        self.assertEqual(self.balance("ShipCase3", 50), 44)
+        self.assertEqual(self.balance("ShipCase4", 50), 60)
+
+    def test_small_budget_load(self):
+        manifest = Manifest(self.path, "test_manifest")
+        manifest.read_manifest()
+        loader = Loader(manifest, max_nodes=15, max_bytes=None)
+        moves = loader.load_unload([ContainerData("Fish", 4323), ContainerData("Cat", 4324), ContainerData("Dog", 4325)],
+                                   [ContainerData("Red"), ContainerData("Purple"), ContainerData("Green")])
+        self.assertEqual(sum(move.time_to_move for move in moves), 88)
+
+    def test_cheaper_path_to_expanded_state(self):
+        # the load heuristic is not consistent, a state can be reached more cheaply after it was expanded
+        # the better copy has to replace it and its subtree, whatever the budget
+        for max_bytes in (10**6, 10**10):
+            manifest = Manifest(self.path, "test_manifest")
+            manifest.read_manifest()
+            loader = Loader(manifest, max_nodes=None, max_bytes=max_bytes, workers=None)
+            self.assertIsInstance(loader.make_search(), SMAStar)
+            moves = loader.load_unload([ContainerData("Fish", 4323)],
+                                       [ContainerData("Red"), ContainerData("Purple"), ContainerData("Green"), ContainerData("Black"), ContainerData("Black")])
+            self.assertEqual(sum(move.time_to_move for move in moves), 134)
+
+    def test_unbounded(self):
+        manifest = Manifest(self.path, "ShipCase1")
+        manifest.read_manifest()
+        self.assertNotIsInstance(Balancer(manifest, max_nodes=None, max_bytes=None).make_search(), SMAStar)
+
+if __name__ == "__main__":
+    print("Running SMAStar tests")
+    unittest.main()
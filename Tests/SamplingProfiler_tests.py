@@ -0,0 +1,53 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import tempfile
+from Load_Balance.SamplingProfiler import SamplingProfiler, profile_search, collapse
+from Load_Balance.Search import Search
+from Load_Balance.BalanceState import BalanceState
+from Manifest import Manifest
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_collapse(self):
+        stack = collapse(sys._getframe())
+        self.assertTrue(stack.endswith("SamplingProfiler_tests.py:test_collapse"))
+        self.assertNotIn(" ", stack)
+
+    def test_samples(self):
+        with SamplingProfiler(0.001) as profiler:
+            total = 0
+            for i in range(2000000):
+                total += i
+        self.assertGreater(sum(profiler.samples.values()), 0)
+        self.assertTrue(any(stack.endswith(":test_samples") for stack in profiler.samples))
+
+    def test_profile_search(self):
+        manifest = Manifest(os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/", "test_manifest")
+        manifest.read_manifest()
+        state = BalanceState(manifest)
+        state.calculate_h()
+        search = Search("Test")
+        (fd, path) = tempfile.mkstemp(suffix=".folded")
+        os.close(fd)
+        try:
+            goal = profile_search(search, [state], path)
+            self.assertEqual(goal.g, 52)
+            phases = search.stats.phases()
+            self.assertGreater(phases["expand"], 0)
+            self.assertGreater(phases["dedupe"], 0)
+            self.assertGreater(phases["push/pop"], 0)
+            with open(path) as f:
+                lines = f.read().splitlines()
+            self.assertTrue(lines)
+            for line in lines:
+                (stack, count) = line.rsplit(" ", 1)
+                self.assertGreater(int(count), 0)
+            self.assertTrue(any("Search.py:search;State.py:expand" in line for line in lines))
+        finally:
+            os.remove(path)
+
+if __name__ == "__main__":
+    print("Running SamplingProfiler tests")
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.SearchStats import SearchStats
+from Load_Balance.Search import Search
+import Load_Balance.Search as search_module
+from Load_Balance.SMAStar import SMAStar
+from Load_Balance.BalanceState import BalanceState
+from Load_Balance.Balancer import Balancer
+from Manifest import Manifest
+
+class TestSearchStats(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+
+    def make_state(self, name):
+        manifest = Manifest(self.path, name)
+        manifest.read_manifest()
+        state = BalanceState(manifest)
+        state.calculate_h()
+        return state
+
+    def test_counts(self):
+        for search in [Search("Test"), SMAStar("Test", max_nodes=50)]:
+            state = self.make_state("test_manifest")
+            goal = search.search([state])
+            stats = search.stats
+            self.assertEqual(goal.g, 52)
+            self.assertGreater(stats.expanded, 0)
+            self.assertGreater(stats.generated, stats.expanded)
+            self.assertGreater(stats.duplicates, 0)
+            self.assertGreater(stats.max_open, 0)
+            self.assertEqual(stats.best_f, 52)
+            self.assertFalse(stats.aborted)
+            self.assertIs(state.table.stats, stats)
+
+            # the time of the expansions is split up
+            self.assertGreater(stats.expand_seconds, 0)
+            self.assertLessEqual(stats.h_seconds + stats.clone_seconds, stats.expand_seconds)
+            self.assertGreater(stats.nodes_per_second, 0)
+        self.assertGreater(search.stats.culled, 0) # SMAStar had to forget states to stay within 50 nodes
+
+    def test_progress(self):
+        seen = []
+        search = Search("Test", lambda stats: seen.append(stats.expanded))
+        interval = search_module.PROGRESS_INTERVAL
+        search_module.PROGRESS_INTERVAL = 10 # called more than once on a short search
+        try:
+            search.search([self.make_state("test_manifest")])
+        finally:
+            search_module.PROGRESS_INTERVAL = interval
+        self.assertGreater(len(seen), 1)
+        self.assertEqual(seen, list(range(1, search.stats.expanded + 1, 10))) # every PROGRESS_INTERVAL states expanded
+
+    def test_abort(self):
+        manifest = Manifest(self.path, "test_manifest")
+        manifest.read_manifest()
+        balancer = Balancer(manifest, progress=lambda stats: True)
+        self.assertEqual(balancer.balance(), [])
+        self.assertTrue(balancer.stats.aborted)
+        self.assertIsNone(balancer.bound)
+
+    def test_merge(self):
+        a = SearchStats()
+        a.expanded = 3
+        a.best_f = 10
+        b = SearchStats()
+        b.expanded = 4
+        b.best_f = 8
+        a.merge(b)
+        self.assertEqual((a.expanded, a.best_f), (7, 8))
+        self.assertEqual(a.as_dict()["expanded"], 7)
+
+if __name__ == "__main__":
+    print("Running SearchStats tests")
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Snapshot import Snapshot
+from Move import Move
+from Load_Balance.Position import Position, Location
+from ContainerData import ContainerData
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.manifest = ["[01,01], {00000}, NAN\n", "[01,02], {00100}, Cat\n", "[01,03], {00000}, UNUSED\n", "[02,01], {00250}, Dog food\n"]
+
+    def test_from_manifest(self):
+        snapshot = Snapshot.from_manifest(self.manifest)
+        self.assertEqual(sorted(snapshot.ship), [(0, 0), (0, 1), (1, 0)])
+        self.assertEqual(snapshot.ship[(0, 1)].weight, 100)
+        self.assertEqual(snapshot.ship[(1, 0)].name, "Dog food")
+        self.assertEqual(snapshot.completed, 0)
+
+    def test_apply(self):
+        snapshot = Snapshot.from_manifest(self.manifest)
+        cat = ContainerData("Cat", 100)
+        snapshot.apply(Move(Position(Location.CRANE_REST), Position(Location.SHIP, [0, 1]), 1))
+        snapshot.apply(Move(Position(Location.SHIP, [0, 1]), Position(Location.BUFFER, [0, 5]), 5, cat))
+        self.assertNotIn((0, 1), snapshot.ship)
+        self.assertEqual(snapshot.buffer[(0, 5)].name, "Cat")
+        snapshot.apply(Move(Position(Location.BUFFER, [0, 5]), Position(Location.TRUCK), 3, cat))
+        self.assertEqual(snapshot.buffer, {})
+        self.assertEqual(snapshot.truck.name, "Cat")
+        self.assertEqual(snapshot.completed, 3)
+
+    def test_stringify(self):
+        snapshot = Snapshot.from_manifest(self.manifest)
+        snapshot.truck = ContainerData("Bird\nseed", 7)
+        text = snapshot.stringify()
+        self.assertNotIn("\n", text)
+        self.assertEqual(Snapshot.parse(text, 4), Snapshot(snapshot.ship, snapshot.buffer, snapshot.truck, 4))
+
+    def test_replay(self):
+        cat = ContainerData("Cat", 100)
+        moves = [Move(Position(Location.SHIP, [0, 1]), Position(Location.SHIP, [0, 2]), 1, cat),
+                 Move(Position(Location.SHIP, [0, 2]), Position(Location.TRUCK), 4, cat)]
+        snapshot = Snapshot.from_manifest(self.manifest)
+        snapshot.replay(moves, 1)
+        self.assertIn((0, 2), snapshot.ship)
+        snapshot.replay(moves, 2)
+        self.assertEqual(snapshot.truck.name, "Cat")
+        snapshot.replay(moves, 2) # nothing left to make
+        self.assertEqual(snapshot.completed, 2)
+
+if __name__ == "__main__":
+    print("Running Snapshot tests")
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import contextlib
+import io
+import json
+import subprocess
+import solve
+
+class TestSolve(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+
+    def run_main(self, argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(solve.main(argv), 0)
+        return out.getvalue()
+
+    def test_balance_json(self):
+        plan = json.loads(self.run_main([self.path + "ShipCase1.txt", "--balance", "--format", "json"]))
+        self.assertEqual(plan["total_minutes"], 34)
+        self.assertEqual(sum(move["minutes"] for move in plan["moves"]), 34)
+        self.assertEqual([move["container"] for move in plan["moves"]], [None, "Dog", None])
+
+    def test_load_unload_text(self):
+        out = self.run_main([self.path + "ShipCase3.txt", "--load", "Bat:532", "--load", "Rat:6317", "--unload", "Cow"])
+        self.assertIn("Total time: 46 minutes", out)
+        self.assertIn("Not known how far from the best plan this is", out) # the h of the Loader is not admissible
+
+        out = self.run_main([self.path + "ShipCase1.txt", "--balance"])
+        self.assertIn("At most 1.0 times as long as the best plan", out)
+
+    def test_no_plan(self):
+        # out of time before there is a plan, nothing is printed to stdout and the exit code says so
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(solve.main([self.path + "ShipCase3.txt", "--load", "Bat:532", "--unload", "Cow", "--time-limit", "0"]), 1)
+        self.assertEqual(out.getvalue(), "")
+
+    def test_audit(self):
+        # a script run is not written to the operator's log unless it asks to be
+        self.assertIsNone(solve.open_manifest(self.path + "ShipCase1.txt").log)
+        self.assertIsNone(solve.open_manifest(solve.parse_args([self.path + "ShipCase1.txt", "--balance"]).manifest).log)
+        args = solve.parse_args([self.path + "ShipCase1.txt", "--balance", "--audit"])
+        self.assertIsNotNone(solve.open_manifest(args.manifest, args.audit).log)
+
+    def test_bad_args(self):
+        for argv in [[self.path + "ShipCase1.txt"],
+                     [self.path + "ShipCase1.txt", "--load", "Bat"],
+                     [self.path + "ShipCase1.txt", "--balance", "--unload", "Cat"],
+                     [self.path + "NoShip.txt", "--balance"]]:
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                solve.parse_args(argv)
+
+    def test_no_pyqt(self):
+        code = "import sys, solve; sys.exit('PyQt5' in sys.modules)"
+        cwd = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        self.assertEqual(subprocess.run([sys.executable, "-c", code], cwd=cwd).returncode, 0)
+
+if __name__ == "__main__":
+    print("Running Solve tests")
+    unittest.main()
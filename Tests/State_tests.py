@@ -0,0 +1,119 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from Load_Balance.State import State
+from Load_Balance.Position import Position, Location, cost
+from consts import SHIP_VIRTUAL_CELL
+from Manifest import Manifest
+from ContainerData import ContainerData
+
+class TestState(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.dirname(os.path.abspath(__file__)) + "/../Manifests/"
+        manifest = Manifest(self.path, "ShipCase1")
+        manifest.read_manifest()
+        self.state = State(manifest)
+
+    def test_build(self):
+        self.assertIsNone(self.state.ship_at(0, 0))                # NAN
+        self.assertEqual(self.state.ship_at(0, 1).name, "Cat")
+        self.assertEqual(self.state.ship_at(0, 1).weight, 99)
+        self.assertEqual(self.state.ship_at(0, 3).name, "UNUSED")
+        self.assertEqual(self.state.buffer_at(0, 0).name, "UNUSED")
+        self.assertEqual(self.state.ship_height_map[1], 9)
+        self.assertEqual(self.state.buffer_height_map[0], 4)
+
+    def test_clone_is_independent(self):
+        clone = self.state.clone()
+        self.assertEqual(clone, self.state)
+        self.assertEqual(hash(clone), hash(self.state))
+        self.assertIs(clone.table, self.state.table)
+
+        clone.swap(Position(Location.SHIP, [0, 1]), Position(Location.BUFFER, [0, 0]))
+        self.assertNotEqual(clone, self.state)
+        self.assertEqual(self.state.ship_at(0, 1).name, "Cat")
+        self.assertEqual(clone.buffer_at(0, 0).name, "Cat")
+        self.assertEqual(clone.ship_height_map[1], 10)
+        self.assertEqual(clone.buffer_height_map[0], 3)
+        self.assertEqual(self.state.ship_height_map[1], 9)
+
+    def test_set_at(self):
+        pos = Position(Location.SHIP, [0, 3])
+        self.state.set_at(pos, ContainerData("Fox", 42))
+        self.assertEqual(self.state.at(pos).name, "Fox")
+        self.assertEqual(self.state.ship_height_map[3], 9)
+
+        self.state.set_at(pos, ContainerData())
+        self.assertEqual(self.state.at(pos).name, "UNUSED")
+        self.assertEqual(self.state.ship_height_map[3], 10)
+
+    def test_undo(self):
+        clone = self.state.clone()
+        mark = self.state.mark()
+        self.state.swap(Position(Location.SHIP, [0, 1]), Position(Location.BUFFER, [0, 0]))
+        self.state.set_at(Position(Location.SHIP, [0, 3]), ContainerData("Fox", 42))
+        self.state.crane_position.move_to(Position(Location.TRUCK))
+        self.state.g += 10
+        self.assertNotEqual(clone, self.state)
+
+        self.state.undo(mark)
+        self.assertEqual(clone, self.state)
+        self.assertEqual(clone.ship_height_map, self.state.ship_height_map)
+        self.assertEqual(clone.buffer_height_map, self.state.buffer_height_map)
+        self.assertTrue(self.state.crane_position.in_crane_rest())
+        self.assertEqual(self.state.g, 0)
+        self.assertEqual(self.state.trail, [])
+
+    def test_zobrist_key(self):
+        clone = self.state.clone()
+        clone.swap(Position(Location.SHIP, [0, 1]), Position(Location.BUFFER, [0, 0]))
+        clone.set_at(Position(Location.SHIP, [0, 3]), ContainerData("Fox", 42))
+
+        # the incremental key matches a key built from scratch
+        key = 0
+        for i, id in enumerate(clone.cells):
+            key ^= clone.table.keys[id][i]
+        self.assertEqual(clone.key, key)
+
+        # moving the container back gives the original key and an equal state
+        clone.swap(Position(Location.BUFFER, [0, 0]), Position(Location.SHIP, [0, 1]))
+        clone.set_at(Position(Location.SHIP, [0, 3]), ContainerData())
+        self.assertEqual(clone.key, self.state.key)
+        self.assertEqual(clone, self.state)
+        self.assertEqual(hash(clone), hash(self.state))
+
+        # the crane position is part of the hash
+        clone.crane_position.move_to(Position(Location.TRUCK))
+        self.assertNotEqual(hash(clone), hash(self.state))
+        self.assertNotEqual(clone, self.state)
+
+    def test_open_costs(self):
+        self.state.set_at(Position(Location.SHIP, [1, 1]), ContainerData("Fox", 42))
+        self.state.set_at(Position(Location.BUFFER, [0, 5]), ContainerData("Owl", 7))
+        starts = [Position(Location.SHIP, [1, 2]), Position(Location.SHIP, [0, 11]), Position(Location.BUFFER, [1, 5]),
+                  Position(Location.SHIP, SHIP_VIRTUAL_CELL), Position(Location.CRANE_REST)]
+
+        # every open position costs the same as moving the crane there
+        for start in starts:
+            for location in [Location.SHIP, Location.BUFFER]:
+                costs = self.state.open_costs(start, location)
+                for p in self.state.get_open_positions():
+                    if p.location == location:
+                        self.assertEqual(costs[p.n], cost(start, p, self.state), str(start) + " to " + str(p))
+
+    def test_search_from(self):
+        pos = Position(Location.SHIP, [0, 2]) # Dog
+        (best, c) = self.state.search_from(pos, False, False)
+        self.assertEqual(best, Position(Location.SHIP, [0, 3]))
+        self.assertEqual(c, 1)
+
+        # h_func can rule positions out
+        (best, c) = self.state.search_from(pos, False, False, lambda p: float('inf') if p.n == 3 else 0)
+        self.assertEqual(best, Position(Location.SHIP, [1, 1]))
+        self.assertEqual(c, 2)
+
+if __name__ == "__main__":
+    print("Running State tests")
+    unittest.main()
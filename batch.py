@@ -0,0 +1,142 @@
+## Batch mode of the solver, plans every manifest in a folder at once across a pool of processes
+##
+## python batch.py Manifests/ --out Plans/ --jobs 4
+##
+## every X.txt manifest in the folder is a job, what to do with it is read from X.task.json next to it if there is one:
+##     {"balance": true}
+##     {"load": ["Bat:532", "Rat:6317"], "unload": ["Cow"]}
+## a manifest without a task file is balanced
+## the OUTBOUND manifest and the plan (X.plan.json) of each job are written to the out folder
+##
+## each job runs in its own process of a ProcessPoolExecutor so a slow ship only holds up one of them,
+## and it is searched for at most --time-limit seconds (see AnytimeSearch) before its best plan is taken
+## a job with no plan by then fails, unless a balance falls back on the two phase plan (see Balancer)
+## --timeout is a last resort for a job still running after that many seconds, it fails so its process is free for the next job
+## (the timeout needs SIGALRM, where there is none a job runs until it is done)
+## a job that fails is reported with its error and does not stop the others
+## the report lists the time, states expanded and plan cost of every job, as text or JSON
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from Load_Balance.Loader import Loader
+from Load_Balance.Balancer import Balancer
+from ContainerData import ContainerData
+from consts import BATCH_TIME_LIMIT, BATCH_TIMEOUT
+import solve
+
+## find the jobs in a folder of manifests
+## return a list of (name, task), task is the parsed task file
+def find_jobs(folder):
+    jobs = []
+    for file in sorted(os.listdir(folder)):
+        if not file.endswith(".txt") or file.endswith("OUTBOUND.txt"):
+            continue
+        name = file[:-4]
+        task_file = os.path.join(folder, name + ".task.json")
+        task = {"balance": True}
+        if os.path.isfile(task_file):
+            with open(task_file) as f:
+                task = json.load(f)
+        jobs.append((name, task))
+    return jobs
+
+class JobTimeout(Exception):
+    pass
+
+def on_alarm(signum, frame):
+    raise JobTimeout("no plan found in time")
+
+## plan one job, runs in a worker process
+## return a dict with the outcome of the job, exceptions are caught and reported in it
+def run_job(folder, name, task, out, time_limit, two_phase, timeout=None):
+    result = {"name": name, "ok": False, "error": None, "seconds": 0.0, "expanded": 0, "total_minutes": None, "moves": None}
+    start = time.perf_counter()
+    alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if alarm:
+        signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        manifest = solve.open_manifest(os.path.join(folder, name + ".txt"), audit=False) # no operator opened it
+        manifest.manifest_path = out # the OUTBOUND manifest is saved to the out folder
+
+        if task.get("balance"):
+            solver = Balancer(manifest, two_phase=two_phase)
+            moves = solver.balance(time_limit)
+        else:
+            load = [solve.parse_load(text) for text in task.get("load", [])]
+            unload = [ContainerData(text) for text in task.get("unload", [])]
+            solver = Loader(manifest)
+            moves = solver.load_unload(load, unload, time_limit)
+        seconds = time.perf_counter() - start
+        if solver.out_of_time:
+            result.update(error="no plan found in " + str(time_limit) + " seconds", seconds=seconds)
+            return result
+
+        with open(os.path.join(out, name + ".plan.json"), "w") as f:
+            f.write(solve.format_json(moves, seconds, solver.bound))
+
+        result.update(ok=True, seconds=seconds, expanded=solver.stats.expanded, total_minutes=sum(move.time_to_move for move in moves), moves=len(moves))
+    except JobTimeout as e:
+        result.update(error="timed out, " + str(e) + " after " + str(timeout) + " seconds", seconds=time.perf_counter() - start)
+    except Exception:
+        result.update(error=traceback.format_exc(limit=3).strip(), seconds=time.perf_counter() - start)
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result
+
+## plan every job in folder with a pool of workers processes
+## results are returned in the order the jobs finish, on_result is called with each one as it comes in
+def run_batch(folder, out, workers=None, time_limit=BATCH_TIME_LIMIT, timeout=BATCH_TIMEOUT, two_phase=False, on_result=None):
+    os.makedirs(out, exist_ok=True)
+    out = os.path.abspath(out) + "/"
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_job, folder, name, task, out, time_limit, two_phase, timeout): name for (name, task) in find_jobs(folder)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e: # the worker process died
+                result = {"name": futures[future], "ok": False, "error": repr(e), "seconds": None, "expanded": None, "total_minutes": None, "moves": None}
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+def format_result(result):
+    if not result["ok"]:
+        return result["name"] + ": FAILED\n    " + result["error"].replace("\n", "\n    ")
+    return (result["name"] + ": " + str(result["total_minutes"]) + " minutes, " + str(result["moves"]) + " moves, "
+            + str(result["expanded"]) + " states expanded, " + str(round(result["seconds"], 3)) + " seconds")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="batch.py", description="Plan every manifest in a folder")
+    parser.add_argument("folder", help="folder of manifests, with optional NAME.task.json task files")
+    parser.add_argument("--out", default=None, help="folder to write the OUTBOUND manifests and plans to, the manifest folder by default")
+    parser.add_argument("--jobs", type=int, default=None, help="number of jobs to run at once, one per cpu by default")
+    parser.add_argument("--time-limit", type=float, default=BATCH_TIME_LIMIT, help="seconds each job searches for before taking the best plan found")
+    parser.add_argument("--timeout", type=float, default=BATCH_TIMEOUT, help="seconds after which a job with no plan yet fails")
+    parser.add_argument("--two-phase", action="store_true", help="balance with the two phase planner (see LayoutPlanner)")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="how the report is printed")
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.folder):
+        parser.error("no folder at " + args.folder)
+
+    start = time.perf_counter()
+    on_result = (lambda result: print(format_result(result), flush=True)) if args.format == "text" else None
+    results = run_batch(args.folder, args.out or args.folder, args.jobs, args.time_limit, args.timeout, args.two_phase, on_result)
+    failed = sum(1 for result in results if not result["ok"])
+
+    if args.format == "json":
+        print(json.dumps({"jobs": results, "failed": failed, "seconds": time.perf_counter() - start}, indent=2))
+    else:
+        print(str(len(results)) + " jobs, " + str(failed) + " failed, " + str(round(time.perf_counter() - start, 3)) + " seconds")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+## Benchmark suite of the solver, run before trusting any change to the search
+##
+## python bench.py --out bench.json                       run every scenario and save the results
+## python bench.py --compare bench.json                   run again and flag regressions against the saved results
+## python bench.py --compare bench.json --results new.json compare two saved runs without running anything
+##
+## the scenarios are balancing every manifest in Manifests/ and the load/unload cases in LOAD_SCENARIOS
+## each runs alone in a fresh process so its peak memory is its own, and is given up on after --timeout seconds
+## for each scenario the wall time, states expanded and generated, peak memory (max resident set size) and plan cost are recorded
+## along with the rest of the search counters (see SearchStats)
+##
+## a scenario regresses if its plan costs more, if it stops finishing, or if its time, states expanded
+## or memory grow by more than the tolerance (and by more than a small absolute amount, so noise on tiny cases is ignored)
+import argparse
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from Load_Balance.Loader import Loader
+from Load_Balance.Balancer import Balancer
+from ContainerData import ContainerData
+from consts import BENCH_TIMEOUT, BENCH_TOLERANCE
+from batch import JobTimeout, on_alarm
+import solve
+
+try:
+    import resource
+except ImportError: # not on windows, peak memory is not recorded there
+    resource = None
+
+MANIFESTS = os.path.dirname(os.path.abspath(__file__)) + "/Manifests/"
+
+# (manifest, containers to load as NAME:WEIGHT, containers to unload)
+LOAD_SCENARIOS = [
+    ("ShipCase1", [], ["Cat"]),
+    ("ShipCase2", ["Bat:431"], []),
+    ("ShipCase3", ["Bat:532", "Rat:6317"], ["Cow"]),
+    ("ShipCase4", ["Nat:2543"], ["Doe"]),
+    ("ShipCase5", ["Nat:153", "Rat:2321"], ["Hen", "Pig"]),
+    ("test_manifest", ["Fish:4323", "Cat:4324", "Dog:4325"], ["Red", "Purple", "Green"]),
+    ("test_manifest", ["Fish:4323"], ["Red", "Purple", "Green", "Black", "Black"]),
+]
+
+# smallest changes that count as a regression, whatever the tolerance
+MIN_SECONDS = 0.05
+MIN_EXPANDED = 10
+MIN_MEMORY_MB = 5
+
+## the scenarios to run, as (name, task) with task like a batch task file
+def scenarios():
+    found = []
+    for file in sorted(os.listdir(MANIFESTS)):
+        if file.endswith(".txt") and not file.endswith("OUTBOUND.txt"):
+            found.append(("balance " + file[:-4], {"manifest": file[:-4], "balance": True}))
+    for (manifest, load, unload) in LOAD_SCENARIOS:
+        name = "load " + manifest + " +" + ",".join(text.split(":")[0] for text in load) + " -" + ",".join(unload)
+        found.append((name, {"manifest": manifest, "load": load, "unload": unload}))
+    return found
+
+# peak resident memory of this process in MB, None if it can not be measured
+def peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024*1024) if sys.platform == "darwin" else peak / 1024 # bytes on macos, KB elsewhere
+
+## run one scenario, in its own process
+def run_scenario(task, timeout):
+    result = {"status": "ok", "seconds": None, "expanded": None, "generated": None, "peak_memory_mb": None, "cost": None, "error": None, "stats": None}
+    alarm = timeout is not None and hasattr(signal, "SIGALRM")
+    if alarm:
+        signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    start = time.perf_counter()
+    try:
+        manifest = solve.open_manifest(MANIFESTS + task["manifest"] + ".txt", audit=False) # a benchmark is not an operator cycle
+        manifest.manifest_path = tempfile.gettempdir() + "/" # keep the OUTBOUND manifests out of Manifests/
+        if task.get("balance"):
+            solver = Balancer(manifest)
+            moves = solver.balance()
+        else:
+            solver = Loader(manifest)
+            moves = solver.load_unload([solve.parse_load(text) for text in task["load"]], [ContainerData(text) for text in task["unload"]])
+        result.update(seconds=time.perf_counter() - start, expanded=solver.stats.expanded, generated=solver.stats.generated,
+                      cost=sum(move.time_to_move for move in moves), stats=solver.stats.as_dict())
+    except JobTimeout:
+        result.update(status="timeout", seconds=time.perf_counter() - start)
+    except Exception as e:
+        result.update(status="error", seconds=time.perf_counter() - start, error=repr(e))
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+## run every scenario one after the other, each in a fresh process
+## on_result is called with the name and result of each scenario as it finishes
+def run_suite(timeout=BENCH_TIMEOUT, only=None, on_result=None):
+    results = {}
+    for (name, task) in scenarios():
+        if only is not None and only not in name:
+            continue
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(run_scenario, task, timeout).result()
+        results[name] = result
+        if on_result is not None:
+            on_result(name, result)
+    return {"python": sys.version.split()[0], "timeout": timeout, "scenarios": results}
+
+## compare the results of a run against a baseline
+## return a list of regressions, each a line saying what got worse
+def compare(baseline, results, tolerance=BENCH_TOLERANCE):
+    regressions = []
+    for (name, new) in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            continue
+        if old["status"] == "ok" and new["status"] != "ok":
+            regressions.append(name + ": " + new["status"] + ", it used to finish")
+            continue
+        if new["status"] != "ok" or old["status"] != "ok":
+            continue
+        if new["cost"] > old["cost"]:
+            regressions.append(name + ": plan cost " + str(old["cost"]) + " -> " + str(new["cost"]))
+        for (key, minimum) in [("seconds", MIN_SECONDS), ("expanded", MIN_EXPANDED), ("peak_memory_mb", MIN_MEMORY_MB)]:
+            if old[key] is None or new[key] is None:
+                continue
+            if new[key] > old[key]*(1 + tolerance) and new[key] - old[key] > minimum:
+                regressions.append(name + ": " + key + " " + str(round(old[key], 3)) + " -> " + str(round(new[key], 3)))
+    return regressions
+
+def format_result(name, result):
+    if result["status"] != "ok":
+        return name + ": " + result["status"] + (" " + result["error"] if result["error"] else "")
+    memory = "" if result["peak_memory_mb"] is None else ", " + str(round(result["peak_memory_mb"], 1)) + " MB"
+    return (name + ": cost " + str(result["cost"]) + ", " + str(round(result["seconds"], 3)) + " seconds, "
+            + str(result["expanded"]) + " expanded, " + str(result["generated"]) + " generated" + memory)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.py", description="Benchmark the solver on the bundled manifests")
+    parser.add_argument("--out", default=None, help="file to save the results to as JSON")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="saved results to flag regressions against")
+    parser.add_argument("--results", default=None, help="saved results to compare instead of running the suite")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE, help="fraction time, states and memory may grow by")
+    parser.add_argument("--timeout", type=float, default=BENCH_TIMEOUT, help="seconds after which a scenario is given up on")
+    parser.add_argument("--only", default=None, help="only run the scenarios with this in their name")
+    args = parser.parse_args(argv)
+    if args.results is not None and args.compare is None:
+        parser.error("--results needs --compare")
+
+    if args.results is not None:
+        with open(args.results) as f:
+            results = json.load(f)
+    else:
+        results = run_suite(args.timeout, args.only, lambda name, result: print(format_result(name, result), flush=True))
+        if args.out is not None:
+            with open(args.out, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.compare is None:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, results, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    print(str(len(regressions)) + " regressions against " + args.compare)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,53 @@
+import logging
+import os
+
 BUFF_HEIGHT = 4 # height of the buffer
 BUFF_WIDTH = 24 # width of the buffer
 SHIP_HEIGHT = 8 # height of the ship
 SHIP_WIDTH = 12 # width of the ship
 SHIP_BUFF = 2   # height of the extra space above the ship
 
+SHIP_ROWS = SHIP_HEIGHT+SHIP_BUFF   # rows of the ship including the ship_buff
+SHIP_CELLS = SHIP_ROWS*SHIP_WIDTH   # number of cells in the ship
+BUFF_CELLS = BUFF_HEIGHT*BUFF_WIDTH # number of cells in the buffer
+
 SHIP_VIRTUAL_CELL = [SHIP_HEIGHT+SHIP_BUFF, 0]  # location of the virtual cell for the ship
 BUFF_VIRTUAL_CELL = [BUFF_HEIGHT, BUFF_WIDTH-1] # location of the virtual cell for the buffer
 
-MAX_STATES = 10000 # max number of states to keep in the heap
-STATE_CULL = 100  # number of states to keep when culling the heap
\ No newline at end of file
+MAX_SEARCH_NODES = None            # max number of states the search keeps in memory, None for no limit
+MAX_SEARCH_BYTES = 512*1024*1024   # max number of bytes of states the search keeps in memory, None for no limit
+
+ZOBRIST_SEED = 179 # seed for the random keys used to hash states, fixed so hashes are the same in every process
+HEURISTIC_CACHE_SIZE = 200000 # most heuristic values a search remembers, None for no limit, 0 to turn the cache off
+
+ANYTIME_WEIGHTS = [5, 3, 2, 1.5, 1] # heuristic weights used by each pass of the anytime search, the last should be 1
+SOLVE_TIME_LIMIT = 30 # seconds the GUI waits for a plan before taking the best one found so far
+
+SEARCH_WORKERS = None # number of processes the search runs on, None or 1 to search in this process
+PROGRESS_INTERVAL = 100 # states a search expands between calls to its progress callback (and progress prints)
+PARALLEL_BATCH = 64   # number of states a search process collects before sending them to the process that owns them
+
+BALANCE_TWO_PHASE = False # balance by picking a target layout first and then ordering the moves, instead of a full search
+PLAN_COMBINATIONS = 200000 # most sets of crossing containers the two phase planner tries before falling back on a greedy pick
+PLAN_ORDERINGS = 5         # the two phase planner tries every order of at most this many crossing containers
+
+BATCH_TIME_LIMIT = 60 # seconds each job of a batch run searches for before taking the best plan found
+BATCH_TIMEOUT = 300   # seconds after which a job of a batch run is given up on, even if it has no plan yet
+
+BENCH_TIMEOUT = 60      # seconds after which a benchmark scenario is given up on
+BENCH_TOLERANCE = 0.25  # fraction the time, states expanded or memory of a benchmark scenario may grow by before it is a regression
+
+PROFILE_SOLVES = os.environ.get("ARK_PROFILE", "0") not in ("", "0") # time every phase of the search and sample a profile of each solve
+PROFILE_INTERVAL = 0.005 # seconds between the samples of the call stack taken by the profiler
+PROFILE_PATH = os.path.dirname(os.path.abspath(__file__)) + "/Logs/" # folder the profiles are written to, next to the log
+
+DIAGNOSTICS_LEVEL = os.environ.get("ARK_LOG_LEVEL", "WARNING").upper() # lowest level of the solver diagnostics shown, see Diagnostics
+if not isinstance(logging.getLevelName(DIAGNOSTICS_LEVEL), int): # an unknown level would stop the solver from importing
+    DIAGNOSTICS_LEVEL = "WARNING"
+DIAGNOSTICS_INTERVAL = 1.0 # seconds between two of the same diagnostics message, more are dropped
+
+LOG_DURABILITY = "line"  # when the audit log lines reach the disk, "interval", "line" or "fsync" (see Logger.LogWriter)
+LOG_FLUSH_INTERVAL = 1.0 # seconds between flushes of the audit log with "interval" durability
+LOG_UNWRITTEN = ".unwritten" # added to the audit log path to save the lines that could not be written when the log is closed
+
+RECOVERY_FSYNC = "always" # when the recovery journal is synced to the disk, "always", "plan" or "never" (see RecoveryLogger)
@@ -1,8 +1,10 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from GUI.main_window import MainWindow
+from Load_Balance.Diagnostics import configure
 
 if __name__ == "__main__":
+    configure() # the solver diagnostics go to the console, set ARK_LOG_LEVEL to see more of them
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -0,0 +1,121 @@
+## Command line entry point to the solver, runs the Loader or Balancer on a manifest without the GUI
+## never imports PyQt so it starts fast and runs anywhere, for scripts, batch runs and timing the solver
+##
+## python solve.py Manifests/ShipCase3.txt --load Bat:532 --load Rat:6317 --unload Cow
+## python solve.py Manifests/ShipCase1.txt --balance --format json
+##
+## the plan is printed to stdout, the diagnostics of the solver go to stderr, -v for what the solve did and -vv for the search progress
+## like the GUI the OUTBOUND manifest is saved next to the manifest, it is only written to the operator's log with --audit
+import argparse
+import json
+import os
+import sys
+import time
+from Load_Balance.Loader import Loader
+from Load_Balance.Balancer import Balancer
+from Manifest import Manifest
+from ContainerData import ContainerData
+from Load_Balance.Diagnostics import configure
+from consts import PROFILE_SOLVES, DIAGNOSTICS_LEVEL
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="solve.py", description="Plan the crane moves to load/unload or balance a ship")
+    parser.add_argument("manifest", help="path to the manifest .txt file")
+    parser.add_argument("--balance", action="store_true", help="balance the ship instead of loading/unloading")
+    parser.add_argument("--load", action="append", default=[], metavar="NAME:WEIGHT", help="container to load, can be repeated")
+    parser.add_argument("--unload", action="append", default=[], metavar="NAME", help="container to unload, can be repeated")
+    parser.add_argument("--format", choices=["text", "json"], default="text", help="how the plan is printed")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds to search for before taking the best plan found")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes to search with")
+    parser.add_argument("--two-phase", action="store_true", help="balance with the two phase planner (see LayoutPlanner)")
+    parser.add_argument("--progress", action="store_true", help="print the search counters to stderr as it runs")
+    parser.add_argument("--audit", action="store_true", help="write opening and saving the manifest to the operator's log like the GUI")
+    parser.add_argument("--profile", action="store_true", help="time the phases of the search and write a sampled profile of it to Logs/")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="show what the solver does on stderr, twice to show the search progress too")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.manifest):
+        parser.error("no manifest at " + args.manifest)
+    if args.balance and (args.load or args.unload):
+        parser.error("--balance can not be used with --load or --unload")
+    if not args.balance and not args.load and not args.unload:
+        parser.error("nothing to do, give --balance or containers to --load/--unload")
+    try:
+        args.load = [parse_load(text) for text in args.load]
+    except ValueError as e:
+        parser.error(str(e))
+    args.unload = [ContainerData(name) for name in args.unload]
+    return args
+
+# a container to load is given as NAME:WEIGHT
+def parse_load(text):
+    (name, _, weight) = text.rpartition(":")
+    if not name or not weight.isdigit():
+        raise ValueError("containers to load are given as NAME:WEIGHT, not " + text)
+    return ContainerData(name, int(weight))
+
+# open the manifest at path, the Manifest takes the folder and the file name without .txt
+# opening and saving it is only written to the operator's log with audit
+def open_manifest(path, audit=False):
+    (folder, file) = os.path.split(os.path.abspath(path))
+    if file.endswith(".txt"):
+        file = file[:-4]
+    manifest = Manifest(folder + "/", file, audit)
+    manifest.read_manifest()
+    return manifest
+
+## run the solver the arguments ask for
+## return the moves, the seconds the solver took and the bound on how far from optimal the plan is
+## the moves are None if the time limit passed before any plan was found
+def solve(args):
+    manifest = open_manifest(args.manifest, args.audit)
+    progress = print_progress if args.progress else None
+    start = time.perf_counter()
+    if args.balance:
+        solver = Balancer(manifest, workers=args.workers, two_phase=args.two_phase, progress=progress, profile=args.profile or PROFILE_SOLVES)
+        moves = solver.balance(args.time_limit)
+    else:
+        solver = Loader(manifest, workers=args.workers, progress=progress, profile=args.profile or PROFILE_SOLVES)
+        moves = solver.load_unload(args.load, args.unload, args.time_limit)
+    return (None if solver.out_of_time else moves, time.perf_counter() - start, solver.bound)
+
+# progress callback of the search
+def print_progress(stats):
+    print("(progress)" + str(stats) + " seconds: " + str(round(stats.seconds, 3)), file=sys.stderr)
+
+def format_text(moves, seconds, bound):
+    lines = [str(move) for move in moves]
+    lines.append("Total time: " + str(sum(move.time_to_move for move in moves)) + " minutes, " + str(len(moves)) + " moves")
+    lines.append("Solved in " + str(round(seconds, 3)) + " seconds")
+    if bound is None or bound == float('inf'):
+        lines.append("Not known how far from the best plan this is")
+    else:
+        lines.append("At most " + str(round(bound, 3)) + " times as long as the best plan")
+    return "\n".join(lines)
+
+def format_json(moves, seconds, bound):
+    return json.dumps({
+        "moves": [{
+            "container": None if move.container.name == "UNUSED" else move.container.name, # None when the crane moves empty
+            "weight": None if move.container.name == "UNUSED" else move.container.weight,
+            "from": str(move.m_from),
+            "to": str(move.m_to),
+            "minutes": move.time_to_move,
+        } for move in moves],
+        "total_minutes": sum(move.time_to_move for move in moves),
+        "seconds": seconds,
+        "bound": None if bound == float('inf') else bound, # None if nothing is known about how far from optimal the plan is
+    }, indent=2)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure([DIAGNOSTICS_LEVEL, "INFO", "DEBUG"][min(args.verbose, 2)])
+    (moves, seconds, bound) = solve(args)
+    if moves is None:
+        print("No plan found in " + str(args.time_limit) + " seconds", file=sys.stderr)
+        return 1
+    print(format_json(moves, seconds, bound) if args.format == "json" else format_text(moves, seconds, bound))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())